@@ -0,0 +1,89 @@
+from random import expovariate
+from sys import argv
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from vm_revoker.poisson_arrival_schedule import PoissonArrivalSchedule
+
+
+def generate_lists_schedule(lambda_rate: float,
+                            max_number_of_observable_events: int) -> tuple:
+    # Former generation path: one expovariate call and two list appends per event
+    inter_arrival_times_in_seconds = []
+    arrival_times_in_seconds = []
+    arrival_time_in_seconds = 0
+    while len(arrival_times_in_seconds) < max_number_of_observable_events:
+        inter_arrival_time = expovariate(lambda_rate)
+        inter_arrival_times_in_seconds.append(inter_arrival_time)
+        arrival_time_in_seconds = arrival_time_in_seconds + inter_arrival_time
+        arrival_times_in_seconds.append(arrival_time_in_seconds)
+    return inter_arrival_times_in_seconds, arrival_times_in_seconds
+
+
+def consume_lists_schedule(schedule: tuple) -> None:
+    # Former consumption path: list.pop(0) per event
+    inter_arrival_times_in_seconds, arrival_times_in_seconds = schedule
+    while inter_arrival_times_in_seconds and arrival_times_in_seconds:
+        inter_arrival_times_in_seconds.pop(0)
+        arrival_times_in_seconds.pop(0)
+
+
+def generate_array_schedule(lambda_rate: float,
+                            max_number_of_observable_events: int) -> PoissonArrivalSchedule:
+    arrival_schedule = PoissonArrivalSchedule(lambda_rate=lambda_rate)
+    arrival_schedule.generate(stopping_criterion="max_number_of_observable_events",
+                              max_number_of_observable_events=max_number_of_observable_events,
+                              max_observation_length_in_seconds=None)
+    return arrival_schedule
+
+
+def consume_array_schedule(arrival_schedule: PoissonArrivalSchedule) -> None:
+    while arrival_schedule.has_next_event():
+        arrival_schedule.pop_next_event()
+
+
+def measure_generation(generate_function,
+                       lambda_rate: float,
+                       number_of_events: int) -> tuple:
+    start()
+    start_time = perf_counter()
+    schedule = generate_function(lambda_rate, number_of_events)
+    elapsed_time = perf_counter() - start_time
+    _, peak_memory_in_bytes = get_traced_memory()
+    stop()
+    return schedule, elapsed_time, peak_memory_in_bytes
+
+
+def measure_consumption(consume_function,
+                        schedule) -> float:
+    start_time = perf_counter()
+    consume_function(schedule)
+    return perf_counter() - start_time
+
+
+def main(argv_list: list) -> None:
+    max_number_of_events = int(argv_list[1]) if len(argv_list) > 1 else 1000000
+    # list.pop(0) is quadratic, so the lists schedule is only consumed up to this number of events
+    max_number_of_events_to_consume_lists = 100000
+    lambda_rate = 1
+    print("Events \t\t Schedule \t Generation (s) \t Peak Memory (MiB) \t Consumption (s)")
+    number_of_events = 1000
+    while number_of_events <= max_number_of_events:
+        schedules_list = [("lists", generate_lists_schedule, consume_lists_schedule),
+                          ("arrays", generate_array_schedule, consume_array_schedule)]
+        for schedule_name, generate_function, consume_function in schedules_list:
+            schedule, generation_time, peak_memory_in_bytes = measure_generation(generate_function,
+                                                                                 lambda_rate,
+                                                                                 number_of_events)
+            consumption_time = "-"
+            if schedule_name == "arrays" or number_of_events <= max_number_of_events_to_consume_lists:
+                consumption_time = round(measure_consumption(consume_function, schedule), 4)
+            print("{0} \t\t {1} \t\t {2} \t\t {3} \t\t\t {4}".format(number_of_events,
+                                                                    schedule_name,
+                                                                    round(generation_time, 4),
+                                                                    round(peak_memory_in_bytes / 2 ** 20, 2),
+                                                                    consumption_time))
+        number_of_events *= 10
+
+
+if __name__ == "__main__":
+    main(argv)
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from simulation.fake_ec2_backend import FakeEC2Backend
+from sys import argv
+from time import perf_counter
+from vm_manager.ec2_request_governor import EC2RequestGovernor
+from vm_manager.ec2_vm_manager import EC2VMManager
+
+
+def run_revocations(ec2vmm: EC2VMManager,
+                    instances_id_list: list,
+                    max_concurrent_revocations: int) -> int:
+    # Returns the number of failed revocations
+    def revoke(instance_id: str) -> bool:
+        try:
+            ec2vmm.terminate_ec2_instance(instance_id)
+            return True
+        except Exception:
+            return False
+    with ThreadPoolExecutor(max_workers=max_concurrent_revocations) as executor:
+        return list(executor.map(revoke, instances_id_list)).count(False)
+
+
+def main(argv_list: list) -> None:
+    number_of_revocations = int(argv_list[1]) if len(argv_list) > 1 else 200
+    max_concurrent_revocations = 8
+    # Scaled-down TerminateInstances quota (burst, refill rate per second), so the benchmark runs in seconds
+    api_request_rate_limits_dict = {"terminate_instances": (10, 50)}
+    instances_id_list = ["i-{0:017x}".format(index) for index in range(number_of_revocations)]
+    print("Revocations: {0} ({1} concurrent), TerminateInstances quota: {2}"
+          .format(number_of_revocations, max_concurrent_revocations, api_request_rate_limits_dict))
+    print("Request Layer \t\t API Calls \t Throttled \t Failed \t Elapsed Time (s)")
+    request_layers_list = [("ungoverned", False, 0.0),
+                           ("governed", True, 0.0),
+                           ("governed+coalesced", True, 0.05)]
+    for request_layer_name, is_governed, revocation_coalescing_window_in_seconds in request_layers_list:
+        fake_ec2_backend = FakeEC2Backend(instances_id_list=instances_id_list,
+                                          api_call_latency_in_seconds=0.005,
+                                          api_request_rate_limits_dict=api_request_rate_limits_dict)
+        ec2_request_governor = EC2RequestGovernor(api_request_rate_limits_dict=api_request_rate_limits_dict,
+                                                  max_attempts=8,
+                                                  base_backoff_in_seconds=0.05,
+                                                  max_backoff_in_seconds=2) if is_governed else None
+        ec2vmm = EC2VMManager(service_name="ec2",
+                              region_name=None,
+                              ec2_client=fake_ec2_backend,
+                              ec2_request_governor=ec2_request_governor,
+                              revocation_coalescing_window_in_seconds=revocation_coalescing_window_in_seconds)
+        start_time = perf_counter()
+        number_of_failed_revocations = run_revocations(ec2vmm, instances_id_list, max_concurrent_revocations)
+        elapsed_time = perf_counter() - start_time
+        print("{0:<20} \t {1} \t\t {2} \t\t {3} \t\t {4}".format(request_layer_name,
+                                                               fake_ec2_backend.get_api_calls_counter(),
+                                                               fake_ec2_backend.get_throttled_api_calls_counter(),
+                                                               number_of_failed_revocations,
+                                                               round(elapsed_time, 3)))
+
+
+if __name__ == "__main__":
+    main(argv)
@@ -0,0 +1,53 @@
+from simulation.fake_ec2_backend import FakeEC2Backend
+from sys import argv
+from time import perf_counter
+from vm_manager.ec2_vm_manager import EC2VMManager
+
+
+def run_per_instance_lookup(fake_ec2_backend: FakeEC2Backend,
+                            instances_id_list: list) -> dict:
+    # Former lookup path: one lazy DescribeInstances call per ec2.Instance resource
+    active_ec2_instances_states_dict = {}
+    for instance_id in instances_id_list:
+        response = fake_ec2_backend.describe_instances(InstanceIds=[instance_id])
+        instance = response["Reservations"][0]["Instances"][0]
+        if instance["State"]["Name"] == "running":
+            active_ec2_instances_states_dict[instance_id] = instance["State"]["Name"]
+    return active_ec2_instances_states_dict
+
+
+def run_batched_lookup(fake_ec2_backend: FakeEC2Backend,
+                       instances_id_list: list,
+                       describe_instances_max_workers: int) -> dict:
+    ec2vmm = EC2VMManager(service_name="ec2",
+                          region_name=None,
+                          describe_instances_max_workers=describe_instances_max_workers,
+                          ec2_client=fake_ec2_backend)
+    return ec2vmm.get_active_ec2_instances_states_dict(instances_id_list)
+
+
+def main(argv_list: list) -> None:
+    api_call_latency_in_seconds = float(argv_list[1]) if len(argv_list) > 1 else 0.001
+    fleet_sizes_list = [10, 100, 1000, 5000]
+    print("API Call Latency: {0} s".format(api_call_latency_in_seconds))
+    print("Fleet Size \t Lookup \t\t API Calls \t Elapsed Time (s)")
+    for fleet_size in fleet_sizes_list:
+        instances_id_list = ["i-{0:017x}".format(index) for index in range(fleet_size)]
+        lookups_list = [("per-instance", lambda backend: run_per_instance_lookup(backend, instances_id_list)),
+                        ("batched", lambda backend: run_batched_lookup(backend, instances_id_list, 1)),
+                        ("batched x4", lambda backend: run_batched_lookup(backend, instances_id_list, 4))]
+        for lookup_name, lookup_function in lookups_list:
+            fake_ec2_backend = FakeEC2Backend(instances_id_list=instances_id_list,
+                                              api_call_latency_in_seconds=api_call_latency_in_seconds)
+            start_time = perf_counter()
+            active_ec2_instances_states_dict = lookup_function(fake_ec2_backend)
+            elapsed_time = perf_counter() - start_time
+            assert len(active_ec2_instances_states_dict) == fleet_size
+            print("{0} \t\t {1:<12} \t {2} \t\t {3}".format(fleet_size,
+                                                          lookup_name,
+                                                          fake_ec2_backend.get_api_calls_counter(),
+                                                          round(elapsed_time, 4)))
+
+
+if __name__ == "__main__":
+    main(argv)
@@ -0,0 +1,106 @@
+from csv import reader
+from pathlib import Path
+from random import Random
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Callable
+from vm_revoker.revocation_trace import convert_csv_trace_to_binary, generate_trace_replay_arrivals, RevocationTrace
+
+
+def write_synthetic_csv_trace(csv_trace_file: Path,
+                              number_of_interruptions: int) -> float:
+    # Returns the trace's length in seconds
+    random_generator = Random(42)
+    instance_types_list = ["m5.large", "c5.xlarge", "r5.2xlarge", "t3.medium"]
+    availability_zones_list = ["us-east-1a", "us-east-1b", "us-east-1c"]
+    timestamp = 1.6e9
+    with open(csv_trace_file, mode="w", buffering=1 << 20) as csv_trace:
+        csv_trace.write("timestamp,instance_type,availability_zone\n")
+        for _ in range(number_of_interruptions):
+            timestamp += random_generator.expovariate(1 / 30)
+            csv_trace.write("{0:.3f},{1},{2}\n".format(timestamp,
+                                                       random_generator.choice(instance_types_list),
+                                                       random_generator.choice(availability_zones_list)))
+    return timestamp - 1.6e9
+
+
+def load_lists_trace(csv_trace_file: Path) -> list:
+    # Former loading path: the whole trace parsed into a list before replaying it
+    with open(csv_trace_file, mode="r") as csv_trace:
+        rows_iterator = reader(csv_trace)
+        next(rows_iterator)
+        return [(float(row[0]), row[1], row[2]) for row in rows_iterator]
+
+
+def replay_trace(trace_file: Path,
+                 trace_file_format: str,
+                 start_offset_in_seconds: float) -> tuple:
+    # Returns (time to the first arrival, number of arrivals, time to replay them all)
+    start_time = perf_counter()
+    revocation_trace = RevocationTrace(trace_file=trace_file,
+                                       trace_file_format=trace_file_format)
+    revocation_trace.open()
+    arrivals = generate_trace_replay_arrivals(revocation_trace=revocation_trace,
+                                              start_offset_in_seconds=start_offset_in_seconds,
+                                              time_scale_factor=1.0,
+                                              instance_types_list=["m5.large"])
+    next(arrivals)
+    time_to_first_arrival = perf_counter() - start_time
+    number_of_arrivals = 1 + sum(1 for _ in arrivals)
+    replay_time = perf_counter() - start_time
+    revocation_trace.close()
+    return time_to_first_arrival, number_of_arrivals, replay_time
+
+
+def measure_peak_memory(function: Callable[..., Any],
+                        *function_arguments: Any) -> int:
+    start()
+    function(*function_arguments)
+    _, peak_memory = get_traced_memory()
+    stop()
+    return peak_memory
+
+
+def main(argv_list: list) -> None:
+    number_of_interruptions = int(argv_list[1]) if len(argv_list) > 1 else 1000000
+    with TemporaryDirectory() as temporary_directory:
+        csv_trace_file = Path(temporary_directory).joinpath("trace.csv")
+        binary_trace_file = Path(temporary_directory).joinpath("trace.bin")
+        trace_length_in_seconds = write_synthetic_csv_trace(csv_trace_file, number_of_interruptions)
+        convert_csv_trace_to_binary(csv_trace_file, binary_trace_file)
+        print("Interruptions: {0} (CSV: {1} MB, binary: {2} MB), replaying m5.large ones"
+              .format(number_of_interruptions,
+                      round(csv_trace_file.stat().st_size / 2 ** 20, 1),
+                      round(binary_trace_file.stat().st_size / 2 ** 20, 1)))
+        print("Reading Path \t\t Start Offset \t First Arrival (s) \t Arrivals \t Replay Time (s) \t Peak Memory (MB)")
+        # Timings are measured untraced (tracing allocations slows the allocation-heavy paths down unevenly)
+        start_time = perf_counter()
+        number_of_arrivals = sum(1 for interruption in load_lists_trace(csv_trace_file)
+                                 if interruption[1] == "m5.large")
+        load_time = perf_counter() - start_time
+        peak_memory = measure_peak_memory(load_lists_trace, csv_trace_file)
+        print("{0:<16} \t {1} \t\t {2} \t\t {3} \t {4} \t\t {5}".format("csv (lists)",
+                                                                      "0%",
+                                                                      round(load_time, 3),
+                                                                      number_of_arrivals,
+                                                                      round(load_time, 3),
+                                                                      round(peak_memory / 2 ** 20, 2)))
+        for trace_file, trace_file_format in [(csv_trace_file, "csv"), (binary_trace_file, "binary")]:
+            for start_offset_ratio in [0.0, 0.9]:
+                start_offset_in_seconds = start_offset_ratio * trace_length_in_seconds
+                time_to_first_arrival, number_of_arrivals, replay_time = \
+                    replay_trace(trace_file, trace_file_format, start_offset_in_seconds)
+                peak_memory = measure_peak_memory(replay_trace, trace_file, trace_file_format, start_offset_in_seconds)
+                print("{0:<16} \t {1} \t\t {2} \t\t {3} \t {4} \t\t {5}"
+                      .format(trace_file_format + " (mmap)",
+                              "{0}%".format(int(start_offset_ratio * 100)),
+                              round(time_to_first_arrival, 6),
+                              number_of_arrivals,
+                              round(replay_time, 3),
+                              round(peak_memory / 2 ** 20, 2)))
+
+
+if __name__ == "__main__":
+    main(argv)
@@ -0,0 +1,31 @@
+from pathlib import Path
+from sys import argv
+from util.util import validate_number_of_arguments_provided, validate_file_existence
+from vm_revoker.revocation_trace import convert_csv_trace_to_binary
+
+
+def main(argv_list: list) -> None:
+    # Begin
+    # Validate number of arguments provided
+    number_of_arguments_expected = 2
+    arguments_expected_list = ["csv_trace_file", "binary_trace_file"]
+    validate_number_of_arguments_provided(argv_list,
+                                          number_of_arguments_expected,
+                                          arguments_expected_list)
+    # Get CSV trace file
+    csv_trace_file = Path(argv_list[1]).resolve()
+    # Validate CSV trace file existence
+    validate_file_existence(csv_trace_file)
+    # Get binary trace file
+    binary_trace_file = Path(argv_list[2]).resolve()
+    # Convert the CSV trace to the binary format (replayed with 'trace_file_format = binary')
+    number_of_interruptions = convert_csv_trace_to_binary(csv_trace_file, binary_trace_file)
+    print("Converted {0} interruptions from '{1}' to '{2}'.".format(number_of_interruptions,
+                                                                     csv_trace_file,
+                                                                     binary_trace_file))
+    # End
+    exit(0)
+
+
+if __name__ == "__main__":
+    main(argv)
@@ -1,8 +1,242 @@
+from configparser import ConfigParser
 from pathlib import Path
 from sys import argv
+from typing import Any
 from util.util import validate_number_of_arguments_provided, validate_file_existence, load_config_parser, \
     get_value_from_sections_key, create_directory
+from vm_revoker.poisson_ensemble_runner import PoissonEnsembleRunner
 from vm_revoker.poisson_vm_revoker import PoissonVMRevoker
+from vm_revoker.rate_profile import ConstantRateProfile, DiurnalRateProfile, PiecewiseRateProfile
+from vm_revoker.trace_replay_vm_revoker import TraceReplayVMRevoker
+from vm_revoker.vm_fleet import VMFleet
+
+
+def get_lambda_rate(average_time_between_events_in_seconds: float) -> float:
+    # Fleets of the trace replay model have no event rate (None)
+    if average_time_between_events_in_seconds is None:
+        return None
+    if average_time_between_events_in_seconds <= 0:
+        invalid_average_time_message = "The average time between events in seconds must be positive ({0} given)!" \
+            .format(average_time_between_events_in_seconds)
+        raise ValueError(invalid_average_time_message)
+    return 1 / average_time_between_events_in_seconds
+
+
+def get_segment_lambda_rate(segment_average_time_between_events: str) -> float:
+    # 'none' declares a quiet segment (no event arrives during it, λ = 0)
+    if segment_average_time_between_events.strip() == "none":
+        return 0.0
+    return get_lambda_rate(float(segment_average_time_between_events))
+
+
+def get_rate_profile(vm_revoker_config_parser: ConfigParser,
+                     average_time_between_events_in_seconds: float,
+                     segments_rate_scale_factor: float = 1.0) -> Any:
+    # The piecewise segments' rates are multiplied by the scale factor (fleets overriding the average time between
+    # events keep the segments' shape, at their own mean), while the other profiles follow the average directly
+    # Fleets of the trace replay model have no rate profile (None)
+    if average_time_between_events_in_seconds is None:
+        return None
+    # Get rate profile
+    rate_profile_name = \
+        str(get_value_from_sections_key(vm_revoker_config_parser,
+                                        "Poisson Distribution Model Settings",
+                                        "rate_profile",
+                                        "constant"))
+    rate_profile = ConstantRateProfile(lambda_rate=get_lambda_rate(average_time_between_events_in_seconds))
+    if rate_profile_name == "piecewise":
+        # Get rate profile segments (start time in seconds: average time between events in seconds, or 'none' for
+        # a quiet segment)
+        rate_profile_segments = \
+            str(get_value_from_sections_key(vm_revoker_config_parser,
+                                            "Poisson Distribution Model Settings",
+                                            "rate_profile_segments"))
+        segments_list = []
+        for segment in rate_profile_segments.split(","):
+            segment_start_time, segment_average_time_between_events = segment.split(":")
+            segments_list.append((float(segment_start_time),
+                                  get_segment_lambda_rate(segment_average_time_between_events)
+                                  * segments_rate_scale_factor))
+        # Get rate profile period in seconds
+        rate_profile_period_in_seconds = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Poisson Distribution Model Settings",
+                                              "rate_profile_period_in_seconds"))
+        rate_profile = PiecewiseRateProfile(segments_list=segments_list,
+                                            period_in_seconds=rate_profile_period_in_seconds)
+    elif rate_profile_name == "diurnal":
+        # Get rate profile amplitude
+        rate_profile_amplitude = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Poisson Distribution Model Settings",
+                                              "rate_profile_amplitude"))
+        # Get rate profile period in seconds
+        rate_profile_period_in_seconds = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Poisson Distribution Model Settings",
+                                              "rate_profile_period_in_seconds"))
+        # Get rate profile phase in seconds
+        rate_profile_phase_in_seconds = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Poisson Distribution Model Settings",
+                                              "rate_profile_phase_in_seconds"))
+        rate_profile = DiurnalRateProfile(lambda_rate=get_lambda_rate(average_time_between_events_in_seconds),
+                                          amplitude=rate_profile_amplitude,
+                                          period_in_seconds=rate_profile_period_in_seconds,
+                                          phase_in_seconds=rate_profile_phase_in_seconds)
+    return rate_profile
+
+
+def get_values_list(values: str) -> list:
+    # 'none' (no value) or 'value1, value2, ...'
+    if values == "none":
+        return None
+    return [value.strip() for value in values.split(",") if value.strip()]
+
+
+def get_discovery_filters_list(vm_discovery_filters: str) -> list:
+    # 'none' (VMs loaded from a file) or 'name=value1,value2; ...' (e.g., 'tag:Fleet=spot; instance-type=m5.large')
+    if vm_discovery_filters == "none":
+        return None
+    discovery_filters_list = []
+    for discovery_filter in filter(None, vm_discovery_filters.split(";")):
+        filter_name, filter_values = discovery_filter.split("=", 1)
+        discovery_filters_list.append({"Name": filter_name.strip(),
+                                       "Values": [value.strip() for value in filter_values.split(",")]})
+    return discovery_filters_list
+
+
+def load_vm_fleet_vms_list(vm_fleet: VMFleet,
+                           vm_instances_ids_list_file: str) -> None:
+    # Discovered fleets may have no VM instances ids list file ('none')
+    if vm_instances_ids_list_file == "none" and vm_fleet.get_discovery_filters_list() is not None:
+        return
+    vm_instances_ids_list_file = Path(vm_instances_ids_list_file).resolve()
+    # Validate VM instances ids list file existence
+    validate_file_existence(vm_instances_ids_list_file)
+    vm_fleet.load_vm_instances_ids_list_from_file(vm_instances_ids_list_file)
+
+
+def get_vm_fleets_list(vm_revoker_config_parser: ConfigParser,
+                       default_vm_instances_ids_list_file: str,
+                       default_vm_discovery_filters: str,
+                       default_average_time_between_events_in_seconds: float,
+                       default_vms_revoking_behavior: str) -> list:
+    # The default average time between events in seconds is None for the trace replay model (no event rate)
+    vm_fleets_list = []
+    # Each '[Fleet <name>]' section declares a fleet, with its own region, VMs, event rate and revoking behavior
+    for section in vm_revoker_config_parser.sections():
+        if not section.startswith("Fleet "):
+            continue
+        # Get fleet region name ('default' runs the fleet in the AWS config file's region)
+        region_name = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                      section,
+                                                      "region_name",
+                                                      "default"))
+        # Get fleet VM instances ids list file
+        vm_instances_ids_list_file = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                     section,
+                                                                     "vm_instances_ids_list_file"))
+        # Get fleet VM discovery filters
+        vm_discovery_filters = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                               section,
+                                                               "vm_discovery_filters",
+                                                               "none"))
+        # Get fleet average time between events in seconds (Poisson model only)
+        average_time_between_events_in_seconds = None
+        if default_average_time_between_events_in_seconds is not None:
+            average_time_between_events_in_seconds = \
+                float(get_value_from_sections_key(vm_revoker_config_parser,
+                                                  section,
+                                                  "average_time_between_events_in_seconds",
+                                                  str(default_average_time_between_events_in_seconds)))
+        # Get fleet segments rate scale factor (a fleet with half the default average time between events doubles
+        # each piecewise segment's rate)
+        segments_rate_scale_factor = 1.0
+        if average_time_between_events_in_seconds is not None:
+            segments_rate_scale_factor = \
+                default_average_time_between_events_in_seconds * get_lambda_rate(average_time_between_events_in_seconds)
+        # Get fleet VMs revoking behavior
+        vms_revoking_behavior = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                section,
+                                                                "vms_revoking_behavior",
+                                                                default_vms_revoking_behavior))
+        vm_fleet = VMFleet(fleet_name=section[len("Fleet "):].strip(),
+                           region_name=None if region_name == "default" else region_name,
+                           average_time_between_events_in_seconds=average_time_between_events_in_seconds,
+                           lambda_rate=get_lambda_rate(average_time_between_events_in_seconds),
+                           rate_profile=get_rate_profile(vm_revoker_config_parser,
+                                                         average_time_between_events_in_seconds,
+                                                         segments_rate_scale_factor),
+                           vms_revoking_behavior=vms_revoking_behavior,
+                           discovery_filters_list=get_discovery_filters_list(vm_discovery_filters))
+        load_vm_fleet_vms_list(vm_fleet, vm_instances_ids_list_file)
+        vm_fleets_list.append(vm_fleet)
+    # No fleet declared: a single fleet, from the Input, General and Poisson (if any) settings
+    if not vm_fleets_list:
+        vm_fleet = VMFleet(fleet_name="default",
+                           region_name=None,
+                           average_time_between_events_in_seconds=default_average_time_between_events_in_seconds,
+                           lambda_rate=get_lambda_rate(default_average_time_between_events_in_seconds),
+                           rate_profile=get_rate_profile(vm_revoker_config_parser,
+                                                         default_average_time_between_events_in_seconds),
+                           vms_revoking_behavior=default_vms_revoking_behavior,
+                           discovery_filters_list=get_discovery_filters_list(default_vm_discovery_filters))
+        load_vm_fleet_vms_list(vm_fleet, default_vm_instances_ids_list_file)
+        vm_fleets_list.append(vm_fleet)
+    return vm_fleets_list
+
+
+def get_stopping_criterion_and_batch_size_settings_dict(vm_revoker_config_parser: ConfigParser,
+                                                        model_settings_section: str,
+                                                        default_stopping_criterion: str = None) -> dict:
+    # Both discrete probability distribution models share these settings, each in its own section (keyword
+    # arguments of the VM revokers and of the ensemble runner)
+    # Get stopping criterion (required if there is no default stopping criterion)
+    stopping_criterion = \
+        str(get_value_from_sections_key(vm_revoker_config_parser,
+                                        model_settings_section,
+                                        "stopping_criterion",
+                                        default_stopping_criterion))
+    # Get stopping criterion value
+    max_observation_length_in_seconds = None
+    max_number_of_observable_events = None
+    if stopping_criterion == "max_observation_length_in_seconds":
+        # Get max observation length in seconds
+        max_observation_length_in_seconds = \
+            int(get_value_from_sections_key(vm_revoker_config_parser,
+                                            model_settings_section,
+                                            "max_observation_length_in_seconds"))
+    elif stopping_criterion == "max_number_of_observable_events":
+        # Get max number of observable events
+        max_number_of_observable_events = \
+            int(get_value_from_sections_key(vm_revoker_config_parser,
+                                            model_settings_section,
+                                            "max_number_of_observable_events"))
+    # Get batch size distribution
+    batch_size_distribution_name = \
+        str(get_value_from_sections_key(vm_revoker_config_parser,
+                                        model_settings_section,
+                                        "batch_size_distribution",
+                                        "constant"))
+    # Get batch size mean
+    batch_size_mean = \
+        float(get_value_from_sections_key(vm_revoker_config_parser,
+                                          model_settings_section,
+                                          "batch_size_mean",
+                                          "1"))
+    # Get batch size max
+    batch_size_max = \
+        int(get_value_from_sections_key(vm_revoker_config_parser,
+                                        model_settings_section,
+                                        "batch_size_max",
+                                        "1000"))
+    return {"stopping_criterion": stopping_criterion,
+            "max_number_of_observable_events": max_number_of_observable_events,
+            "max_observation_length_in_seconds": max_observation_length_in_seconds,
+            "batch_size_distribution_name": batch_size_distribution_name,
+            "batch_size_mean": batch_size_mean,
+            "batch_size_max": batch_size_max}
 
 
 def main(argv_list: list) -> None:
@@ -19,20 +253,64 @@ def main(argv_list: list) -> None:
     validate_file_existence(vm_revoker_config_file)
     # Load ConfigParser for VM Revoker config file
     vm_revoker_config_parser = load_config_parser(vm_revoker_config_file)
+    # Get execution mode
+    execution_mode = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                     "General Settings",
+                                                     "execution_mode",
+                                                     "live"))
     # Get AWS config file
     aws_config_file = \
         Path(get_value_from_sections_key(vm_revoker_config_parser,
                                          "AWS Settings",
                                          "aws_config_file")).resolve()
-    # Validate AWS config file existence
-    validate_file_existence(aws_config_file)
-    # Get VM instances ids list file
-    vm_instances_ids_list_file = \
-        Path(get_value_from_sections_key(vm_revoker_config_parser,
-                                         "Input Settings",
-                                         "vm_instances_ids_list_file")).resolve()
-    # Validate VM instances ids list file existence
-    validate_file_existence(vm_instances_ids_list_file)
+    # Validate AWS config file existence (the simulated execution mode does not reach AWS)
+    if execution_mode == "live":
+        validate_file_existence(aws_config_file)
+    # Get DescribeInstances max workers
+    describe_instances_max_workers = \
+        int(get_value_from_sections_key(vm_revoker_config_parser,
+                                        "AWS Settings",
+                                        "describe_instances_max_workers",
+                                        "4"))
+    # Get API request rate limits (API name: token bucket capacity: refill rate per second)
+    api_request_rate_limits = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                              "AWS Settings",
+                                                              "api_request_rate_limits",
+                                                              ""))
+    api_request_rate_limits_dict = {}
+    for api_request_rate_limit in filter(None, api_request_rate_limits.split(",")):
+        api_name, capacity, refill_rate_per_second = api_request_rate_limit.split(":")
+        api_request_rate_limits_dict[api_name.strip()] = (float(capacity), float(refill_rate_per_second))
+    # Get throttling max attempts
+    throttling_max_attempts = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                              "AWS Settings",
+                                                              "throttling_max_attempts",
+                                                              "8"))
+    # Get throttling base backoff in seconds
+    throttling_base_backoff_in_seconds = float(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                           "AWS Settings",
+                                                                           "throttling_base_backoff_in_seconds",
+                                                                           "0.1"))
+    # Get throttling max backoff in seconds
+    throttling_max_backoff_in_seconds = float(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                          "AWS Settings",
+                                                                          "throttling_max_backoff_in_seconds",
+                                                                          "20"))
+    # Get revocation coalescing window in seconds
+    revocation_coalescing_window_in_seconds = \
+        float(get_value_from_sections_key(vm_revoker_config_parser,
+                                          "AWS Settings",
+                                          "revocation_coalescing_window_in_seconds",
+                                          "0"))
+    # Get VM instances ids list file ('none' for discovered fleets)
+    vm_instances_ids_list_file = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                 "Input Settings",
+                                                                 "vm_instances_ids_list_file"))
+    # Get VM discovery filters ('none' to load the VMs from the VM instances ids list file only)
+    vm_discovery_filters = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                           "Input Settings",
+                                                           "vm_discovery_filters",
+                                                           "none"))
     # Get logging directory
     logging_directory = \
         Path(get_value_from_sections_key(vm_revoker_config_parser,
@@ -40,59 +318,291 @@ def main(argv_list: list) -> None:
                                          "logging_directory")).resolve()
     # Create logging directory (if needed)
     create_directory(logging_directory)
+    # Get metrics exporter
+    metrics_exporter = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                       "Output Settings",
+                                                       "metrics_exporter",
+                                                       "none"))
+    # Get metrics textfile
+    metrics_textfile = \
+        Path(get_value_from_sections_key(vm_revoker_config_parser,
+                                         "Output Settings",
+                                         "metrics_textfile",
+                                         "./logging/vm_revoker.prom")).resolve()
+    # Get metrics HTTP port
+    metrics_http_port = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                        "Output Settings",
+                                                        "metrics_http_port",
+                                                        "9108"))
+    # Get metrics HTTP host (the loopback interface by default, as the metrics endpoint is not authenticated)
+    metrics_http_host = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                        "Output Settings",
+                                                        "metrics_http_host",
+                                                        "127.0.0.1"))
+    # Get metrics export interval in seconds
+    metrics_export_interval_in_seconds = float(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                           "Output Settings",
+                                                                           "metrics_export_interval_in_seconds",
+                                                                           "15"))
+    # Get event log format
+    event_log_format = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                       "Output Settings",
+                                                       "event_log_format",
+                                                       "none"))
+    # Get checkpoint file ('none' not to save the session's checkpoints)
+    checkpoint_file = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                      "Output Settings",
+                                                      "checkpoint_file",
+                                                      "none"))
+    checkpoint_file = Path(checkpoint_file).resolve() if checkpoint_file != "none" else None
+    # Get checkpoint interval in seconds
+    checkpoint_interval_in_seconds = float(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                       "Output Settings",
+                                                                       "checkpoint_interval_in_seconds",
+                                                                       "60"))
+    # Get resume from checkpoint (true to resume the session saved to the checkpoint file)
+    resume_from_checkpoint = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                             "General Settings",
+                                                             "resume_from_checkpoint",
+                                                             "false")) == "true"
     # Get VMs revoking behavior
     vms_revoking_behavior = str(get_value_from_sections_key(vm_revoker_config_parser,
                                                             "General Settings",
                                                             "vms_revoking_behavior"))
+    # Get victim selection group attribute
+    victim_selection_group_attribute = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                       "General Settings",
+                                                                       "victim_selection_group_attribute",
+                                                                       "none"))
+    # Get victim selection groups weights (group: weight)
+    victim_selection_groups_weights_dict = {}
+    if victim_selection_group_attribute != "none":
+        victim_selection_groups_weights = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                          "General Settings",
+                                                                          "victim_selection_groups_weights",
+                                                                          ""))
+        for group_weight in filter(None, victim_selection_groups_weights.split(",")):
+            group_key, weight = group_weight.split(":")
+            victim_selection_groups_weights_dict[group_key.strip()] = float(weight)
+    # Get overdue event policy
+    overdue_event_policy = str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                           "General Settings",
+                                                           "overdue_event_policy",
+                                                           "fire_immediately"))
+    # Get overdue event tolerance in seconds
+    overdue_event_tolerance_in_seconds = float(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                           "General Settings",
+                                                                           "overdue_event_tolerance_in_seconds",
+                                                                           "1"))
+    # Get max concurrent revocations
+    max_concurrent_revocations = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                 "General Settings",
+                                                                 "max_concurrent_revocations",
+                                                                 "8"))
+    # Get fleet state refresh interval in seconds
+    fleet_state_refresh_interval_in_seconds = \
+        float(get_value_from_sections_key(vm_revoker_config_parser,
+                                          "General Settings",
+                                          "fleet_state_refresh_interval_in_seconds",
+                                          "30"))
+    # Get fleet state max staleness in seconds
+    fleet_state_max_staleness_in_seconds = \
+        float(get_value_from_sections_key(vm_revoker_config_parser,
+                                          "General Settings",
+                                          "fleet_state_max_staleness_in_seconds",
+                                          "120"))
+    # Get fleet membership full resync interval in seconds
+    fleet_membership_full_resync_interval_in_seconds = \
+        float(get_value_from_sections_key(vm_revoker_config_parser,
+                                          "General Settings",
+                                          "fleet_membership_full_resync_interval_in_seconds",
+                                          "600"))
     # Get discrete probability distribution model
     discrete_probability_distribution_model = \
         get_value_from_sections_key(vm_revoker_config_parser,
                                     "General Settings",
                                     "discrete_probability_distribution_model")
+    # VM revokers' settings shared by both discrete probability distribution models
+    vm_revoker_settings_dict = {"victim_selection_group_attribute": victim_selection_group_attribute,
+                                "victim_selection_groups_weights_dict": victim_selection_groups_weights_dict,
+                                "overdue_event_policy": overdue_event_policy,
+                                "overdue_event_tolerance_in_seconds": overdue_event_tolerance_in_seconds,
+                                "max_concurrent_revocations": max_concurrent_revocations,
+                                "fleet_state_refresh_interval_in_seconds": fleet_state_refresh_interval_in_seconds,
+                                "fleet_state_max_staleness_in_seconds": fleet_state_max_staleness_in_seconds,
+                                "fleet_membership_full_resync_interval_in_seconds":
+                                    fleet_membership_full_resync_interval_in_seconds,
+                                "execution_mode": execution_mode,
+                                "aws_config_file": aws_config_file,
+                                "describe_instances_max_workers": describe_instances_max_workers,
+                                "api_request_rate_limits_dict": api_request_rate_limits_dict,
+                                "throttling_max_attempts": throttling_max_attempts,
+                                "throttling_base_backoff_in_seconds": throttling_base_backoff_in_seconds,
+                                "throttling_max_backoff_in_seconds": throttling_max_backoff_in_seconds,
+                                "revocation_coalescing_window_in_seconds": revocation_coalescing_window_in_seconds,
+                                "metrics_exporter": metrics_exporter,
+                                "metrics_textfile": metrics_textfile,
+                                "metrics_http_port": metrics_http_port,
+                                "metrics_http_host": metrics_http_host,
+                                "metrics_export_interval_in_seconds": metrics_export_interval_in_seconds,
+                                "event_log_format": event_log_format,
+                                "checkpoint_file": checkpoint_file,
+                                "checkpoint_interval_in_seconds": checkpoint_interval_in_seconds,
+                                "resume_from_checkpoint": resume_from_checkpoint,
+                                "logging_directory": logging_directory}
+    # Whether the revocation session completed (a failed monitoring and revoking thread exits with a non-zero status)
+    session_completed = True
     # Poisson discrete probability distribution
     if discrete_probability_distribution_model == "Poisson":
         # Get average time between events in seconds
         average_time_between_events_in_seconds = \
-            int(get_value_from_sections_key(vm_revoker_config_parser,
-                                            "Poisson Distribution Model Settings",
-                                            "average_time_between_events_in_seconds"))
-        # Get stopping criterion
-        stopping_criterion = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Poisson Distribution Model Settings",
+                                              "average_time_between_events_in_seconds"))
+        # Get stopping criterion and batch size settings
+        model_settings_dict = \
+            get_stopping_criterion_and_batch_size_settings_dict(vm_revoker_config_parser,
+                                                                "Poisson Distribution Model Settings")
+        # Get arrival schedule mode
+        arrival_schedule_mode = \
             str(get_value_from_sections_key(vm_revoker_config_parser,
                                             "Poisson Distribution Model Settings",
-                                            "stopping_criterion"))
-        # Get stopping criterion value
-        max_observation_length_in_seconds = None
-        max_number_of_observable_events = None
-        if stopping_criterion == "max_observation_length_in_seconds":
-            # Get max observation length in seconds
-            max_observation_length_in_seconds = \
-                int(get_value_from_sections_key(vm_revoker_config_parser,
-                                                "Poisson Distribution Model Settings",
-                                                "max_observation_length_in_seconds"))
-        elif stopping_criterion == "max_number_of_observable_events":
-            # Get max number of observable events
-            max_number_of_observable_events = \
-                int(get_value_from_sections_key(vm_revoker_config_parser,
-                                                "Poisson Distribution Model Settings",
-                                                "max_number_of_observable_events"))
-        # Init PoissonVMRevoker object
-        pvmr = PoissonVMRevoker(average_time_between_events_in_seconds=average_time_between_events_in_seconds,
-                                lambda_rate=(1 / average_time_between_events_in_seconds),
-                                stopping_criterion=stopping_criterion,
-                                max_number_of_observable_events=max_number_of_observable_events,
-                                max_observation_length_in_seconds=max_observation_length_in_seconds,
-                                vms_revoking_behavior=vms_revoking_behavior,
-                                aws_config_file=aws_config_file,
-                                logging_directory=logging_directory)
-        # Generate inter-arrival times and arrival times lists, and start monitoring and revoking the VMs (if any)
-        pvmr.start()
-        # Load VM instances ids list
-        pvmr.load_vm_instances_ids_list_from_file(vm_instances_ids_list_file)
-        # Delete PoissonVMRevoker object
-        del pvmr
+                                            "arrival_schedule_mode",
+                                            "precomputed"))
+        # Monte Carlo ensemble of the Poisson scenario
+        if execution_mode == "ensemble":
+            # Get fleet size
+            fleet_size = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                         "Ensemble Settings",
+                                                         "fleet_size"))
+            # Get number of replications
+            number_of_replications = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                     "Ensemble Settings",
+                                                                     "number_of_replications"))
+            # Get number of workers
+            number_of_workers = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                "Ensemble Settings",
+                                                                "number_of_workers"))
+            # Get base seed
+            base_seed = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                        "Ensemble Settings",
+                                                        "base_seed"))
+            # Get survival curve resolution
+            survival_curve_resolution = int(get_value_from_sections_key(vm_revoker_config_parser,
+                                                                        "Ensemble Settings",
+                                                                        "survival_curve_resolution"))
+            # The ensemble models a single fleet, of fleet_size VMs
+            if any(section.startswith("Fleet ") for section in vm_revoker_config_parser.sections()):
+                raise ValueError("The ensemble execution mode models a single fleet. Remove the '[Fleet <name>]' "
+                                 "sections to run it!")
+            # Init PoissonEnsembleRunner object
+            per = PoissonEnsembleRunner(average_time_between_events_in_seconds=average_time_between_events_in_seconds,
+                                        lambda_rate=get_lambda_rate(average_time_between_events_in_seconds),
+                                        rate_profile=get_rate_profile(vm_revoker_config_parser,
+                                                                      average_time_between_events_in_seconds),
+                                        fleet_size=fleet_size,
+                                        number_of_replications=number_of_replications,
+                                        number_of_workers=number_of_workers,
+                                        base_seed=base_seed,
+                                        survival_curve_resolution=survival_curve_resolution,
+                                        logging_directory=logging_directory,
+                                        **model_settings_dict)
+            # Run the replications and print the aggregated results
+            per.start()
+            # Delete PoissonEnsembleRunner object
+            del per
+        # Poisson process revoking the VMs of the fleets
+        else:
+            # Get VM fleets (VM instances ids lists loaded before starting, so the monitoring thread never lacks them)
+            vm_fleets_list = get_vm_fleets_list(vm_revoker_config_parser,
+                                                vm_instances_ids_list_file,
+                                                vm_discovery_filters,
+                                                average_time_between_events_in_seconds,
+                                                vms_revoking_behavior)
+            # Init PoissonVMRevoker object
+            pvmr = PoissonVMRevoker(fleets_list=vm_fleets_list,
+                                    arrival_schedule_mode=arrival_schedule_mode,
+                                    **model_settings_dict,
+                                    **vm_revoker_settings_dict)
+            # Generate inter-arrival times and arrival times lists, and start monitoring and revoking the VMs (if any)
+            pvmr.start()
+            # Wait for the monitoring and revoking thread to complete
+            session_completed = pvmr.wait_for_completion()
+            # Delete PoissonVMRevoker object
+            del pvmr
+    # Trace replay of real interruptions
+    elif discrete_probability_distribution_model == "TraceReplay":
+        # Get trace file
+        trace_file = \
+            Path(get_value_from_sections_key(vm_revoker_config_parser,
+                                             "Trace Replay Model Settings",
+                                             "trace_file")).resolve()
+        # Validate trace file existence
+        validate_file_existence(trace_file)
+        # Get trace file format
+        trace_file_format = \
+            str(get_value_from_sections_key(vm_revoker_config_parser,
+                                            "Trace Replay Model Settings",
+                                            "trace_file_format",
+                                            "csv"))
+        # Get trace time scale factor
+        trace_time_scale_factor = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Trace Replay Model Settings",
+                                              "trace_time_scale_factor",
+                                              "1"))
+        # Validate trace time scale factor (0 collapses the trace's times, and a negative one reverses them)
+        if trace_time_scale_factor <= 0:
+            invalid_trace_time_scale_factor_message = "The trace time scale factor must be positive ({0} given)!" \
+                .format(trace_time_scale_factor)
+            raise ValueError(invalid_trace_time_scale_factor_message)
+        # Get trace start offset in seconds
+        trace_start_offset_in_seconds = \
+            float(get_value_from_sections_key(vm_revoker_config_parser,
+                                              "Trace Replay Model Settings",
+                                              "trace_start_offset_in_seconds",
+                                              "0"))
+        # Get trace instance types ('none' to replay the interruptions of every instance type)
+        trace_instance_types_list = \
+            get_values_list(str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                            "Trace Replay Model Settings",
+                                                            "trace_instance_types",
+                                                            "none")))
+        # Get trace availability zones ('none' to replay the interruptions of every availability zone)
+        trace_availability_zones_list = \
+            get_values_list(str(get_value_from_sections_key(vm_revoker_config_parser,
+                                                            "Trace Replay Model Settings",
+                                                            "trace_availability_zones",
+                                                            "none")))
+        # Get stopping criterion ('unbounded' replays the trace up to its end) and batch size settings
+        model_settings_dict = \
+            get_stopping_criterion_and_batch_size_settings_dict(vm_revoker_config_parser,
+                                                                "Trace Replay Model Settings",
+                                                                "unbounded")
+        # Get VM fleets (the trace replay model has no event rate)
+        vm_fleets_list = get_vm_fleets_list(vm_revoker_config_parser,
+                                            vm_instances_ids_list_file,
+                                            vm_discovery_filters,
+                                            None,
+                                            vms_revoking_behavior)
+        # Init TraceReplayVMRevoker object
+        trvmr = TraceReplayVMRevoker(trace_file=trace_file,
+                                     trace_file_format=trace_file_format,
+                                     trace_time_scale_factor=trace_time_scale_factor,
+                                     trace_start_offset_in_seconds=trace_start_offset_in_seconds,
+                                     trace_instance_types_list=trace_instance_types_list,
+                                     trace_availability_zones_list=trace_availability_zones_list,
+                                     fleets_list=vm_fleets_list,
+                                     **model_settings_dict,
+                                     **vm_revoker_settings_dict)
+        # Map the trace, and start monitoring and revoking the VMs (if any) as its interruptions are replayed
+        trvmr.start()
+        # Wait for the monitoring and revoking thread to complete
+        session_completed = trvmr.wait_for_completion()
+        # Delete TraceReplayVMRevoker object
+        del trvmr
     # End
-    exit(0)
+    exit(0 if session_completed else 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+from botocore.exceptions import ClientError
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from threading import Lock
+from time import sleep
+from util.token_bucket import TokenBucket
+
+# Instance type and availability zone of the instances with no attributes of their own
+DEFAULT_INSTANCE_ATTRIBUTES = ("t2.micro", "us-east-1a")
+# Discovery filters the simulated instances of a discovered fleet can be given the values of
+SIMULATED_DISCOVERY_FILTERS_NAMES = ["instance-type", "availability-zone", "instance-state-name"]
+
+
+class FakeEC2Backend:
+    """
+    In-process EC2 fleet backend, which implements the describe/terminate/reboot surface of the boto3 EC2 client.
+
+    instances_id_list : the IDs of the fleet's instances (all of them start in the 'running' state).
+
+    instances_attributes_dict : the instance type and availability zone of each instance, as
+    {instance ID: (instance type, availability zone)} (instances not listed get the default ones).
+
+    instances_tags_dict : the tags of each instance, as {instance ID: {tag key: tag value}}.
+
+    api_call_latency_in_seconds : the (real) latency in seconds simulated for each API call.
+
+    api_request_rate_limits_dict : the request token bucket of each API, as {API name: (capacity, refill rate per
+    second)}. Requests finding their bucket empty fail with RequestLimitExceeded, as EC2's do (None for no limits).
+    """
+    def __init__(self,
+                 instances_id_list: list,
+                 instances_attributes_dict: dict = None,
+                 instances_tags_dict: dict = None,
+                 api_call_latency_in_seconds: float = 0.0,
+                 api_request_rate_limits_dict: dict = None) -> None:
+        self.__instances_states_dict = {instance_id: "running" for instance_id in instances_id_list}
+        self.__instances_attributes_dict = instances_attributes_dict if instances_attributes_dict else {}
+        self.__instances_tags_dict = instances_tags_dict if instances_tags_dict else {}
+        launch_time = self.__get_launch_time()
+        self.__instances_launch_times_dict = {instance_id: launch_time for instance_id in instances_id_list}
+        self.__api_call_latency_in_seconds = api_call_latency_in_seconds
+        self.__api_calls_counter = 0
+        self.__throttled_api_calls_counter = 0
+        self.__token_buckets_dict = {api_name: TokenBucket(capacity=capacity,
+                                                           refill_rate_per_second=refill_rate_per_second)
+                                     for api_name, (capacity, refill_rate_per_second)
+                                     in (api_request_rate_limits_dict or {}).items()}
+        self.__lock = Lock()
+
+    def get_api_calls_counter(self) -> int:
+        return self.__api_calls_counter
+
+    def get_throttled_api_calls_counter(self) -> int:
+        return self.__throttled_api_calls_counter
+
+    def get_instance_state(self,
+                           instance_id: str) -> str:
+        return self.__instances_states_dict.get(instance_id)
+
+    @staticmethod
+    def __get_launch_time() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def launch_instances(self,
+                         instances_id_list: list,
+                         instances_tags_dict: dict = None) -> None:
+        # Simulates instances launched by an autoscaling group, so discovery has new instances to find
+        launch_time = self.__get_launch_time()
+        with self.__lock:
+            for instance_id in instances_id_list:
+                self.__instances_states_dict[instance_id] = "running"
+                self.__instances_launch_times_dict[instance_id] = launch_time
+                if instances_tags_dict:
+                    self.__instances_tags_dict[instance_id] = instances_tags_dict
+
+    def simulate_api_call(self,
+                          api_name: str) -> None:
+        with self.__lock:
+            self.__api_calls_counter += 1
+        token_bucket = self.__token_buckets_dict.get(api_name)
+        if token_bucket and not token_bucket.try_acquire():
+            with self.__lock:
+                self.__throttled_api_calls_counter += 1
+            raise ClientError({"Error": {"Code": "RequestLimitExceeded", "Message": "Request limit exceeded."}},
+                              api_name)
+        if self.__api_call_latency_in_seconds > 0:
+            sleep(self.__api_call_latency_in_seconds)
+
+    def __build_instance_description(self,
+                                     instance_id: str) -> dict:
+        instance_type, availability_zone = self.__instances_attributes_dict.get(instance_id,
+                                                                                DEFAULT_INSTANCE_ATTRIBUTES)
+        instance_tags_dict = self.__instances_tags_dict.get(instance_id, {})
+        return {"InstanceId": instance_id,
+                "InstanceType": instance_type,
+                "LaunchTime": self.__instances_launch_times_dict[instance_id],
+                "Placement": {"AvailabilityZone": availability_zone},
+                "State": {"Name": self.__instances_states_dict[instance_id]},
+                "Tags": [{"Key": key, "Value": value} for key, value in instance_tags_dict.items()]}
+
+    def __get_instance_filter_value(self,
+                                    instance_id: str,
+                                    filter_name: str) -> str:
+        if filter_name == "instance-id":
+            return instance_id
+        elif filter_name == "instance-state-name":
+            return self.__instances_states_dict[instance_id]
+        elif filter_name == "instance-type":
+            return self.__instances_attributes_dict.get(instance_id, DEFAULT_INSTANCE_ATTRIBUTES)[0]
+        elif filter_name == "availability-zone":
+            return self.__instances_attributes_dict.get(instance_id, DEFAULT_INSTANCE_ATTRIBUTES)[1]
+        elif filter_name == "launch-time":
+            return self.__instances_launch_times_dict[instance_id]
+        elif filter_name.startswith("tag:"):
+            return self.__instances_tags_dict.get(instance_id, {}).get(filter_name[len("tag:"):])
+        raise ValueError("The '{0}' filter is not supported by the FakeEC2Backend!".format(filter_name))
+
+    def __matches_filters(self,
+                          instance_id: str,
+                          filters_list: list) -> bool:
+        # As EC2 does, values of a filter are ORed (with '*' and '?' wildcards), and filters are ANDed
+        for fltr in filters_list:
+            value = self.__get_instance_filter_value(instance_id, fltr["Name"])
+            if value is None or not any(fnmatchcase(value, pattern) for pattern in fltr["Values"]):
+                return False
+        return True
+
+    def filter_instances(self,
+                         filters_list: list) -> list:
+        instances_id_filter = None
+        other_filters_list = []
+        for fltr in filters_list:
+            if fltr["Name"] == "instance-id":
+                instances_id_filter = fltr["Values"]
+            else:
+                other_filters_list.append(fltr)
+        with self.__lock:
+            instances_id_list = instances_id_filter if instances_id_filter is not None \
+                else list(self.__instances_states_dict)
+            return [self.__build_instance_description(instance_id)
+                    for instance_id in instances_id_list
+                    if instance_id in self.__instances_states_dict
+                    and self.__matches_filters(instance_id, other_filters_list)]
+
+    def describe_instances(self,
+                           InstanceIds: list = None,
+                           Filters: list = None,
+                           MaxResults: int = None,
+                           NextToken: str = None) -> dict:
+        self.simulate_api_call("describe_instances")
+        filters_list = list(Filters) if Filters else []
+        if InstanceIds:
+            filters_list.append({"Name": "instance-id", "Values": InstanceIds})
+        matching_instances_list = self.filter_instances(filters_list)
+        # The next token is the offset of the next page
+        page_start = int(NextToken) if NextToken else 0
+        page_end = page_start + MaxResults if MaxResults else len(matching_instances_list)
+        page = {"Reservations": [{"Instances": matching_instances_list[page_start:page_end]}]}
+        if page_end < len(matching_instances_list):
+            page["NextToken"] = str(page_end)
+        return page
+
+    def reboot_instances(self,
+                         InstanceIds: list) -> dict:
+        self.simulate_api_call("reboot_instances")
+        return {}
+
+    def terminate_instances(self,
+                            InstanceIds: list) -> dict:
+        self.simulate_api_call("terminate_instances")
+        terminating_instances_list = []
+        with self.__lock:
+            for instance_id in InstanceIds:
+                previous_state = self.__instances_states_dict.get(instance_id)
+                if previous_state is None:
+                    continue
+                self.__instances_states_dict[instance_id] = "terminated"
+                terminating_instances_list.append({"InstanceId": instance_id,
+                                                   "CurrentState": {"Name": "terminated"},
+                                                   "PreviousState": {"Name": previous_state}})
+        return {"TerminatingInstances": terminating_instances_list}
+
+
+def create_discovered_fleet_fake_ec2_backend(instances_id_list: list,
+                                             discovery_filters_list: list) -> FakeEC2Backend:
+    # The simulated instances carry the tags and attributes the discovery filters select, spread over the filters'
+    # values (e.g., half m5.large and half c5.xlarge instances for 'instance-type=m5.large,c5.xlarge')
+    discovery_filters_values_dict = {}
+    for fltr in discovery_filters_list:
+        if not fltr["Name"].startswith("tag:") and fltr["Name"] not in SIMULATED_DISCOVERY_FILTERS_NAMES:
+            unsupported_filter_message = \
+                "The '{0}' discovery filter is not supported by the simulate execution mode (supported: tag:<key>, " \
+                "{1})!".format(fltr["Name"], ", ".join(SIMULATED_DISCOVERY_FILTERS_NAMES))
+            raise ValueError(unsupported_filter_message)
+        discovery_filters_values_dict[fltr["Name"]] = fltr["Values"]
+    if "running" not in discovery_filters_values_dict.get("instance-state-name", ["running"]):
+        raise ValueError("The simulated instances are running, so the 'instance-state-name' discovery filter must "
+                         "select the 'running' state!")
+    instance_types_list = discovery_filters_values_dict.get("instance-type", [DEFAULT_INSTANCE_ATTRIBUTES[0]])
+    availability_zones_list = discovery_filters_values_dict.get("availability-zone", [DEFAULT_INSTANCE_ATTRIBUTES[1]])
+    instances_tags_dict = {}
+    instances_attributes_dict = {}
+    for instance_index, instance_id in enumerate(instances_id_list):
+        instances_tags_dict[instance_id] = {filter_name[len("tag:"):]:
+                                            filter_values[instance_index % len(filter_values)]
+                                            for filter_name, filter_values in discovery_filters_values_dict.items()
+                                            if filter_name.startswith("tag:")}
+        instances_attributes_dict[instance_id] = (instance_types_list[instance_index % len(instance_types_list)],
+                                                  availability_zones_list[instance_index
+                                                                          % len(availability_zones_list)])
+    return FakeEC2Backend(instances_id_list=instances_id_list,
+                          instances_attributes_dict=instances_attributes_dict,
+                          instances_tags_dict=instances_tags_dict)
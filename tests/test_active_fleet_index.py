@@ -0,0 +1,71 @@
+from random import Random
+from threading import Thread
+from vm_revoker.active_fleet_index import ActiveFleetIndex
+
+
+def test_remove_swaps_the_last_vm_into_the_removed_position() -> None:
+    active_fleet_index = ActiveFleetIndex(random_generator=Random(1))
+    for instance_id in ["i-1", "i-2", "i-3", "i-4"]:
+        active_fleet_index.add(instance_id)
+    active_fleet_index.remove("i-2")
+    active_fleet_index.remove("i-2")
+    active_fleet_index.remove("i-9")
+    assert len(active_fleet_index) == 3
+    assert "i-2" not in active_fleet_index
+    # i-4 took i-2's position, so removing it and then i-1 keeps the index consistent
+    active_fleet_index.remove("i-4")
+    active_fleet_index.remove("i-1")
+    assert len(active_fleet_index) == 1
+    assert active_fleet_index.pop_random(5) == ["i-3"]
+    assert len(active_fleet_index) == 0
+
+
+def test_apply_states_delta_adds_running_vms_and_removes_the_others() -> None:
+    active_fleet_index = ActiveFleetIndex(random_generator=Random(1))
+    active_fleet_index.apply_states_delta({"i-1": "running", "i-2": "running", "i-3": "stopped"})
+    active_fleet_index.apply_states_delta({"i-1": "terminated", "i-3": "running"})
+    assert sorted(active_fleet_index.pop_random(5)) == ["i-2", "i-3"]
+
+
+def test_pop_random_selects_distinct_vms() -> None:
+    active_fleet_index = ActiveFleetIndex(random_generator=Random(7))
+    instances_ids_list = ["i-{0}".format(i) for i in range(100)]
+    for instance_id in instances_ids_list:
+        active_fleet_index.add(instance_id)
+    selected_instances_ids_list = active_fleet_index.pop_random(60) + active_fleet_index.pop_random(60)
+    assert sorted(selected_instances_ids_list) == sorted(instances_ids_list)
+    assert active_fleet_index.pop_random(1) == []
+
+
+def test_zero_weight_groups_are_never_selected() -> None:
+    active_fleet_index = ActiveFleetIndex(random_generator=Random(3),
+                                          groups_weights_dict={"spot": 1, "on-demand": 0})
+    groups_keys_dict = {"i-{0}".format(i): "spot" if i % 2 else "on-demand" for i in range(20)}
+    active_fleet_index.apply_states_delta({instance_id: "running" for instance_id in groups_keys_dict},
+                                          groups_keys_dict)
+    selected_instances_ids_list = active_fleet_index.pop_random(20)
+    assert len(selected_instances_ids_list) == 10
+    assert all(groups_keys_dict[instance_id] == "spot" for instance_id in selected_instances_ids_list)
+    assert len(active_fleet_index) == 10
+
+
+def test_requeued_vms_are_selectable_again_in_their_group() -> None:
+    active_fleet_index = ActiveFleetIndex(random_generator=Random(5),
+                                          groups_weights_dict={"spot": 1, "on-demand": 0})
+    groups_keys_dict = {"i-1": "spot", "i-2": "on-demand"}
+    active_fleet_index.apply_states_delta({"i-1": "running", "i-2": "running"}, groups_keys_dict)
+    assert active_fleet_index.pop_random(2) == ["i-1"]
+    # The revocation of i-1 failed on a worker thread
+    requeuing_thread = Thread(target=active_fleet_index.requeue, args=(["i-1"], groups_keys_dict))
+    requeuing_thread.start()
+    requeuing_thread.join()
+    assert active_fleet_index.pop_random(2) == ["i-1"]
+
+
+def test_newer_state_changes_prevail_over_requeued_vms() -> None:
+    active_fleet_index = ActiveFleetIndex(random_generator=Random(5))
+    active_fleet_index.apply_states_delta({"i-1": "running"})
+    assert active_fleet_index.pop_random(1) == ["i-1"]
+    active_fleet_index.requeue(["i-1"])
+    active_fleet_index.apply_states_delta({"i-1": "terminated"})
+    assert len(active_fleet_index) == 0
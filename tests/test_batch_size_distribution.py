@@ -0,0 +1,47 @@
+from random import Random
+from vm_revoker.batch_size_distribution import BatchSizeDistribution
+
+
+def draw_batch_sizes(distribution_name: str,
+                     batch_size_mean: float,
+                     number_of_draws: int = 100000) -> list:
+    batch_size_distribution = BatchSizeDistribution(distribution_name=distribution_name,
+                                                    batch_size_mean=batch_size_mean,
+                                                    batch_size_max=1000,
+                                                    random_generator=Random(11))
+    return [batch_size_distribution.draw() for _ in range(number_of_draws)]
+
+
+def test_sample_means_match_non_integer_means() -> None:
+    for distribution_name in ["constant", "geometric", "poisson", "uniform"]:
+        for batch_size_mean in [1.0, 1.5, 2.3, 4.0]:
+            batch_sizes_list = draw_batch_sizes(distribution_name, batch_size_mean)
+            assert min(batch_sizes_list) >= 1
+            sample_mean = sum(batch_sizes_list) / len(batch_sizes_list)
+            assert abs(sample_mean - batch_size_mean) < 0.02 * batch_size_mean, (distribution_name, sample_mean)
+
+
+def test_constant_integer_mean_is_always_drawn() -> None:
+    assert set(draw_batch_sizes("constant", 3.0, 1000)) == {3}
+
+
+def test_uniform_draws_between_1_and_twice_the_mean_minus_1() -> None:
+    assert set(draw_batch_sizes("uniform", 2.5, 10000)) == {1, 2, 3, 4}
+
+
+def test_poisson_normal_approximation_above_30() -> None:
+    batch_sizes_list = draw_batch_sizes("poisson", 51.0)
+    assert min(batch_sizes_list) >= 1
+    sample_mean = sum(batch_sizes_list) / len(batch_sizes_list)
+    sample_variance = sum((batch_size - sample_mean) ** 2 for batch_size in batch_sizes_list) / len(batch_sizes_list)
+    assert abs(sample_mean - 51) < 0.2
+    # 1 + Poisson(50) has a variance of 50
+    assert abs(sample_variance - 50) < 2.5
+
+
+def test_batch_sizes_are_capped_at_the_max() -> None:
+    batch_size_distribution = BatchSizeDistribution(distribution_name="geometric",
+                                                    batch_size_mean=20,
+                                                    batch_size_max=5,
+                                                    random_generator=Random(3))
+    assert max(batch_size_distribution.draw() for _ in range(1000)) == 5
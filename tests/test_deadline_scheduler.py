@@ -0,0 +1,74 @@
+from util.clock import VirtualClock
+from vm_revoker.deadline_scheduler import DeadlineScheduler
+
+
+def run_schedule(overdue_event_policy: str,
+                 arrival_times_list: list,
+                 handling_times_dict: dict) -> list:
+    # Returns the (event counter, arrival time, status) of each event, handling event i for handling_times_dict[i] s
+    clock = VirtualClock()
+    deadline_scheduler = DeadlineScheduler(clock=clock,
+                                           overdue_event_policy=overdue_event_policy,
+                                           overdue_event_tolerance_in_seconds=0.5)
+    arrivals = [(None, arrival_time) for arrival_time in arrival_times_list]
+    events_list = []
+    for event_counter, arrival, _, event_status in deadline_scheduler.schedule(arrivals):
+        events_list.append((event_counter, arrival[1], event_status))
+        clock.sleep(handling_times_dict.get(event_counter, 0))
+    return events_list
+
+
+def test_events_fire_at_their_deadlines() -> None:
+    clock = VirtualClock()
+    deadline_scheduler = DeadlineScheduler(clock=clock,
+                                           overdue_event_policy="skip",
+                                           overdue_event_tolerance_in_seconds=0.5)
+    for _, arrival, scheduling_lag, event_status in deadline_scheduler.schedule([(1, 1.0), (2, 3.0)]):
+        assert clock.now() == arrival[1]
+        assert scheduling_lag == 0.0
+        assert event_status == "fire"
+
+
+def test_fire_immediately_catches_up_on_overdue_events() -> None:
+    events_list = run_schedule("fire_immediately", [1.0, 2.0, 3.0, 10.0], {1: 5})
+    assert [event_status for _, _, event_status in events_list] == ["fire"] * 4
+
+
+def test_skip_drops_overdue_events() -> None:
+    events_list = run_schedule("skip", [1.0, 2.0, 3.0, 10.0], {1: 5})
+    assert [event_status for _, _, event_status in events_list] == ["fire", "skip", "skip", "fire"]
+
+
+def test_coalesce_folds_overdue_events_into_the_next_due_one() -> None:
+    # At 6 s, the events of 2 s and 3 s are overdue: the first is coalesced into the second, which fires
+    events_list = run_schedule("coalesce", [1.0, 2.0, 3.0, 10.0], {1: 5})
+    assert [event_status for _, _, event_status in events_list] == ["fire", "coalesce", "fire", "fire"]
+
+
+def test_coalesce_folds_overdue_events_into_their_own_fleet_next_event() -> None:
+    # At 6 s, fleet 1's event of 2 s is coalesced into its event of 4 s, but fleet 0's event of 3 s fires, as fleet 0
+    # has no other due event
+    clock = VirtualClock()
+    deadline_scheduler = DeadlineScheduler(clock=clock,
+                                           overdue_event_policy="coalesce",
+                                           overdue_event_tolerance_in_seconds=0.5)
+    arrivals = [(None, 1.0, 0), (None, 2.0, 1), (None, 3.0, 0), (None, 4.0, 1), (None, 10.0, 1)]
+    events_list = []
+    for event_counter, arrival, _, event_status in deadline_scheduler.schedule(arrivals,
+                                                                               stream_key=lambda arrival: arrival[2]):
+        events_list.append((arrival[1], arrival[2], event_status))
+        clock.sleep(5 if event_counter == 1 else 0)
+    assert events_list == [(1.0, 0, "fire"), (2.0, 1, "coalesce"), (3.0, 0, "fire"), (4.0, 1, "fire"),
+                           (10.0, 1, "fire")]
+
+
+def test_resumed_schedules_continue_their_time_and_counters() -> None:
+    clock = VirtualClock(start_time_in_seconds=100.0)
+    deadline_scheduler = DeadlineScheduler(clock=clock,
+                                           overdue_event_policy="skip",
+                                           overdue_event_tolerance_in_seconds=0.5)
+    events_list = list(deadline_scheduler.schedule([(1, 51.0), (1, 52.0)],
+                                                   start_offset_in_seconds=50.0,
+                                                   first_event_counter=8))
+    assert [event[0] for event in events_list] == [8, 9]
+    assert clock.now() == 102.0
@@ -0,0 +1,154 @@
+from threading import Lock, Thread
+from time import sleep
+from typing import Any
+from simulation.fake_ec2_backend import FakeEC2Backend
+from util.clock import VirtualClock
+from vm_manager.ec2_fleet_state_cache import EC2FleetStateCache
+from vm_manager.ec2_vm_manager import EC2VMManager
+
+
+def create_fleet_state_cache(fake_ec2_backend: FakeEC2Backend,
+                             clock: VirtualClock,
+                             instances_id_list: list) -> EC2FleetStateCache:
+    ec2vmm = EC2VMManager(service_name="ec2",
+                          region_name="us-east-1",
+                          describe_instances_max_workers=1,
+                          ec2_client=fake_ec2_backend)
+    return EC2FleetStateCache(ec2vmm=ec2vmm,
+                              instances_id_list=instances_id_list,
+                              clock=clock,
+                              refresh_interval_in_seconds=10,
+                              max_staleness_in_seconds=60,
+                              background_refresh=False)
+
+
+def test_invalidation_prevails_while_aws_still_reports_running() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1", "i-2"])
+    clock = VirtualClock()
+    fleet_state_cache = create_fleet_state_cache(fake_ec2_backend, clock, ["i-1", "i-2"])
+    assert fleet_state_cache.pop_states_delta() == {"i-1": "running", "i-2": "running"}
+    fleet_state_cache.invalidate(["i-1"])
+    clock.sleep(10)
+    assert fleet_state_cache.pop_states_delta() == {"i-1": "revoked"}
+    fake_ec2_backend.terminate_instances(InstanceIds=["i-1"])
+    clock.sleep(10)
+    assert fleet_state_cache.pop_states_delta() == {"i-1": "terminated"}
+
+
+def test_failed_revocations_are_revalidated() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1", "i-2"])
+    clock = VirtualClock()
+    fleet_state_cache = create_fleet_state_cache(fake_ec2_backend, clock, ["i-1", "i-2"])
+    fleet_state_cache.pop_states_delta()
+    fleet_state_cache.invalidate(["i-1"])
+    fleet_state_cache.pop_states_delta()
+    # The revocation of i-1 failed, so the next delta reports it as running again
+    fleet_state_cache.revalidate(["i-1", "i-2"])
+    assert fleet_state_cache.pop_states_delta() == {"i-1": "running"}
+    clock.sleep(10)
+    assert fleet_state_cache.pop_states_delta() == {}
+    assert fleet_state_cache.get_snapshot_dict()["invalidated_instances_ids"] == []
+
+
+def test_revalidation_does_not_override_a_settled_state() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1"])
+    clock = VirtualClock()
+    fleet_state_cache = create_fleet_state_cache(fake_ec2_backend, clock, ["i-1"])
+    fleet_state_cache.pop_states_delta()
+    fleet_state_cache.invalidate(["i-1"])
+    fake_ec2_backend.terminate_instances(InstanceIds=["i-1"])
+    clock.sleep(10)
+    assert fleet_state_cache.pop_states_delta() == {"i-1": "terminated"}
+    fleet_state_cache.revalidate(["i-1"])
+    assert fleet_state_cache.pop_states_delta() == {}
+
+
+def create_discovered_fleet_state_cache(fake_ec2_backend: FakeEC2Backend,
+                                        clock: VirtualClock) -> EC2FleetStateCache:
+    ec2vmm = EC2VMManager(service_name="ec2",
+                          region_name="us-east-1",
+                          describe_instances_max_workers=1,
+                          ec2_client=fake_ec2_backend)
+    return EC2FleetStateCache(ec2vmm=ec2vmm,
+                              instances_id_list=[],
+                              clock=clock,
+                              refresh_interval_in_seconds=10,
+                              max_staleness_in_seconds=60,
+                              background_refresh=False,
+                              discovery_filters_list=[{"Name": "tag:fleet", "Values": ["web"]}],
+                              full_resync_interval_in_seconds=60)
+
+
+def test_incremental_discovery_finds_launched_and_leaving_instances() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1", "i-2", "i-3"],
+                                      instances_tags_dict={"i-1": {"fleet": "web"}, "i-2": {"fleet": "web"}})
+    clock = VirtualClock()
+    fleet_state_cache = create_discovered_fleet_state_cache(fake_ec2_backend, clock)
+    assert fleet_state_cache.pop_states_delta() == {"i-1": "running", "i-2": "running"}
+    assert fake_ec2_backend.get_api_calls_counter() == 1
+    fake_ec2_backend.launch_instances(["i-4"], {"fleet": "web"})
+    fake_ec2_backend.launch_instances(["i-5"], {"fleet": "db"})
+    fake_ec2_backend.terminate_instances(InstanceIds=["i-2"])
+    clock.sleep(10)
+    # An incremental refresh lists the recently launched instances and the leaving ones only
+    assert fleet_state_cache.pop_states_delta() == {"i-4": "running", "i-2": "terminated"}
+    # One full listing, one termination, then two incremental listings
+    assert fake_ec2_backend.get_api_calls_counter() == 1 + 1 + 2
+    clock.sleep(10)
+    assert fleet_state_cache.pop_states_delta() == {}
+
+
+def test_full_resync_drops_instances_no_longer_discovered() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1", "i-2"],
+                                      instances_tags_dict={"i-1": {"fleet": "web"}, "i-2": {"fleet": "web"}})
+    clock = VirtualClock()
+    fleet_state_cache = create_discovered_fleet_state_cache(fake_ec2_backend, clock)
+    fleet_state_cache.pop_states_delta()
+    # i-2 leaves the fleet without changing state, which incremental refreshes cannot see
+    fake_ec2_backend.launch_instances(["i-2"], {"fleet": "db"})
+    clock.sleep(30)
+    assert fleet_state_cache.pop_states_delta() == {}
+    clock.sleep(30)
+    assert fleet_state_cache.pop_states_delta() == {"i-2": "terminated"}
+    assert fleet_state_cache.get_snapshot_dict()["instances_states"] == {"i-1": "running"}
+
+
+class ConcurrencyTrackingFakeEC2Backend(FakeEC2Backend):
+    # Records the max number of describe calls in progress at the same time
+    def __init__(self,
+                 instances_id_list: list,
+                 instances_tags_dict: dict) -> None:
+        super().__init__(instances_id_list=instances_id_list,
+                         instances_tags_dict=instances_tags_dict)
+        self.__tracking_lock = Lock()
+        self.__describe_calls_in_progress = 0
+        self.max_describe_calls_in_progress = 0
+
+    def describe_instances(self,
+                           **kwargs: Any) -> dict:
+        with self.__tracking_lock:
+            self.__describe_calls_in_progress += 1
+            self.max_describe_calls_in_progress = max(self.max_describe_calls_in_progress,
+                                                      self.__describe_calls_in_progress)
+        sleep(0.01)
+        try:
+            return super().describe_instances(**kwargs)
+        finally:
+            with self.__tracking_lock:
+                self.__describe_calls_in_progress -= 1
+
+
+def test_concurrent_refreshes_are_serialized() -> None:
+    fake_ec2_backend = ConcurrencyTrackingFakeEC2Backend(instances_id_list=["i-1", "i-2"],
+                                                         instances_tags_dict={"i-1": {"fleet": "web"},
+                                                                              "i-2": {"fleet": "web"}})
+    clock = VirtualClock()
+    fleet_state_cache = create_discovered_fleet_state_cache(fake_ec2_backend, clock)
+    fleet_state_cache.pop_states_delta()
+    refreshing_threads_list = [Thread(target=fleet_state_cache.refresh) for _ in range(4)]
+    for refreshing_thread in refreshing_threads_list:
+        refreshing_thread.start()
+    for refreshing_thread in refreshing_threads_list:
+        refreshing_thread.join()
+    assert fake_ec2_backend.max_describe_calls_in_progress == 1
+    assert fleet_state_cache.get_snapshot_dict()["instances_states"] == {"i-1": "running", "i-2": "running"}
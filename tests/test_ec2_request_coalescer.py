@@ -0,0 +1,64 @@
+from threading import Thread
+from vm_manager.ec2_request_coalescer import EC2RequestCoalescer
+
+
+def submit_concurrently(ec2_request_coalescer: EC2RequestCoalescer,
+                        instances_id_lists_list: list) -> list:
+    # Returns the exception raised to each request (None for the successful ones)
+    exceptions_list = [None] * len(instances_id_lists_list)
+
+    def submit(request_index: int) -> None:
+        try:
+            ec2_request_coalescer.submit(instances_id_lists_list[request_index])
+        except Exception as exception:
+            exceptions_list[request_index] = exception
+
+    submitting_threads_list = [Thread(target=submit, args=(request_index,))
+                               for request_index in range(len(instances_id_lists_list))]
+    for submitting_thread in submitting_threads_list:
+        submitting_thread.start()
+    for submitting_thread in submitting_threads_list:
+        submitting_thread.join()
+    return exceptions_list
+
+
+def test_requests_within_the_window_share_a_batch() -> None:
+    batches_list = []
+    ec2_request_coalescer = EC2RequestCoalescer(batch_function=batches_list.append,
+                                                coalescing_window_in_seconds=0.5,
+                                                max_batch_size=1000)
+    assert submit_concurrently(ec2_request_coalescer, [["i-1"], ["i-2", "i-3"], ["i-4"]]) == [None, None, None]
+    assert len(batches_list) == 1
+    assert sorted(batches_list[0]) == ["i-1", "i-2", "i-3", "i-4"]
+    assert ec2_request_coalescer.get_counters_dict() == {"requests": 3, "batches": 1}
+
+
+def test_full_batches_are_not_joined() -> None:
+    batches_list = []
+    ec2_request_coalescer = EC2RequestCoalescer(batch_function=batches_list.append,
+                                                coalescing_window_in_seconds=0.5,
+                                                max_batch_size=4)
+    submit_concurrently(ec2_request_coalescer, [["i-1", "i-2"], ["i-3", "i-4"], ["i-5", "i-6"]])
+    assert sorted(len(batch) for batch in batches_list) == [2, 4]
+    assert ec2_request_coalescer.get_counters_dict() == {"requests": 3, "batches": 2}
+
+
+def test_every_request_of_a_failed_batch_gets_its_exception() -> None:
+    def fail_batch(instances_id_list: list) -> None:
+        raise RuntimeError("UnauthorizedOperation")
+
+    ec2_request_coalescer = EC2RequestCoalescer(batch_function=fail_batch,
+                                                coalescing_window_in_seconds=0.5,
+                                                max_batch_size=1000)
+    exceptions_list = submit_concurrently(ec2_request_coalescer, [["i-1"], ["i-2"]])
+    assert all(isinstance(exception, RuntimeError) for exception in exceptions_list)
+
+
+def test_requests_without_a_window_are_sent_alone() -> None:
+    batches_list = []
+    ec2_request_coalescer = EC2RequestCoalescer(batch_function=batches_list.append,
+                                                coalescing_window_in_seconds=0.0,
+                                                max_batch_size=1000)
+    ec2_request_coalescer.submit(["i-1"])
+    ec2_request_coalescer.submit(["i-2"])
+    assert batches_list == [["i-1"], ["i-2"]]
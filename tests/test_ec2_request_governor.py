@@ -0,0 +1,62 @@
+import pytest
+from botocore.exceptions import ClientError
+from simulation.fake_ec2_backend import FakeEC2Backend
+from typing import Any
+from vm_manager.ec2_request_governor import EC2RequestGovernor
+
+
+def create_ec2_request_governor(max_attempts: int) -> EC2RequestGovernor:
+    return EC2RequestGovernor(api_request_rate_limits_dict={},
+                              max_attempts=max_attempts,
+                              base_backoff_in_seconds=0.0,
+                              max_backoff_in_seconds=0.0)
+
+
+def test_throttled_requests_are_retried_until_they_succeed() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1"])
+    ec2_request_governor = create_ec2_request_governor(max_attempts=3)
+    responses_list = []
+
+    def terminate_instances(**api_arguments: Any) -> dict:
+        # The first attempt is throttled, as the fake backend's empty bucket would
+        if not responses_list:
+            responses_list.append(None)
+            raise ClientError({"Error": {"Code": "RequestLimitExceeded", "Message": ""}}, "terminate_instances")
+        return fake_ec2_backend.terminate_instances(**api_arguments)
+
+    ec2_request_governor.call("terminate_instances", terminate_instances, InstanceIds=["i-1"])
+    assert fake_ec2_backend.get_instance_state("i-1") == "terminated"
+    assert ec2_request_governor.get_counters_dict()["terminate_instances"] == {"requests": 2,
+                                                                               "throttles": 1,
+                                                                               "retries": 1,
+                                                                               "failures": 0}
+
+
+def test_requests_throttled_beyond_their_attempts_fail() -> None:
+    # The fake backend's bucket holds a single token, refilled too slowly for the retries
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1"],
+                                      api_request_rate_limits_dict={"describe_instances": (1, 0.001)})
+    ec2_request_governor = create_ec2_request_governor(max_attempts=3)
+    ec2_request_governor.call("describe_instances", fake_ec2_backend.describe_instances)
+    with pytest.raises(ClientError):
+        ec2_request_governor.call("describe_instances", fake_ec2_backend.describe_instances)
+    assert fake_ec2_backend.get_throttled_api_calls_counter() == 3
+    assert ec2_request_governor.get_counters_dict()["describe_instances"] == {"requests": 4,
+                                                                              "throttles": 3,
+                                                                              "retries": 2,
+                                                                              "failures": 1}
+
+
+def test_other_errors_are_not_retried() -> None:
+    ec2_request_governor = create_ec2_request_governor(max_attempts=3)
+
+    def reboot_instances(**api_arguments: Any) -> dict:
+        raise ClientError({"Error": {"Code": "UnauthorizedOperation", "Message": ""}}, "reboot_instances")
+
+    with pytest.raises(ClientError):
+        ec2_request_governor.call("reboot_instances", reboot_instances, InstanceIds=["i-1"])
+    assert ec2_request_governor.get_counters_dict()["reboot_instances"] == {"requests": 1,
+                                                                            "throttles": 0,
+                                                                            "retries": 0,
+                                                                            "failures": 1}
+
@@ -0,0 +1,79 @@
+import pytest
+from simulation.fake_ec2_backend import create_discovered_fleet_fake_ec2_backend, FakeEC2Backend
+from util.clock import VirtualClock
+from vm_manager.ec2_vm_manager import EC2VMManager
+
+
+def get_page_instances_ids_list(page: dict) -> list:
+    return [instance["InstanceId"] for reservation in page["Reservations"] for instance in reservation["Instances"]]
+
+
+def test_describe_instances_pages_through_next_tokens() -> None:
+    instances_id_list = ["i-{0:017d}".format(i) for i in range(5)]
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=instances_id_list)
+    first_page = fake_ec2_backend.describe_instances(MaxResults=2)
+    second_page = fake_ec2_backend.describe_instances(MaxResults=2, NextToken=first_page["NextToken"])
+    last_page = fake_ec2_backend.describe_instances(MaxResults=2, NextToken=second_page["NextToken"])
+    assert get_page_instances_ids_list(first_page) == instances_id_list[0:2]
+    assert get_page_instances_ids_list(second_page) == instances_id_list[2:4]
+    assert get_page_instances_ids_list(last_page) == instances_id_list[4:]
+    assert "NextToken" not in last_page
+
+
+def test_describe_instances_filters_by_ids_and_state() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1", "i-2", "i-3"])
+    fake_ec2_backend.terminate_instances(InstanceIds=["i-2"])
+    page = fake_ec2_backend.describe_instances(InstanceIds=["i-1", "i-2", "i-unknown"],
+                                               Filters=[{"Name": "instance-state-name", "Values": ["running"]}])
+    assert get_page_instances_ids_list(page) == ["i-1"]
+    assert fake_ec2_backend.get_instance_state("i-2") == "terminated"
+
+
+def test_ec2_vm_manager_states_lookup_spans_pages_and_chunks() -> None:
+    # More instances than a DescribeInstances filter accepts, so the lookup is split into chunks
+    instances_id_list = ["i-{0:017d}".format(i) for i in range(450)]
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=instances_id_list)
+    fake_ec2_backend.terminate_instances(InstanceIds=instances_id_list[:10])
+    ec2vmm = EC2VMManager(service_name="ec2",
+                          region_name="us-east-1",
+                          describe_instances_max_workers=2,
+                          ec2_client=fake_ec2_backend)
+    instances_states_dict = ec2vmm.get_ec2_instances_states_dict(instances_id_list)
+    assert len(instances_states_dict) == 450
+    assert list(instances_states_dict.values()).count("terminated") == 10
+    assert fake_ec2_backend.get_api_calls_counter() == 1 + 3
+
+
+def test_virtual_clock_advances_without_sleeping() -> None:
+    clock = VirtualClock(start_time_in_seconds=10.0)
+    clock.sleep(3600)
+    clock.sleep(-1)
+    assert clock.now() == 3610.0
+
+
+def test_discovered_fleets_are_simulated_with_their_filters_attributes() -> None:
+    instances_id_list = ["i-{0:017d}".format(i) for i in range(4)]
+    discovery_filters_list = [{"Name": "tag:Fleet", "Values": ["spot"]},
+                              {"Name": "instance-type", "Values": ["m5.large", "c5.xlarge"]},
+                              {"Name": "instance-state-name", "Values": ["running"]}]
+    fake_ec2_backend = create_discovered_fleet_fake_ec2_backend(instances_id_list, discovery_filters_list)
+    ec2vmm = EC2VMManager(service_name="ec2",
+                          region_name="us-east-1",
+                          describe_instances_max_workers=1,
+                          ec2_client=fake_ec2_backend)
+    assert ec2vmm.discover_ec2_instances_states_dict(discovery_filters_list) \
+        == {instance_id: "running" for instance_id in instances_id_list}
+    # The instances are spread over the filter's instance types
+    m5_large_filters_list = [{"Name": "instance-type", "Values": ["m5.large"]}]
+    assert len(ec2vmm.discover_ec2_instances_states_dict(m5_large_filters_list)) == 2
+
+
+def test_unsupported_discovery_filters_are_not_simulated() -> None:
+    with pytest.raises(ValueError, match="launch-time"):
+        create_discovered_fleet_fake_ec2_backend(["i-1"], [{"Name": "launch-time", "Values": ["2024-*"]}])
+
+
+def test_describe_instances_rejects_unsupported_filters() -> None:
+    fake_ec2_backend = FakeEC2Backend(instances_id_list=["i-1"])
+    with pytest.raises(ValueError, match="vpc-id"):
+        fake_ec2_backend.describe_instances(Filters=[{"Name": "vpc-id", "Values": ["vpc-1"]}])
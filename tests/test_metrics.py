@@ -0,0 +1,71 @@
+from pathlib import Path
+from urllib.request import urlopen
+from util.metrics import format_labels, MetricsRegistry, PrometheusHTTPExporter, PrometheusTextfileExporter
+
+
+def test_counters_and_gauges_render_one_sample_per_labels_values() -> None:
+    metrics_registry = MetricsRegistry()
+    counter = metrics_registry.counter("revocations_total", "Revocations.", ("fleet",))
+    counter.inc(labels_values=("east",))
+    counter.inc(2, ("east",))
+    counter.inc(labels_values=("west",))
+    gauge = metrics_registry.gauge("active_vms", "Active VMs.")
+    gauge.set(5)
+    gauge.set(3)
+    # Registering an already registered name returns the existing metric
+    assert metrics_registry.counter("revocations_total", "Revocations.", ("fleet",)) is counter
+    assert metrics_registry.render().splitlines() == ["# HELP revocations_total Revocations.",
+                                                      "# TYPE revocations_total counter",
+                                                      "revocations_total{fleet=\"east\"} 3.0",
+                                                      "revocations_total{fleet=\"west\"} 1.0",
+                                                      "# HELP active_vms Active VMs.",
+                                                      "# TYPE active_vms gauge",
+                                                      "active_vms 3"]
+
+
+def test_histograms_render_cumulative_buckets_sum_and_count() -> None:
+    metrics_registry = MetricsRegistry()
+    histogram = metrics_registry.histogram("latency_seconds", "Latency.", ("api",), buckets=(0.1, 1.0))
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value, ("describe",))
+    assert histogram.render()[2:] == ["latency_seconds_bucket{api=\"describe\",le=\"0.1\"} 2",
+                                      "latency_seconds_bucket{api=\"describe\",le=\"1.0\"} 3",
+                                      "latency_seconds_bucket{api=\"describe\",le=\"+Inf\"} 4",
+                                      "latency_seconds_sum{api=\"describe\"} 2.65",
+                                      "latency_seconds_count{api=\"describe\"} 4"]
+
+
+def test_format_labels_escapes_backslashes_and_quotes() -> None:
+    assert format_labels(("fleet", "zone"), ("a\"b", "c\\d")) == "{fleet=\"a\\\"b\",zone=\"c\\\\d\"}"
+    assert format_labels((), ()) == ""
+    assert format_labels((), (), "le=\"1\"") == "{le=\"1\"}"
+
+
+def test_textfile_exporter_replaces_the_textfile_atomically(tmp_path: Path) -> None:
+    metrics_registry = MetricsRegistry()
+    counter = metrics_registry.counter("revocations_total", "Revocations.")
+    metrics_textfile = tmp_path / "vm_revoker.prom"
+    prometheus_textfile_exporter = PrometheusTextfileExporter(metrics_registry=metrics_registry,
+                                                              metrics_textfile=metrics_textfile,
+                                                              export_interval_in_seconds=3600)
+    prometheus_textfile_exporter.start()
+    counter.inc()
+    # Stopping the exporter writes the final values
+    prometheus_textfile_exporter.stop()
+    assert "revocations_total 1.0" in metrics_textfile.read_text().splitlines()
+    assert [file.name for file in tmp_path.iterdir()] == ["vm_revoker.prom"]
+
+
+def test_http_exporter_serves_the_metrics_on_the_loopback_interface() -> None:
+    metrics_registry = MetricsRegistry()
+    metrics_registry.counter("revocations_total", "Revocations.").inc()
+    prometheus_http_exporter = PrometheusHTTPExporter(metrics_registry=metrics_registry,
+                                                      metrics_http_port=0)
+    prometheus_http_exporter.start()
+    try:
+        metrics_http_host, metrics_http_port = prometheus_http_exporter.get_server_address()
+        assert metrics_http_host == "127.0.0.1"
+        with urlopen("http://127.0.0.1:{0}/metrics".format(metrics_http_port)) as response:
+            assert "revocations_total 1.0" in response.read().decode("utf-8").splitlines()
+    finally:
+        prometheus_http_exporter.stop()
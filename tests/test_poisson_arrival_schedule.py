@@ -0,0 +1,72 @@
+from random import Random
+from vm_revoker.poisson_arrival_schedule import PoissonArrivalSchedule
+
+
+def generate_arrivals_lists(lambda_rate: float,
+                            seed: int,
+                            stopping_criterion: str,
+                            max_number_of_observable_events: int,
+                            max_observation_length_in_seconds: float) -> tuple:
+    # Reference list implementation: one inter-arrival time drawn per event, until the stopping criterion is met
+    random_generator = Random(seed)
+    inter_arrival_times_list = []
+    arrival_times_list = []
+    arrival_time = 0
+    while True:
+        inter_arrival_time = random_generator.expovariate(lambda_rate)
+        arrival_time += inter_arrival_time
+        if stopping_criterion == "max_number_of_observable_events" \
+                and len(arrival_times_list) == max_number_of_observable_events:
+            break
+        if stopping_criterion == "max_observation_length_in_seconds" \
+                and arrival_time > max_observation_length_in_seconds:
+            break
+        inter_arrival_times_list.append(inter_arrival_time)
+        arrival_times_list.append(arrival_time)
+    return inter_arrival_times_list, arrival_times_list
+
+
+def generate_arrival_schedule(lambda_rate: float,
+                              seed: int,
+                              stopping_criterion: str,
+                              max_number_of_observable_events: int,
+                              max_observation_length_in_seconds: float) -> PoissonArrivalSchedule:
+    poisson_arrival_schedule = PoissonArrivalSchedule(lambda_rate=lambda_rate,
+                                                      random_generator=Random(seed),
+                                                      block_size=7)
+    poisson_arrival_schedule.generate(stopping_criterion,
+                                      max_number_of_observable_events,
+                                      max_observation_length_in_seconds)
+    return poisson_arrival_schedule
+
+
+def test_max_number_of_observable_events_blocks_match_the_list_implementation() -> None:
+    for max_number_of_observable_events in [1, 7, 50]:
+        poisson_arrival_schedule = generate_arrival_schedule(0.5, 13, "max_number_of_observable_events",
+                                                             max_number_of_observable_events, None)
+        inter_arrival_times_list, arrival_times_list = \
+            generate_arrivals_lists(0.5, 13, "max_number_of_observable_events", max_number_of_observable_events, None)
+        assert len(poisson_arrival_schedule) == max_number_of_observable_events
+        assert list(poisson_arrival_schedule.get_inter_arrival_times_in_seconds()) == inter_arrival_times_list
+        assert list(poisson_arrival_schedule.get_arrival_times_in_seconds()) == arrival_times_list
+
+
+def test_max_observation_length_blocks_match_the_list_implementation() -> None:
+    # 7-event blocks fall short of the ~100 expected events, so several blocks are drawn, then the last is truncated
+    for seed in [1, 2, 3]:
+        poisson_arrival_schedule = generate_arrival_schedule(0.5, seed, "max_observation_length_in_seconds", None, 200)
+        inter_arrival_times_list, arrival_times_list = \
+            generate_arrivals_lists(0.5, seed, "max_observation_length_in_seconds", None, 200)
+        assert len(poisson_arrival_schedule) > 7
+        assert list(poisson_arrival_schedule.get_inter_arrival_times_in_seconds()) == inter_arrival_times_list
+        assert list(poisson_arrival_schedule.get_arrival_times_in_seconds()) == arrival_times_list
+        assert poisson_arrival_schedule.get_arrival_times_in_seconds()[-1] <= 200
+
+
+def test_cursor_pops_every_event_once() -> None:
+    poisson_arrival_schedule = generate_arrival_schedule(2, 5, "max_number_of_observable_events", 10, None)
+    first_event = (poisson_arrival_schedule.get_inter_arrival_times_in_seconds()[0],
+                   poisson_arrival_schedule.get_arrival_times_in_seconds()[0])
+    assert poisson_arrival_schedule.pop_next_event() == first_event
+    assert len(list(poisson_arrival_schedule)) == 9
+    assert not poisson_arrival_schedule.has_next_event()
@@ -0,0 +1,44 @@
+from vm_revoker.poisson_ensemble_runner import run_replications_chunk
+from vm_revoker.rate_profile import ConstantRateProfile, PiecewiseRateProfile
+
+
+def build_chunk_arguments_dict(rate_profile: object,
+                               batch_size_mean: float) -> dict:
+    return {"lambda_rate": 1 / 10,
+            "rate_profile": rate_profile,
+            "batch_size_distribution_name": "constant",
+            "batch_size_mean": batch_size_mean,
+            "batch_size_max": 1000,
+            "stopping_criterion": "max_number_of_observable_events",
+            "max_number_of_observable_events": 4,
+            "max_observation_length_in_seconds": None,
+            "fleet_size": 3,
+            "base_seed": 42,
+            "survival_curve_times_in_seconds": [0.0, 1e9],
+            "replications_indices_range": range(50)}
+
+
+def test_single_vm_batches_exhaust_the_fleet_at_its_size_th_event() -> None:
+    chunk_results = run_replications_chunk(build_chunk_arguments_dict(ConstantRateProfile(1 / 10), 1))
+    assert chunk_results["number_of_events"] == 50 * 4
+    assert chunk_results["number_of_events_with_no_active_vm"] == 50 * 1
+    assert chunk_results["survival_curve_sums"] == [50 * 3, 0]
+    assert len(chunk_results["fleet_exhaustion_times_in_seconds"]) == 50
+
+
+def test_batches_revoke_several_vms_per_event() -> None:
+    # A batch as large as the fleet exhausts it at the first event, so the following ones find no active VM
+    chunk_results = run_replications_chunk(build_chunk_arguments_dict(ConstantRateProfile(1 / 10), 3))
+    assert chunk_results["number_of_events_with_no_active_vm"] == 50 * 3
+    assert chunk_results["survival_curve_sums"] == [50 * 3, 0]
+
+
+def test_time_varying_rate_profiles_shape_the_arrivals() -> None:
+    # No event arrives during the quiet first segment
+    rate_profile = PiecewiseRateProfile(segments_list=[(0, 0.0), (1000, 1 / 10)],
+                                        period_in_seconds=0)
+    chunk_arguments_dict = build_chunk_arguments_dict(rate_profile, 1)
+    chunk_arguments_dict["survival_curve_times_in_seconds"] = [999.0]
+    chunk_results = run_replications_chunk(chunk_arguments_dict)
+    assert chunk_results["survival_curve_sums"] == [50 * 3]
+    assert min(chunk_results["fleet_exhaustion_times_in_seconds"]) > 1000
@@ -0,0 +1,32 @@
+from pytest import raises
+from random import Random
+from itertools import islice
+from vm_revoker.poisson_arrival_stream import generate_non_homogeneous_poisson_arrivals
+from vm_revoker.rate_profile import PiecewiseRateProfile
+from revoke import get_lambda_rate, get_segment_lambda_rate
+
+
+def test_quiet_segments_have_no_arrivals() -> None:
+    rate_profile = PiecewiseRateProfile(segments_list=[(0, 1.0), (100, get_segment_lambda_rate("none"))],
+                                        period_in_seconds=200)
+    arrivals = generate_non_homogeneous_poisson_arrivals(rate_profile=rate_profile,
+                                                         random_generator=Random(7))
+    for _, arrival_time in islice(arrivals, 1000):
+        assert arrival_time % 200 < 100
+
+
+def test_zero_and_negative_average_times_are_rejected() -> None:
+    with raises(ValueError):
+        get_segment_lambda_rate("0")
+    with raises(ValueError):
+        get_lambda_rate(-1.0)
+
+
+def test_sub_second_average_times_are_accepted() -> None:
+    assert get_segment_lambda_rate(" 0.2") == 5.0
+
+
+def test_all_quiet_profiles_are_rejected() -> None:
+    with raises(ValueError):
+        PiecewiseRateProfile(segments_list=[(0, 0.0), (100, 0.0)],
+                             period_in_seconds=0)
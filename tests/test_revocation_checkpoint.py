@@ -0,0 +1,44 @@
+import pytest
+from pathlib import Path
+from vm_revoker.revocation_checkpoint import load_revocation_checkpoint, RevocationCheckpointWriter, \
+    write_revocation_checkpoint
+
+
+def test_checkpoints_round_trip(tmp_path: Path) -> None:
+    checkpoint_file = tmp_path / "vm_revoker.checkpoint"
+    checkpoint_dict = {"event_counter": 42,
+                       "arrival_time": 12.5,
+                       "fleets": [{"arrivals_cursor": [3, 12.5, 1],
+                                   "state_snapshot": {"instances_states": {"i-1": "revoked"},
+                                                      "invalidated_instances_ids": ["i-1"],
+                                                      "last_discovery_datetime": None}}]}
+    write_revocation_checkpoint(checkpoint_file, checkpoint_dict)
+    assert load_revocation_checkpoint(checkpoint_file) == checkpoint_dict
+    # The checkpoint is written to a temporary file first, then moved over the checkpoint
+    assert [file.name for file in tmp_path.iterdir()] == ["vm_revoker.checkpoint"]
+
+
+def test_writer_writes_the_latest_checkpoint_only(tmp_path: Path) -> None:
+    checkpoint_file = tmp_path / "vm_revoker.checkpoint"
+    revocation_checkpoint_writer = RevocationCheckpointWriter(checkpoint_file=checkpoint_file)
+    for event_counter in range(1, 4):
+        revocation_checkpoint_writer.submit({"event_counter": event_counter})
+    revocation_checkpoint_writer.start()
+    revocation_checkpoint_writer.stop()
+    assert load_revocation_checkpoint(checkpoint_file) == {"event_counter": 3}
+
+
+def test_other_files_are_not_loaded_as_checkpoints(tmp_path: Path) -> None:
+    checkpoint_file = tmp_path / "vm_revoker.checkpoint"
+    checkpoint_file.write_bytes(b"VMREVTRC" + bytes(8))
+    with pytest.raises(ValueError):
+        load_revocation_checkpoint(checkpoint_file)
+
+
+def test_checkpoints_of_completed_sessions_are_not_resumed(tmp_path: Path) -> None:
+    checkpoint_file = tmp_path / "vm_revoker.checkpoint"
+    write_revocation_checkpoint(checkpoint_file, {"execution_id": "run", "event_counter": 28, "completed": False})
+    assert load_revocation_checkpoint(checkpoint_file)["event_counter"] == 28
+    write_revocation_checkpoint(checkpoint_file, {"execution_id": "run", "event_counter": 28, "completed": True})
+    with pytest.raises(ValueError, match="completed session"):
+        load_revocation_checkpoint(checkpoint_file)
@@ -0,0 +1,46 @@
+from threading import Event
+from util.clock import VirtualClock
+from vm_revoker.revocation_dispatcher import RevocationDispatcher
+
+
+def test_dispatch_returns_the_instances_neither_in_flight_nor_revoked() -> None:
+    revocation_dispatcher = RevocationDispatcher(max_concurrent_revocations=2)
+    release_event = Event()
+    assert revocation_dispatcher.dispatch(["i-1", "i-2"], lambda instances_ids_list: release_event.wait()) \
+        == ["i-1", "i-2"]
+    # i-1 is in-flight, so only i-3 is dispatched
+    assert revocation_dispatcher.dispatch(["i-1", "i-3", "i-3"], lambda instances_ids_list: None) == ["i-3"]
+    release_event.set()
+    revocation_dispatcher.shutdown()
+    assert revocation_dispatcher.get_revoked_instances_ids() == {"i-1", "i-2", "i-3"}
+    assert revocation_dispatcher.dispatch(["i-2"], lambda instances_ids_list: None) == []
+
+
+def test_failed_revocations_are_reported_and_may_be_dispatched_again() -> None:
+    revocation_dispatcher = RevocationDispatcher(max_concurrent_revocations=1)
+    callbacks_list = []
+
+    def fail_revocation(instances_ids_list: list) -> None:
+        raise RuntimeError("UnauthorizedOperation")
+
+    revocation_dispatcher.dispatch(["i-1"],
+                                   fail_revocation,
+                                   lambda instances_ids_list, exception, latency:
+                                   callbacks_list.append(("completion", instances_ids_list, str(exception))),
+                                   lambda instances_ids_list: callbacks_list.append(("dispatch", instances_ids_list)))
+    revocation_dispatcher.shutdown()
+    assert callbacks_list == [("dispatch", ["i-1"]), ("completion", ["i-1"], "UnauthorizedOperation")]
+    assert revocation_dispatcher.get_revoked_instances_ids() == set()
+    assert revocation_dispatcher.is_available("i-1")
+
+
+def test_revocation_latency_is_measured_with_the_given_clock() -> None:
+    clock = VirtualClock()
+    revocation_dispatcher = RevocationDispatcher(max_concurrent_revocations=1,
+                                                 clock=clock)
+    latencies_list = []
+    revocation_dispatcher.dispatch(["i-1"],
+                                   lambda instances_ids_list: clock.sleep(2.5),
+                                   lambda instances_ids_list, exception, latency: latencies_list.append(latency))
+    revocation_dispatcher.shutdown()
+    assert latencies_list == [2.5]
@@ -0,0 +1,61 @@
+import pytest
+from json import loads
+from pathlib import Path
+from vm_revoker.revocation_event_log import read_binary_event_log, RevocationEventLog
+
+EVENTS_LIST = [(1, 0, 10.0, 10.5, ["i-1", "i-22"], "terminate", 0.25, "success"),
+               (2, 1, 20.0, 20.0, [], "none", 0.0, "no_active_vms"),
+               (3, 1, 30.0, 31.5, ["i-333"], "reboot", 1.5, "failure"),
+               (4, 0, 40.0, 42.0, [], "none", 0.0, "skip")]
+
+
+def write_event_log(event_log_format: str,
+                    event_log_file: Path) -> None:
+    revocation_event_log = RevocationEventLog(event_log_format=event_log_format,
+                                              event_log_file=event_log_file,
+                                              run_id="test_" + event_log_format,
+                                              fleets_names_list=["east", "west"])
+    revocation_event_log.start()
+    for event in EVENTS_LIST:
+        revocation_event_log.record_event(*event)
+    # Stopping the event log writes the records still queued, and closes the file
+    revocation_event_log.stop()
+
+
+def get_expected_records_list() -> list:
+    return [{"event": event_index,
+             "fleet": ["east", "west"][fleet_index],
+             "scheduled_time": scheduled_time,
+             "actual_time": actual_time,
+             "victims": victims_ids_list,
+             "action": action,
+             "latency": latency,
+             "result": result}
+            for event_index, fleet_index, scheduled_time, actual_time, victims_ids_list, action, latency, result
+            in EVENTS_LIST]
+
+
+def test_jsonl_event_log_round_trip(tmp_path: Path) -> None:
+    event_log_file = tmp_path / "events.jsonl"
+    write_event_log("jsonl", event_log_file)
+    records_list = [loads(line) for line in event_log_file.read_text().splitlines()]
+    assert records_list == get_expected_records_list()
+
+
+def test_binary_event_log_round_trip(tmp_path: Path) -> None:
+    event_log_file = tmp_path / "events.bin"
+    write_event_log("binary", event_log_file)
+    assert list(read_binary_event_log(event_log_file)) == get_expected_records_list()
+
+
+def test_binary_event_log_is_checked_for_its_magic(tmp_path: Path) -> None:
+    event_log_file = tmp_path / "events.bin"
+    event_log_file.write_bytes(b"VMREVTRC" + bytes(6))
+    with pytest.raises(ValueError):
+        list(read_binary_event_log(event_log_file))
+
+
+def test_disabled_event_log_writes_nothing(tmp_path: Path) -> None:
+    event_log_file = tmp_path / "events.jsonl"
+    write_event_log("none", event_log_file)
+    assert not event_log_file.exists()
@@ -0,0 +1,83 @@
+import pytest
+from pathlib import Path
+from typing import Iterator
+from vm_revoker.revocation_trace import convert_csv_trace_to_binary, generate_trace_replay_arrivals, RevocationTrace
+
+CSV_TRACE_LINES_LIST = ["timestamp,instance_type,availability_zone",
+                        "100,m5.large,us-east-1a",
+                        "105,c5.large,us-east-1b",
+                        "105,m5.large,us-east-1b",
+                        "",
+                        "120,m5.large,us-east-1a",
+                        "1970-01-01T00:02:30,c5.large,us-east-1a"]
+
+
+@pytest.fixture(params=["csv", "binary"])
+def revocation_trace(request: pytest.FixtureRequest,
+                     tmp_path: Path) -> Iterator[RevocationTrace]:
+    trace_file = tmp_path / "trace.csv"
+    trace_file.write_text("\n".join(CSV_TRACE_LINES_LIST) + "\n")
+    if request.param == "binary":
+        binary_trace_file = tmp_path / "trace.bin"
+        assert convert_csv_trace_to_binary(trace_file, binary_trace_file) == 5
+        trace_file = binary_trace_file
+    revocation_trace = RevocationTrace(trace_file=trace_file,
+                                       trace_file_format=request.param)
+    revocation_trace.open()
+    yield revocation_trace
+    revocation_trace.close()
+
+
+def get_timestamps_list(revocation_trace: RevocationTrace,
+                        timestamp: float) -> list:
+    return [interruption[0] for interruption in revocation_trace.read_interruptions(revocation_trace.seek(timestamp))]
+
+
+def test_seek_finds_the_first_interruption_at_or_after_the_timestamp(revocation_trace: RevocationTrace) -> None:
+    assert revocation_trace.get_start_timestamp() == 100
+    assert get_timestamps_list(revocation_trace, 0) == [100, 105, 105, 120, 150]
+    # Ties are replayed from their first interruption on
+    assert get_timestamps_list(revocation_trace, 105) == [105, 105, 120, 150]
+    assert get_timestamps_list(revocation_trace, 105.5) == [120, 150]
+    assert get_timestamps_list(revocation_trace, 150) == [150]
+    assert get_timestamps_list(revocation_trace, 151) == []
+
+
+def test_read_interruptions_filters_by_instance_type_and_availability_zone(revocation_trace: RevocationTrace) -> None:
+    interruptions_list = list(revocation_trace.read_interruptions(revocation_trace.seek(0),
+                                                                  instance_types_list=["m5.large"],
+                                                                  availability_zones_list=["us-east-1a"]))
+    assert interruptions_list == [(100, "m5.large", "us-east-1a"), (120, "m5.large", "us-east-1a")]
+
+
+def test_replay_arrivals_are_offset_and_scaled(revocation_trace: RevocationTrace) -> None:
+    arrivals_list = list(generate_trace_replay_arrivals(revocation_trace,
+                                                        start_offset_in_seconds=5,
+                                                        time_scale_factor=0.5))
+    assert arrivals_list == [(0.0, 0.0), (0.0, 0.0), (7.5, 7.5), (15.0, 22.5)]
+
+
+def test_binary_traces_are_checked_for_their_magic(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.bin"
+    trace_file.write_bytes(b"NOTATRACE" * 4)
+    revocation_trace = RevocationTrace(trace_file=trace_file,
+                                       trace_file_format="binary")
+    with pytest.raises(ValueError):
+        revocation_trace.open()
+    revocation_trace.close()
+
+
+def test_resumed_replays_skip_the_arrivals_replayed_at_their_time(revocation_trace: RevocationTrace) -> None:
+    # The checkpoint was taken after the first of the two arrivals at 5 s
+    arrivals_list = list(generate_trace_replay_arrivals(revocation_trace,
+                                                        start_offset_in_seconds=0,
+                                                        time_scale_factor=1.0,
+                                                        resume_arrival_time_in_seconds=5.0,
+                                                        resume_arrivals_at_time=1))
+    assert arrivals_list == [(0.0, 5.0), (15.0, 20.0), (30.0, 50.0)]
+    arrivals_list = list(generate_trace_replay_arrivals(revocation_trace,
+                                                        start_offset_in_seconds=0,
+                                                        time_scale_factor=1.0,
+                                                        resume_arrival_time_in_seconds=5.0,
+                                                        resume_arrivals_at_time=2))
+    assert arrivals_list == [(15.0, 20.0), (30.0, 50.0)]
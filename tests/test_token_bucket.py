@@ -0,0 +1,23 @@
+from util.token_bucket import TokenBucket
+
+
+def test_try_acquire_fails_once_the_burst_is_spent() -> None:
+    # The refill is negligible over the test, so only the capacity's tokens are available
+    token_bucket = TokenBucket(capacity=2, refill_rate_per_second=0.001)
+    assert token_bucket.try_acquire()
+    assert token_bucket.try_acquire()
+    assert not token_bucket.try_acquire()
+
+
+def test_refill_rate_decreases_multiplicatively_and_increases_additively() -> None:
+    token_bucket = TokenBucket(capacity=10, refill_rate_per_second=10, min_refill_rate_ratio=0.1)
+    token_bucket.decrease_rate()
+    assert token_bucket.get_refill_rate_per_second() == 5
+    for _ in range(5):
+        token_bucket.decrease_rate()
+    assert token_bucket.get_refill_rate_per_second() == 1
+    token_bucket.increase_rate()
+    assert token_bucket.get_refill_rate_per_second() == 1.5
+    for _ in range(100):
+        token_bucket.increase_rate()
+    assert token_bucket.get_refill_rate_per_second() == 10
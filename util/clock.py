@@ -0,0 +1,34 @@
+from time import monotonic, sleep
+
+
+class WallClock:
+    """
+    Clock that follows the real (wall-clock) time, used by live executions.
+    """
+    @staticmethod
+    def now() -> float:
+        return monotonic()
+
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        if seconds > 0:
+            sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Clock that advances a virtual time instead of sleeping, used by simulated executions.
+
+    start_time_in_seconds : the virtual time in seconds the clock starts at.
+    """
+    def __init__(self,
+                 start_time_in_seconds: float = 0.0) -> None:
+        self.__virtual_time_in_seconds = start_time_in_seconds
+
+    def now(self) -> float:
+        return self.__virtual_time_in_seconds
+
+    def sleep(self,
+              seconds: float) -> None:
+        if seconds > 0:
+            self.__virtual_time_in_seconds += seconds
@@ -0,0 +1,302 @@
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import replace
+from pathlib import Path
+from threading import Event, Lock, Thread
+
+# Default histogram buckets (upper bounds in seconds), from API call latencies up to scheduling lags of minutes
+DEFAULT_HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def format_labels(labels_names: tuple,
+                  labels_values: tuple,
+                  extra_label: str = "") -> str:
+    labels_list = ["{0}=\"{1}\"".format(label_name, str(label_value).replace("\\", "\\\\").replace("\"", "\\\""))
+                   for label_name, label_value in zip(labels_names, labels_values)]
+    if extra_label:
+        labels_list.append(extra_label)
+    return "{" + ",".join(labels_list) + "}" if labels_list else ""
+
+
+class Counter:
+    """
+    Monotonically increasing metric (e.g., number of revocations), with one value per combination of labels' values.
+
+    name : the name of the metric.
+
+    help_text : the description of the metric.
+
+    labels_names : the names of the metric's labels.
+    """
+    def __init__(self,
+                 name: str,
+                 help_text: str,
+                 labels_names: tuple = ()) -> None:
+        self.__name = name
+        self.__help_text = help_text
+        self.__labels_names = labels_names
+        self.__values_dict = {}
+        self.__lock = Lock()
+
+    def inc(self,
+            amount: float = 1.0,
+            labels_values: tuple = ()) -> None:
+        with self.__lock:
+            self.__values_dict[labels_values] = self.__values_dict.get(labels_values, 0.0) + amount
+
+    def render(self) -> list:
+        with self.__lock:
+            values_dict = dict(self.__values_dict)
+        lines_list = ["# HELP {0} {1}".format(self.__name, self.__help_text),
+                      "# TYPE {0} counter".format(self.__name)]
+        for labels_values, value in values_dict.items():
+            lines_list.append("{0}{1} {2}".format(self.__name,
+                                                  format_labels(self.__labels_names, labels_values),
+                                                  value))
+        return lines_list
+
+
+class Gauge:
+    """
+    Metric that goes up and down (e.g., size of the active fleet), with one value per combination of labels' values.
+
+    name : the name of the metric.
+
+    help_text : the description of the metric.
+
+    labels_names : the names of the metric's labels.
+    """
+    def __init__(self,
+                 name: str,
+                 help_text: str,
+                 labels_names: tuple = ()) -> None:
+        self.__name = name
+        self.__help_text = help_text
+        self.__labels_names = labels_names
+        self.__values_dict = {}
+        self.__lock = Lock()
+
+    def set(self,
+            value: float,
+            labels_values: tuple = ()) -> None:
+        with self.__lock:
+            self.__values_dict[labels_values] = value
+
+    def render(self) -> list:
+        with self.__lock:
+            values_dict = dict(self.__values_dict)
+        lines_list = ["# HELP {0} {1}".format(self.__name, self.__help_text),
+                      "# TYPE {0} gauge".format(self.__name)]
+        for labels_values, value in values_dict.items():
+            lines_list.append("{0}{1} {2}".format(self.__name,
+                                                  format_labels(self.__labels_names, labels_values),
+                                                  value))
+        return lines_list
+
+
+class Histogram:
+    """
+    Distribution of observed values (e.g., API call latencies) over fixed buckets, with one distribution per
+    combination of labels' values. Observing a value costs a binary search and two additions.
+
+    name : the name of the metric.
+
+    help_text : the description of the metric.
+
+    labels_names : the names of the metric's labels.
+
+    buckets : the increasing upper bounds of the buckets (an implicit +Inf bucket is added).
+    """
+    def __init__(self,
+                 name: str,
+                 help_text: str,
+                 labels_names: tuple = (),
+                 buckets: tuple = DEFAULT_HISTOGRAM_BUCKETS) -> None:
+        self.__name = name
+        self.__help_text = help_text
+        self.__labels_names = labels_names
+        self.__buckets = buckets
+        # Per labels' values: [count of each bucket (non-cumulative, +Inf last), sum of the observed values]
+        self.__distributions_dict = {}
+        self.__lock = Lock()
+
+    def observe(self,
+                value: float,
+                labels_values: tuple = ()) -> None:
+        bucket_index = bisect_left(self.__buckets, value)
+        with self.__lock:
+            distribution = self.__distributions_dict.get(labels_values)
+            if distribution is None:
+                distribution = [[0] * (len(self.__buckets) + 1), 0.0]
+                self.__distributions_dict[labels_values] = distribution
+            distribution[0][bucket_index] += 1
+            distribution[1] += value
+
+    def render(self) -> list:
+        with self.__lock:
+            distributions_dict = {labels_values: (list(buckets_counts), values_sum)
+                                  for labels_values, (buckets_counts, values_sum)
+                                  in self.__distributions_dict.items()}
+        lines_list = ["# HELP {0} {1}".format(self.__name, self.__help_text),
+                      "# TYPE {0} histogram".format(self.__name)]
+        for labels_values, (buckets_counts, values_sum) in distributions_dict.items():
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(list(self.__buckets) + ["+Inf"], buckets_counts):
+                cumulative_count += bucket_count
+                lines_list.append("{0}_bucket{1} {2}".format(self.__name,
+                                                             format_labels(self.__labels_names,
+                                                                           labels_values,
+                                                                           "le=\"{0}\"".format(upper_bound)),
+                                                             cumulative_count))
+            labels = format_labels(self.__labels_names, labels_values)
+            lines_list.append("{0}_sum{1} {2}".format(self.__name, labels, values_sum))
+            lines_list.append("{0}_count{1} {2}".format(self.__name, labels, cumulative_count))
+        return lines_list
+
+
+class MetricsRegistry:
+    """
+    Registry of the process' metrics, rendered in the Prometheus text exposition format.
+    Registering an already registered name returns the existing metric, so components may share metrics.
+    """
+    def __init__(self) -> None:
+        self.__metrics_dict = {}
+        self.__lock = Lock()
+
+    def __register(self,
+                   metric_class: type,
+                   name: str,
+                   *metric_arguments: tuple) -> object:
+        with self.__lock:
+            if name not in self.__metrics_dict:
+                self.__metrics_dict[name] = metric_class(name, *metric_arguments)
+            return self.__metrics_dict[name]
+
+    def counter(self,
+                name: str,
+                help_text: str,
+                labels_names: tuple = ()) -> Counter:
+        return self.__register(Counter, name, help_text, labels_names)
+
+    def gauge(self,
+              name: str,
+              help_text: str,
+              labels_names: tuple = ()) -> Gauge:
+        return self.__register(Gauge, name, help_text, labels_names)
+
+    def histogram(self,
+                  name: str,
+                  help_text: str,
+                  labels_names: tuple = (),
+                  buckets: tuple = DEFAULT_HISTOGRAM_BUCKETS) -> Histogram:
+        return self.__register(Histogram, name, help_text, labels_names, buckets)
+
+    def render(self) -> str:
+        with self.__lock:
+            metrics_list = list(self.__metrics_dict.values())
+        lines_list = []
+        for metric in metrics_list:
+            lines_list.extend(metric.render())
+        return "\n".join(lines_list) + "\n"
+
+
+class PrometheusTextfileExporter:
+    """
+    Periodic writer of the metrics to a Prometheus textfile (e.g., for node_exporter's textfile collector).
+    Each write goes to a temporary file first, then atomically replaces the textfile, so it is never read half-written.
+
+    metrics_registry : the registry of the metrics to export.
+
+    metrics_textfile : the textfile to write the metrics to.
+
+    export_interval_in_seconds : the interval in seconds between two writes.
+    """
+    def __init__(self,
+                 metrics_registry: MetricsRegistry,
+                 metrics_textfile: Path,
+                 export_interval_in_seconds: float) -> None:
+        self.__metrics_registry = metrics_registry
+        self.__metrics_textfile = Path(metrics_textfile)
+        self.__export_interval_in_seconds = export_interval_in_seconds
+        self.__stop_event = Event()
+        self.__export_thread = None
+
+    def export(self) -> None:
+        temporary_metrics_textfile = self.__metrics_textfile.with_name(self.__metrics_textfile.name + ".tmp")
+        with open(temporary_metrics_textfile, mode="w") as metrics_textfile:
+            metrics_textfile.write(self.__metrics_registry.render())
+        replace(temporary_metrics_textfile, self.__metrics_textfile)
+
+    def __export_periodically(self) -> None:
+        while not self.__stop_event.wait(self.__export_interval_in_seconds):
+            self.export()
+
+    def start(self) -> None:
+        self.__export_thread = Thread(target=self.__export_periodically,
+                                      name="metrics_exporting_thread",
+                                      daemon=True)
+        self.__export_thread.start()
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        if self.__export_thread:
+            self.__export_thread.join()
+        # The last write holds the final values
+        self.export()
+
+
+class PrometheusHTTPExporter:
+    """
+    Local HTTP endpoint serving the metrics to Prometheus scrapes, rendered on each request.
+
+    metrics_registry : the registry of the metrics to export.
+
+    metrics_http_port : the port to serve the metrics on.
+
+    metrics_http_host : the address to serve the metrics on (the loopback interface by default, as the endpoint is not
+    authenticated; e.g., 0.0.0.0 serves them on every interface).
+    """
+    def __init__(self,
+                 metrics_registry: MetricsRegistry,
+                 metrics_http_port: int,
+                 metrics_http_host: str = "127.0.0.1") -> None:
+        self.__metrics_registry = metrics_registry
+        self.__metrics_http_port = metrics_http_port
+        self.__metrics_http_host = metrics_http_host
+        self.__http_server = None
+        self.__serve_thread = None
+
+    def __create_request_handler_class(self) -> type:
+        metrics_registry = self.__metrics_registry
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                metrics_text = metrics_registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(metrics_text)))
+                self.end_headers()
+                self.wfile.write(metrics_text)
+
+            def log_message(self, *_) -> None:
+                # Scrapes are not logged
+                pass
+
+        return MetricsRequestHandler
+
+    def get_server_address(self) -> tuple:
+        # The (host, port) the metrics are served on, once started (e.g., the port picked for port 0)
+        return self.__http_server.server_address[:2]
+
+    def start(self) -> None:
+        self.__http_server = ThreadingHTTPServer((self.__metrics_http_host, self.__metrics_http_port),
+                                                 self.__create_request_handler_class())
+        self.__serve_thread = Thread(target=self.__http_server.serve_forever,
+                                     name="metrics_serving_thread",
+                                     daemon=True)
+        self.__serve_thread.start()
+
+    def stop(self) -> None:
+        if self.__http_server:
+            self.__http_server.shutdown()
+            self.__http_server.server_close()
@@ -0,0 +1,73 @@
+from threading import Lock
+from time import monotonic, sleep
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter, as EC2 uses to throttle API requests: the bucket holds up to capacity tokens, refilled
+    at the refill rate, and each request takes one token (waiting for it when the bucket is empty).
+    The refill rate adapts to throttling (AIMD): it is halved whenever a request is throttled anyway, and grows back
+    towards the configured rate with each successful request.
+
+    capacity : the maximum number of tokens (the burst of requests allowed at once).
+
+    refill_rate_per_second : the number of tokens added per second (the sustained request rate).
+
+    min_refill_rate_ratio : the lowest fraction of the configured refill rate the adaptive rate may decrease to.
+    """
+    def __init__(self,
+                 capacity: float,
+                 refill_rate_per_second: float,
+                 min_refill_rate_ratio: float = 0.1) -> None:
+        self.__capacity = capacity
+        self.__max_refill_rate_per_second = refill_rate_per_second
+        self.__min_refill_rate_per_second = refill_rate_per_second * min_refill_rate_ratio
+        self.__refill_rate_per_second = refill_rate_per_second
+        self.__tokens = capacity
+        self.__last_refill_time = monotonic()
+        self.__lock = Lock()
+
+    def get_refill_rate_per_second(self) -> float:
+        return self.__refill_rate_per_second
+
+    def __refill(self) -> None:
+        refill_time = monotonic()
+        self.__tokens = min(self.__capacity,
+                            self.__tokens + (refill_time - self.__last_refill_time) * self.__refill_rate_per_second)
+        self.__last_refill_time = refill_time
+
+    def try_acquire(self) -> bool:
+        with self.__lock:
+            self.__refill()
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        # Returns the time in seconds spent waiting for the token
+        waiting_time = 0.0
+        while True:
+            with self.__lock:
+                self.__refill()
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return waiting_time
+                missing_token_time = (1 - self.__tokens) / self.__refill_rate_per_second
+            # Sleep outside the lock, so the other threads can still check the bucket
+            sleep(missing_token_time)
+            waiting_time += missing_token_time
+
+    def decrease_rate(self) -> None:
+        with self.__lock:
+            self.__refill()
+            self.__refill_rate_per_second = max(self.__min_refill_rate_per_second,
+                                                self.__refill_rate_per_second / 2)
+
+    def increase_rate(self) -> None:
+        with self.__lock:
+            if self.__refill_rate_per_second < self.__max_refill_rate_per_second:
+                self.__refill()
+                self.__refill_rate_per_second = min(self.__max_refill_rate_per_second,
+                                                    self.__refill_rate_per_second
+                                                    + self.__max_refill_rate_per_second * 0.05)
@@ -1,6 +1,8 @@
 from configparser import ConfigParser
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 
 def validate_number_of_arguments_provided(argv_list: list,
@@ -44,5 +46,14 @@ def load_config_parser(config_file_path: Path) -> ConfigParser:
 
 def get_value_from_sections_key(config_parser: ConfigParser,
                                 section: str,
-                                key: str) -> Any:
+                                key: str,
+                                default_value: Any = None) -> Any:
+    # Keys with a default value are optional (older config files lack them), the others are required
+    if default_value is not None and not config_parser.has_option(section, key):
+        return default_value
     return config_parser.get(section, key)
+
+
+def generate_execution_id() -> str:
+    # UTC start time (so the logs sort chronologically) and a random UUID (so concurrent runs never collide)
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + "_" + uuid4().hex
@@ -0,0 +1,73 @@
+from boto3.session import Session
+from botocore.config import Config
+from threading import Lock
+from typing import Any
+from util.metrics import MetricsRegistry
+from vm_manager.ec2_request_governor import EC2RequestGovernor
+from vm_manager.ec2_vm_manager import EC2_CLIENT_RETRIES_CONFIG
+
+
+class EC2ClientPool:
+    """
+    Per-region pool of EC2 clients created from a single shared boto3 session, so the session's startup cost is paid
+    once per process and each region's connection pool is shared by every fleet and worker thread of that region.
+    EC2 request quotas apply per account and region, so each region also gets a single EC2RequestGovernor.
+
+    max_pool_connections : the maximum number of pooled connections of each region's client.
+
+    api_request_rate_limits_dict : the request token bucket of each API, as {API name: (capacity, refill rate per
+    second)}.
+
+    throttling_max_attempts : the maximum number of attempts of a throttled request.
+
+    throttling_base_backoff_in_seconds : the backoff in seconds before the first retry of a throttled request.
+
+    throttling_max_backoff_in_seconds : the maximum backoff in seconds before a retry of a throttled request.
+
+    metrics_registry : the registry the governors export their requests counters to (None not to export them).
+    """
+    def __init__(self,
+                 max_pool_connections: int,
+                 api_request_rate_limits_dict: dict,
+                 throttling_max_attempts: int,
+                 throttling_base_backoff_in_seconds: float,
+                 throttling_max_backoff_in_seconds: float,
+                 metrics_registry: MetricsRegistry = None) -> None:
+        self.__session = Session()
+        self.__config = Config(max_pool_connections=max_pool_connections,
+                               retries=EC2_CLIENT_RETRIES_CONFIG)
+        self.__api_request_rate_limits_dict = api_request_rate_limits_dict
+        self.__throttling_max_attempts = throttling_max_attempts
+        self.__throttling_base_backoff_in_seconds = throttling_base_backoff_in_seconds
+        self.__throttling_max_backoff_in_seconds = throttling_max_backoff_in_seconds
+        self.__metrics_registry = metrics_registry
+        self.__ec2_clients_dict = {}
+        self.__ec2_request_governors_dict = {}
+        self.__lock = Lock()
+
+    def get_ec2_client(self,
+                       region_name: str) -> Any:
+        with self.__lock:
+            if region_name not in self.__ec2_clients_dict:
+                self.__ec2_clients_dict[region_name] = self.__session.client(service_name="ec2",
+                                                                             region_name=region_name,
+                                                                             config=self.__config)
+            return self.__ec2_clients_dict[region_name]
+
+    def get_ec2_request_governor(self,
+                                 region_name: str) -> EC2RequestGovernor:
+        with self.__lock:
+            if region_name not in self.__ec2_request_governors_dict:
+                self.__ec2_request_governors_dict[region_name] = \
+                    EC2RequestGovernor(api_request_rate_limits_dict=self.__api_request_rate_limits_dict,
+                                       max_attempts=self.__throttling_max_attempts,
+                                       base_backoff_in_seconds=self.__throttling_base_backoff_in_seconds,
+                                       max_backoff_in_seconds=self.__throttling_max_backoff_in_seconds,
+                                       region_name=region_name,
+                                       metrics_registry=self.__metrics_registry)
+            return self.__ec2_request_governors_dict[region_name]
+
+    def get_ec2_requests_counters_dict(self) -> dict:
+        with self.__lock:
+            return {region_name: ec2_request_governor.get_counters_dict()
+                    for region_name, ec2_request_governor in self.__ec2_request_governors_dict.items()}
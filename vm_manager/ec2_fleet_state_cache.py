@@ -0,0 +1,234 @@
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from typing import Any
+from vm_manager.ec2_vm_manager import EC2VMManager
+
+# States of the instances leaving the fleet (or about to), queried by the incremental membership refreshes
+LEAVING_INSTANCES_STATES_NAMES = ["shutting-down", "terminated", "stopping", "stopped"]
+# States of the instances joining the fleet, queried (among the recently launched ones) by the incremental refreshes
+JOINING_INSTANCES_STATES_NAMES = ["pending", "running"]
+
+
+class EC2FleetStateCache:
+    """
+    Cache of the fleet's instances states, refreshed in bulk in the background, so the describe calls stay off the
+    revocation events' hot path.
+
+    ec2vmm : the EC2VMManager to describe the instances with.
+
+    instances_id_list : the IDs of the fleet's instances.
+
+    clock : the clock to measure the cached view's age with (WallClock | VirtualClock).
+
+    refresh_interval_in_seconds : the interval in seconds between two bulk refreshes.
+
+    max_staleness_in_seconds : the maximum age in seconds of the cached view an event may use.
+    Older views are refreshed synchronously before being used.
+
+    background_refresh : whether an EC2FleetStateRefresher refreshes the cache in the background (otherwise, it is
+    refreshed on access once the refresh interval elapsed, as the simulated execution mode requires).
+
+    discovery_filters_list : the EC2 filters (e.g., tags) the fleet's instances are discovered with, instead of a fixed
+    instances IDs list (None to describe the instances_id_list only).
+    Discovered fleets are refreshed incrementally: only the recently launched instances and the leaving ones are
+    listed, and the whole fleet is listed again once every full resync interval.
+
+    full_resync_interval_in_seconds : the interval in seconds between two full listings of a discovered fleet.
+    """
+    def __init__(self,
+                 ec2vmm: EC2VMManager,
+                 instances_id_list: list,
+                 clock: Any,
+                 refresh_interval_in_seconds: float,
+                 max_staleness_in_seconds: float,
+                 background_refresh: bool,
+                 discovery_filters_list: list = None,
+                 full_resync_interval_in_seconds: float = None) -> None:
+        self.__ec2vmm = ec2vmm
+        self.__instances_id_list = instances_id_list
+        self.__clock = clock
+        self.__refresh_interval_in_seconds = refresh_interval_in_seconds
+        self.__max_staleness_in_seconds = max_staleness_in_seconds
+        self.__background_refresh = background_refresh
+        self.__discovery_filters_list = discovery_filters_list
+        self.__full_resync_interval_in_seconds = full_resync_interval_in_seconds
+        self.__last_full_resync_time = None
+        self.__last_discovery_datetime = None
+        self.__instances_states_dict = {}
+        self.__instances_states_delta_dict = {}
+        self.__invalidated_instances_ids = set()
+        self.__last_refresh_time = None
+        self.__lock = Lock()
+        # Serializes the refreshes (the background refresher's and the synchronous ones), as they read and write the
+        # discovery and resync times outside the lock
+        self.__refresh_lock = Lock()
+
+    def __update_instance_state(self,
+                                instance_id: str,
+                                state: str) -> None:
+        if self.__instances_states_dict.get(instance_id) != state:
+            self.__instances_states_dict[instance_id] = state
+            self.__instances_states_delta_dict[instance_id] = state
+
+    @staticmethod
+    def __get_launch_time_filter_values(since_datetime: datetime,
+                                        until_datetime: datetime) -> list:
+        # EC2 filters launch times by wildcard only, so the window is covered by its (UTC) hours
+        launch_time_filter_values = []
+        hour_datetime = since_datetime.replace(minute=0, second=0, microsecond=0)
+        while hour_datetime <= until_datetime:
+            launch_time_filter_values.append(hour_datetime.strftime("%Y-%m-%dT%H*"))
+            hour_datetime += timedelta(hours=1)
+        return launch_time_filter_values
+
+    def __discover_instances_states_changes_dict(self) -> dict:
+        discovery_datetime = datetime.now(timezone.utc)
+        # One extra hour covers the instances launched just before the previous discovery, but still pending then
+        since_datetime = self.__last_discovery_datetime - timedelta(hours=1)
+        launch_time_filter = {"Name": "launch-time",
+                              "Values": self.__get_launch_time_filter_values(since_datetime, discovery_datetime)}
+        instances_states_changes_dict = \
+            self.__ec2vmm.discover_ec2_instances_states_dict(self.__discovery_filters_list + [launch_time_filter],
+                                                            JOINING_INSTANCES_STATES_NAMES)
+        instances_states_changes_dict.update(
+            self.__ec2vmm.discover_ec2_instances_states_dict(self.__discovery_filters_list,
+                                                            LEAVING_INSTANCES_STATES_NAMES))
+        self.__last_discovery_datetime = discovery_datetime
+        return instances_states_changes_dict
+
+    def __describe_instances_states_dict(self,
+                                         refresh_time: float) -> tuple:
+        # Returns the described instances states, and the instances whose state they settle
+        if self.__discovery_filters_list is None:
+            described_instances_states_dict = self.__ec2vmm.get_ec2_instances_states_dict(self.__instances_id_list)
+            return described_instances_states_dict, self.__instances_id_list
+        if self.__last_full_resync_time is None \
+                or refresh_time - self.__last_full_resync_time >= self.__full_resync_interval_in_seconds:
+            self.__last_discovery_datetime = datetime.now(timezone.utc)
+            described_instances_states_dict = \
+                self.__ec2vmm.discover_ec2_instances_states_dict(self.__discovery_filters_list)
+            self.__last_full_resync_time = refresh_time
+            # Known instances missing from a full listing are gone for good
+            return described_instances_states_dict, \
+                list(described_instances_states_dict) + [instance_id for instance_id in self.__instances_states_dict
+                                                         if instance_id not in described_instances_states_dict]
+        described_instances_states_dict = self.__discover_instances_states_changes_dict()
+        return described_instances_states_dict, list(described_instances_states_dict)
+
+    def refresh(self) -> None:
+        with self.__refresh_lock:
+            refresh_time = self.__clock.now()
+            described_instances_states_dict, instances_id_list = self.__describe_instances_states_dict(refresh_time)
+            with self.__lock:
+                for instance_id in instances_id_list:
+                    # Instances no longer described by AWS are gone for good
+                    state = described_instances_states_dict.get(instance_id, "terminated")
+                    if instance_id in self.__invalidated_instances_ids:
+                        if state == "running":
+                            # AWS may still report a just-revoked instance as running, so the invalidation prevails
+                            continue
+                        self.__invalidated_instances_ids.discard(instance_id)
+                    self.__update_instance_state(instance_id, state)
+                    if self.__discovery_filters_list is not None \
+                            and instance_id not in described_instances_states_dict:
+                        # Forget the discovered instances gone for good, so churn does not grow the cache
+                        del self.__instances_states_dict[instance_id]
+                self.__last_refresh_time = refresh_time
+
+    def invalidate(self,
+                   instances_id_list: list) -> None:
+        with self.__lock:
+            for instance_id in instances_id_list:
+                self.__invalidated_instances_ids.add(instance_id)
+                self.__update_instance_state(instance_id, "revoked")
+
+    def revalidate(self,
+                   instances_id_list: list) -> None:
+        # Lifts the invalidation of the instances whose revocation failed, unless a refresh settled their state already
+        with self.__lock:
+            for instance_id in instances_id_list:
+                if instance_id not in self.__invalidated_instances_ids:
+                    continue
+                self.__invalidated_instances_ids.discard(instance_id)
+                if self.__instances_states_dict.get(instance_id) == "revoked":
+                    self.__update_instance_state(instance_id, "running")
+
+    def get_snapshot_dict(self) -> dict:
+        with self.__lock:
+            last_discovery_datetime = self.__last_discovery_datetime.isoformat() \
+                if self.__last_discovery_datetime else None
+            return {"instances_states": dict(self.__instances_states_dict),
+                    "invalidated_instances_ids": list(self.__invalidated_instances_ids),
+                    "last_discovery_datetime": last_discovery_datetime}
+
+    def restore_snapshot(self,
+                         snapshot_dict: dict) -> None:
+        # The restored states are popped by the next pop_states_delta, and a discovered fleet resumes with an
+        # incremental refresh (from its last discovery on) instead of a full listing
+        with self.__refresh_lock, self.__lock:
+            self.__instances_states_dict = dict(snapshot_dict["instances_states"])
+            self.__instances_states_delta_dict = dict(self.__instances_states_dict)
+            self.__invalidated_instances_ids = set(snapshot_dict["invalidated_instances_ids"])
+            if self.__discovery_filters_list is not None and snapshot_dict["last_discovery_datetime"]:
+                self.__last_discovery_datetime = datetime.fromisoformat(snapshot_dict["last_discovery_datetime"])
+                self.__last_full_resync_time = self.__clock.now()
+
+    def __get_staleness_in_seconds(self) -> float:
+        if self.__last_refresh_time is None:
+            return float("inf")
+        return self.__clock.now() - self.__last_refresh_time
+
+    def pop_states_delta(self) -> dict:
+        # Returns the instances whose state changed since the previous call
+        staleness = self.__get_staleness_in_seconds()
+        if staleness > self.__max_staleness_in_seconds \
+                or (not self.__background_refresh and staleness >= self.__refresh_interval_in_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                # A failed refresh (e.g., throttled beyond its retries) must not stop the revocations, so the
+                # previous view is used, unless there is none yet
+                if self.__last_refresh_time is None:
+                    raise
+        with self.__lock:
+            instances_states_delta_dict = self.__instances_states_delta_dict
+            self.__instances_states_delta_dict = {}
+        return instances_states_delta_dict
+
+
+class EC2FleetStateRefresher:
+    """
+    Single background thread that refreshes the states caches of every fleet, so the number of threads does not grow
+    with the number of fleets.
+
+    fleet_state_caches_list : the EC2FleetStateCache objects to refresh.
+
+    refresh_interval_in_seconds : the interval in seconds between two bulk refreshes of every cache.
+    """
+    def __init__(self,
+                 fleet_state_caches_list: list,
+                 refresh_interval_in_seconds: float) -> None:
+        self.__fleet_state_caches_list = fleet_state_caches_list
+        self.__refresh_interval_in_seconds = refresh_interval_in_seconds
+        self.__stop_event = Event()
+        self.__refresh_thread = None
+
+    def __refresh_periodically(self) -> None:
+        while not self.__stop_event.wait(self.__refresh_interval_in_seconds):
+            for fleet_state_cache in self.__fleet_state_caches_list:
+                try:
+                    fleet_state_cache.refresh()
+                except Exception:
+                    # A failed refresh leaves the cached view aging, until the max staleness forces a synchronous one
+                    pass
+
+    def start(self) -> None:
+        self.__refresh_thread = Thread(target=self.__refresh_periodically,
+                                       name="fleet_state_refreshing_thread",
+                                       daemon=True)
+        self.__refresh_thread.start()
+
+    def stop(self) -> None:
+        self.__stop_event.set()
+        if self.__refresh_thread:
+            self.__refresh_thread.join()
@@ -0,0 +1,62 @@
+from threading import Event, Lock
+from time import sleep
+from typing import Callable
+
+
+class EC2RequestCoalescer:
+    """
+    Coalescer of the instances IDs requests (e.g., TerminateInstances) arriving close together, so the concurrent
+    revocations of several events share a single API call, and a single request token.
+
+    The first request of a batch waits for the coalescing window, while the following ones join its batch, up to the
+    maximum batch size. It then sends the whole batch, and every request of the batch gets the batch's outcome.
+
+    batch_function : the function sending a batch of instances IDs.
+
+    coalescing_window_in_seconds : the time in seconds a batch stays open to the requests arriving after its first one.
+
+    max_batch_size : the maximum number of instances IDs of a batch.
+    """
+    def __init__(self,
+                 batch_function: Callable[[list], None],
+                 coalescing_window_in_seconds: float,
+                 max_batch_size: int) -> None:
+        self.__batch_function = batch_function
+        self.__coalescing_window_in_seconds = coalescing_window_in_seconds
+        self.__max_batch_size = max_batch_size
+        self.__open_batch = None
+        self.__requests_counter = 0
+        self.__batches_counter = 0
+        self.__lock = Lock()
+
+    def get_counters_dict(self) -> dict:
+        with self.__lock:
+            return {"requests": self.__requests_counter,
+                    "batches": self.__batches_counter}
+
+    def submit(self,
+               instances_id_list: list) -> None:
+        with self.__lock:
+            self.__requests_counter += 1
+            batch = self.__open_batch
+            is_first_request = batch is None or len(batch["instances_id_list"]) + len(instances_id_list) \
+                > self.__max_batch_size
+            if is_first_request:
+                batch = {"instances_id_list": [], "sent_event": Event(), "exception": None}
+                self.__open_batch = batch
+                self.__batches_counter += 1
+            batch["instances_id_list"].extend(instances_id_list)
+        if is_first_request:
+            sleep(self.__coalescing_window_in_seconds)
+            with self.__lock:
+                if self.__open_batch is batch:
+                    self.__open_batch = None
+            try:
+                self.__batch_function(batch["instances_id_list"])
+            except Exception as exception:
+                batch["exception"] = exception
+            batch["sent_event"].set()
+        else:
+            batch["sent_event"].wait()
+        if batch["exception"] is not None:
+            raise batch["exception"]
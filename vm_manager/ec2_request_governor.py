@@ -0,0 +1,114 @@
+from botocore.exceptions import ClientError
+from random import Random
+from threading import Lock
+from time import sleep
+from typing import Any, Callable
+from util.metrics import MetricsRegistry
+from util.token_bucket import TokenBucket
+
+# Error codes EC2 (and botocore) use for throttled requests
+THROTTLING_ERROR_CODES = {"RequestLimitExceeded", "Throttling", "ThrottlingException", "RequestThrottled"}
+
+
+class EC2RequestGovernor:
+    """
+    Rate-governed request layer shared by the describe, terminate and reboot calls of a region, so the process stays
+    within the account's EC2 request quotas instead of hitting RequestLimitExceeded.
+
+    Each API draws from its own token bucket, sized after EC2's request token buckets. Throttled requests are retried
+    after an exponential backoff with full jitter, and slow their bucket's refill rate down until requests succeed
+    again. Requests failing for other reasons are not retried, but raised to the caller.
+
+    api_request_rate_limits_dict : the token bucket of each API, as {API name: (capacity, refill rate per second)}
+    (APIs not listed are not rate-limited).
+
+    max_attempts : the maximum number of attempts of a throttled request (the last throttling error is raised).
+
+    base_backoff_in_seconds : the backoff in seconds before the first retry (doubled for each following one).
+
+    max_backoff_in_seconds : the maximum backoff in seconds before a retry.
+
+    region_name : the region the governed requests are sent to (a label of the exported metrics).
+
+    metrics_registry : the registry to export the requests counters to (None not to export them).
+    """
+    def __init__(self,
+                 api_request_rate_limits_dict: dict,
+                 max_attempts: int,
+                 base_backoff_in_seconds: float,
+                 max_backoff_in_seconds: float,
+                 region_name: str = None,
+                 metrics_registry: MetricsRegistry = None) -> None:
+        self.__token_buckets_dict = {api_name: TokenBucket(capacity=capacity,
+                                                           refill_rate_per_second=refill_rate_per_second)
+                                     for api_name, (capacity, refill_rate_per_second)
+                                     in api_request_rate_limits_dict.items()}
+        self.__max_attempts = max_attempts
+        self.__base_backoff_in_seconds = base_backoff_in_seconds
+        self.__max_backoff_in_seconds = max_backoff_in_seconds
+        self.__random_generator = Random()
+        self.__counters_dict = {}
+        self.__region_name = region_name
+        self.__requests_counter = metrics_registry.counter("vm_revoker_ec2_requests_total",
+                                                           "EC2 requests sent, throttled, retried and failed.",
+                                                           ("region", "api", "counter")) \
+            if metrics_registry else None
+        self.__lock = Lock()
+
+    @staticmethod
+    def is_throttling_error(exception: Exception) -> bool:
+        return isinstance(exception, ClientError) \
+            and exception.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+    def __increment_counter(self,
+                            api_name: str,
+                            counter_name: str) -> None:
+        with self.__lock:
+            api_counters_dict = self.__counters_dict.setdefault(api_name, {"requests": 0,
+                                                                          "throttles": 0,
+                                                                          "retries": 0,
+                                                                          "failures": 0})
+            api_counters_dict[counter_name] += 1
+        if self.__requests_counter:
+            self.__requests_counter.inc(labels_values=(self.__region_name, api_name, counter_name))
+
+    def get_counters_dict(self) -> dict:
+        with self.__lock:
+            return {api_name: dict(api_counters_dict) for api_name, api_counters_dict in self.__counters_dict.items()}
+
+    def __get_backoff_in_seconds(self,
+                                 attempt: int) -> float:
+        # Full jitter: a uniformly drawn backoff spreads the retries of the throttled threads apart
+        with self.__lock:
+            return self.__random_generator.uniform(0, min(self.__max_backoff_in_seconds,
+                                                          self.__base_backoff_in_seconds * 2 ** attempt))
+
+    def call(self,
+             api_name: str,
+             api_function: Callable[..., Any],
+             **api_arguments: Any) -> Any:
+        token_bucket = self.__token_buckets_dict.get(api_name)
+        attempt = 0
+        while True:
+            if token_bucket:
+                token_bucket.acquire()
+            self.__increment_counter(api_name, "requests")
+            try:
+                response = api_function(**api_arguments)
+            except Exception as exception:
+                if not self.is_throttling_error(exception):
+                    self.__increment_counter(api_name, "failures")
+                    raise
+                self.__increment_counter(api_name, "throttles")
+                if token_bucket:
+                    token_bucket.decrease_rate()
+                attempt += 1
+                if attempt >= self.__max_attempts:
+                    self.__increment_counter(api_name, "failures")
+                    raise
+                self.__increment_counter(api_name, "retries")
+                sleep(self.__get_backoff_in_seconds(attempt))
+                continue
+            if token_bucket:
+                token_bucket.increase_rate()
+            return response
@@ -1,37 +1,214 @@
-from boto3 import client, resource
-from botocore.exceptions import ClientError
+from boto3 import client
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from typing import Any
+from util.metrics import MetricsRegistry
+from vm_manager.ec2_request_coalescer import EC2RequestCoalescer
+from vm_manager.ec2_request_governor import EC2RequestGovernor
+
+# Maximum number of values accepted by a single DescribeInstances filter
+DESCRIBE_INSTANCES_MAX_FILTER_VALUES = 200
+# Maximum number of results returned by a single DescribeInstances page
+DESCRIBE_INSTANCES_MAX_RESULTS = 1000
+# Maximum number of instance IDs accepted by a single TerminateInstances/RebootInstances call
+REVOKE_INSTANCES_MAX_IDS = 1000
+# botocore retries are disabled, so every attempt goes through the request governor's token buckets and backoff
+EC2_CLIENT_RETRIES_CONFIG = {"total_max_attempts": 1, "mode": "standard"}
 
 
 class EC2VMManager:
 
     def __init__(self,
                  service_name: str,
-                 region_name: str) -> None:
-        self.__ec2_resource = resource(service_name=service_name, region_name=region_name)
-        self.__ec2_client = client(service_name=service_name, region_name=region_name)
-
-    def __get_ec2_instance_from_id(self,
-                                   instance_id: str) -> Any:
-        return self.__ec2_resource.Instance(instance_id)
-
-    def get_active_ec2_instances_list(self,
-                                      instances_id_list: list) -> list:
-        active_ec2_instances_list = []
-        for instance_id in instances_id_list:
-            instance = self.__get_ec2_instance_from_id(instance_id)
-            try:
-                if instance and instance.state["Name"] == "running":
-                    print(type(instance))
-                    active_ec2_instances_list.append(instance)
-            except ClientError:
-                pass  # Instance entry removed by AWS
-        return active_ec2_instances_list
+                 region_name: str,
+                 describe_instances_max_workers: int = 1,
+                 max_pool_connections: int = 10,
+                 ec2_client: Any = None,
+                 ec2_request_governor: EC2RequestGovernor = None,
+                 revocation_coalescing_window_in_seconds: float = 0.0,
+                 metrics_registry: MetricsRegistry = None) -> None:
+        self.__describe_instances_max_workers = describe_instances_max_workers
+        self.__region_name = region_name
+        # boto3 clients are thread-safe, so a single client (and its connection pool) is shared by all the workers
+        self.__ec2_client = ec2_client if ec2_client \
+            else client(service_name=service_name,
+                        region_name=region_name,
+                        config=Config(max_pool_connections=max_pool_connections,
+                                      retries=EC2_CLIENT_RETRIES_CONFIG))
+        self.__ec2_request_governor = ec2_request_governor
+        self.__terminate_instances_coalescer = None
+        self.__reboot_instances_coalescer = None
+        if revocation_coalescing_window_in_seconds > 0:
+            self.__terminate_instances_coalescer = \
+                EC2RequestCoalescer(batch_function=self.__terminate_ec2_instances_batch,
+                                    coalescing_window_in_seconds=revocation_coalescing_window_in_seconds,
+                                    max_batch_size=REVOKE_INSTANCES_MAX_IDS)
+            self.__reboot_instances_coalescer = \
+                EC2RequestCoalescer(batch_function=self.__reboot_ec2_instances_batch,
+                                    coalescing_window_in_seconds=revocation_coalescing_window_in_seconds,
+                                    max_batch_size=REVOKE_INSTANCES_MAX_IDS)
+        self.__api_call_latency_histogram = None
+        self.__api_call_errors_counter = None
+        if metrics_registry:
+            self.__api_call_latency_histogram = \
+                metrics_registry.histogram("vm_revoker_ec2_api_call_latency_seconds",
+                                           "Latency of the EC2 API calls, including their throttling retries.",
+                                           ("region", "api"))
+            self.__api_call_errors_counter = \
+                metrics_registry.counter("vm_revoker_ec2_api_call_errors_total",
+                                         "EC2 API calls that failed (after their throttling retries).",
+                                         ("region", "api", "error"))
+
+    def __call_ec2_api(self,
+                       api_name: str,
+                       **api_arguments: Any) -> Any:
+        api_function = getattr(self.__ec2_client, api_name)
+        start_time = perf_counter()
+        try:
+            if self.__ec2_request_governor:
+                return self.__ec2_request_governor.call(api_name, api_function, **api_arguments)
+            return api_function(**api_arguments)
+        except Exception as exception:
+            if self.__api_call_errors_counter:
+                error_name = getattr(exception, "response", {}).get("Error", {}).get("Code",
+                                                                                    type(exception).__name__)
+                self.__api_call_errors_counter.inc(labels_values=(self.__region_name, api_name, error_name))
+            raise
+        finally:
+            if self.__api_call_latency_histogram:
+                self.__api_call_latency_histogram.observe(perf_counter() - start_time,
+                                                          (self.__region_name, api_name))
+
+    def get_revocation_coalescing_counters_dict(self) -> dict:
+        if self.__terminate_instances_coalescer is None:
+            return {}
+        return {"terminate_instances": self.__terminate_instances_coalescer.get_counters_dict(),
+                "reboot_instances": self.__reboot_instances_coalescer.get_counters_dict()}
+
+    @staticmethod
+    def __split_instances_id_list_into_chunks(instances_id_list: list,
+                                              chunk_size: int = DESCRIBE_INSTANCES_MAX_FILTER_VALUES) -> list:
+        return [instances_id_list[index:index + chunk_size]
+                for index in range(0, len(instances_id_list), chunk_size)]
+
+    @staticmethod
+    def __get_ec2_instance_attribute(instance: dict,
+                                     attribute_name: str) -> str:
+        if attribute_name == "state":
+            return instance["State"]["Name"]
+        elif attribute_name == "instance_type":
+            return instance["InstanceType"]
+        elif attribute_name == "availability_zone":
+            return instance["Placement"]["AvailabilityZone"]
+        raise ValueError("Unsupported EC2 instance attribute: '{0}'!".format(attribute_name))
+
+    def __describe_ec2_instances_attribute_pages(self,
+                                                 filters_list: list,
+                                                 attribute_name: str) -> dict:
+        ec2_instances_attribute_dict = {}
+        # Pages are requested one by one (rather than through a paginator), so each of them is rate-governed
+        page_arguments_dict = {"Filters": filters_list,
+                               "MaxResults": DESCRIBE_INSTANCES_MAX_RESULTS}
+        while True:
+            page = self.__call_ec2_api("describe_instances", **page_arguments_dict)
+            for reservation in page["Reservations"]:
+                for instance in reservation["Instances"]:
+                    ec2_instances_attribute_dict[instance["InstanceId"]] = \
+                        self.__get_ec2_instance_attribute(instance, attribute_name)
+            if not page.get("NextToken"):
+                break
+            page_arguments_dict["NextToken"] = page["NextToken"]
+        return ec2_instances_attribute_dict
+
+    def __describe_ec2_instances_attribute_chunk(self,
+                                                 instances_id_chunk: list,
+                                                 instances_states_names_list: list,
+                                                 attribute_name: str) -> dict:
+        filters_list = [{"Name": "instance-id", "Values": instances_id_chunk}]
+        if instances_states_names_list:
+            filters_list.append({"Name": "instance-state-name", "Values": instances_states_names_list})
+        return self.__describe_ec2_instances_attribute_pages(filters_list, attribute_name)
+
+    def __get_ec2_instances_attribute_dict(self,
+                                           instances_id_list: list,
+                                           instances_states_names_list: list,
+                                           attribute_name: str) -> dict:
+        ec2_instances_attribute_dict = {}
+        instances_id_chunks_list = self.__split_instances_id_list_into_chunks(instances_id_list)
+        if self.__describe_instances_max_workers > 1 and len(instances_id_chunks_list) > 1:
+            with ThreadPoolExecutor(max_workers=self.__describe_instances_max_workers) as executor:
+                chunks_attribute_dicts = executor.map(lambda chunk:
+                                                      self.__describe_ec2_instances_attribute_chunk(
+                                                          chunk,
+                                                          instances_states_names_list,
+                                                          attribute_name),
+                                                      instances_id_chunks_list)
+                for chunk_attribute_dict in chunks_attribute_dicts:
+                    ec2_instances_attribute_dict.update(chunk_attribute_dict)
+        else:
+            for instances_id_chunk in instances_id_chunks_list:
+                ec2_instances_attribute_dict.update(
+                    self.__describe_ec2_instances_attribute_chunk(instances_id_chunk,
+                                                                  instances_states_names_list,
+                                                                  attribute_name))
+        return ec2_instances_attribute_dict
+
+    def get_ec2_instances_states_dict(self,
+                                      instances_id_list: list,
+                                      instances_states_names_list: list = None) -> dict:
+        # Instances in any state are described when no states names are given
+        return self.__get_ec2_instances_attribute_dict(instances_id_list, instances_states_names_list, "state")
+
+    def get_ec2_instances_groups_dict(self,
+                                      instances_id_list: list,
+                                      group_attribute_name: str) -> dict:
+        # Supported group attributes: instance_type | availability_zone
+        return self.__get_ec2_instances_attribute_dict(instances_id_list, None, group_attribute_name)
+
+    def discover_ec2_instances_states_dict(self,
+                                           discovery_filters_list: list,
+                                           instances_states_names_list: list = None) -> dict:
+        # The instances are selected server-side by the filters (e.g., tags), so no instance IDs list is needed
+        filters_list = list(discovery_filters_list)
+        if instances_states_names_list:
+            filters_list.append({"Name": "instance-state-name", "Values": instances_states_names_list})
+        return self.__describe_ec2_instances_attribute_pages(filters_list, "state")
+
+    def get_active_ec2_instances_states_dict(self,
+                                             instances_id_list: list) -> dict:
+        return self.get_ec2_instances_states_dict(instances_id_list, ["running"])
+
+    def __reboot_ec2_instances_batch(self,
+                                     instances_id_list: list) -> None:
+        for instances_id_chunk in self.__split_instances_id_list_into_chunks(instances_id_list,
+                                                                             REVOKE_INSTANCES_MAX_IDS):
+            self.__call_ec2_api("reboot_instances", InstanceIds=instances_id_chunk)
+
+    def __terminate_ec2_instances_batch(self,
+                                        instances_id_list: list) -> None:
+        for instances_id_chunk in self.__split_instances_id_list_into_chunks(instances_id_list,
+                                                                             REVOKE_INSTANCES_MAX_IDS):
+            self.__call_ec2_api("terminate_instances", InstanceIds=instances_id_chunk)
+
+    def reboot_ec2_instances(self,
+                             instances_id_list: list) -> None:
+        if self.__reboot_instances_coalescer:
+            self.__reboot_instances_coalescer.submit(instances_id_list)
+        else:
+            self.__reboot_ec2_instances_batch(instances_id_list)
+
+    def terminate_ec2_instances(self,
+                                instances_id_list: list) -> None:
+        if self.__terminate_instances_coalescer:
+            self.__terminate_instances_coalescer.submit(instances_id_list)
+        else:
+            self.__terminate_ec2_instances_batch(instances_id_list)
 
     def reboot_ec2_instance(self,
                             instance_id: str) -> None:
-        self.__ec2_client.reboot_instances(InstanceIds=[instance_id])
+        self.reboot_ec2_instances([instance_id])
 
     def terminate_ec2_instance(self,
                                instance_id: str) -> None:
-        self.__ec2_client.terminate_instances(InstanceIds=[instance_id])
+        self.terminate_ec2_instances([instance_id])
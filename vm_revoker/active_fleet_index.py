@@ -0,0 +1,111 @@
+from queue import Empty, SimpleQueue
+from random import Random
+
+
+class ActiveFleetIndex:
+    """
+    Membership index of the active VMs, with O(1) insertion, removal and (optionally weighted) random selection.
+
+    Each group of VMs (e.g., instance type or availability zone) is kept in a dense list, alongside a map of each
+    VM's position, so a VM is removed by swapping it with its group's last VM. Weighted selection picks a group with
+    probability proportional to its weight times its number of VMs, then a VM uniformly within that group, so its
+    cost depends on the number of groups and not on the size of the fleet.
+
+    The index is used by the selecting thread only, except for requeue, which any thread may call: VMs whose
+    revocation failed produce no state change, so they are requeued and re-added before the next update or selection.
+
+    random_generator : the random number generator to select the VMs with.
+
+    groups_weights_dict : the selection weight of each group (VMs of unlisted groups weigh 1).
+    """
+    def __init__(self,
+                 random_generator: Random,
+                 groups_weights_dict: dict = None) -> None:
+        self.__random_generator = random_generator
+        self.__groups_weights_dict = groups_weights_dict if groups_weights_dict else {}
+        self.__groups_instances_lists = {}
+        self.__instances_positions_dict = {}
+        self.__requeued_instances_queue = SimpleQueue()
+
+    def __len__(self) -> int:
+        return len(self.__instances_positions_dict)
+
+    def __contains__(self,
+                     instance_id: str) -> bool:
+        return instance_id in self.__instances_positions_dict
+
+    def add(self,
+            instance_id: str,
+            group_key: str = None) -> None:
+        if instance_id in self.__instances_positions_dict:
+            return
+        group_instances_list = self.__groups_instances_lists.setdefault(group_key, [])
+        self.__instances_positions_dict[instance_id] = (group_key, len(group_instances_list))
+        group_instances_list.append(instance_id)
+
+    def remove(self,
+               instance_id: str) -> None:
+        group_key, position = self.__instances_positions_dict.pop(instance_id, (None, None))
+        if position is None:
+            return
+        group_instances_list = self.__groups_instances_lists[group_key]
+        last_instance_id = group_instances_list.pop()
+        if last_instance_id != instance_id:
+            group_instances_list[position] = last_instance_id
+            self.__instances_positions_dict[last_instance_id] = (group_key, position)
+        if not group_instances_list:
+            del self.__groups_instances_lists[group_key]
+
+    def requeue(self,
+                instances_ids_list: list,
+                groups_keys_dict: dict = None) -> None:
+        self.__requeued_instances_queue.put((instances_ids_list, groups_keys_dict))
+
+    def __add_requeued_instances(self) -> None:
+        while True:
+            try:
+                instances_ids_list, groups_keys_dict = self.__requeued_instances_queue.get_nowait()
+            except Empty:
+                return
+            for instance_id in instances_ids_list:
+                self.add(instance_id, groups_keys_dict.get(instance_id) if groups_keys_dict else None)
+
+    def apply_states_delta(self,
+                           states_delta_dict: dict,
+                           groups_keys_dict: dict = None) -> None:
+        # Requeued VMs are re-added first, so a newer state change (e.g., terminated meanwhile) prevails
+        self.__add_requeued_instances()
+        for instance_id, state in states_delta_dict.items():
+            if state == "running":
+                self.add(instance_id, groups_keys_dict.get(instance_id) if groups_keys_dict else None)
+            else:
+                self.remove(instance_id)
+
+    def __get_group_weight(self,
+                           group_key: str) -> float:
+        return self.__groups_weights_dict.get(group_key, 1) * len(self.__groups_instances_lists[group_key])
+
+    def __choose_group_instances_list(self) -> list:
+        if len(self.__groups_instances_lists) == 1 and not self.__groups_weights_dict:
+            return next(iter(self.__groups_instances_lists.values()))
+        groups_keys_list = list(self.__groups_instances_lists)
+        groups_weights_list = [self.__get_group_weight(group_key) for group_key in groups_keys_list]
+        if sum(groups_weights_list) <= 0:
+            # Only zero-weight groups are left, so no VM is selectable
+            return None
+        group_key = self.__random_generator.choices(groups_keys_list, weights=groups_weights_list)[0]
+        return self.__groups_instances_lists[group_key]
+
+    def pop_random(self,
+                   number_of_instances: int) -> list:
+        # Selects (and removes) up to number_of_instances distinct VMs
+        self.__add_requeued_instances()
+        selected_instances_ids_list = []
+        while self.__instances_positions_dict and len(selected_instances_ids_list) < number_of_instances:
+            group_instances_list = self.__choose_group_instances_list()
+            if group_instances_list is None:
+                break
+            instance_id = group_instances_list[int(self.__random_generator.random() * len(group_instances_list))]
+            self.remove(instance_id)
+            selected_instances_ids_list.append(instance_id)
+        return selected_instances_ids_list
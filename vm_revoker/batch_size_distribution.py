@@ -0,0 +1,81 @@
+from math import exp, floor
+from random import Random
+
+
+class BatchSizeDistribution:
+    """
+    Distribution of the number of VMs revoked by each event of the compound Poisson process.
+
+    distribution_name : the name of the distribution.
+    Supported distributions: constant (always the mean) | geometric (support 1, 2, ...) |
+    poisson (1 + Poisson(mean - 1)) | uniform (between 1 and 2 · mean - 1)
+    Non-integer means are met exactly by randomized rounding (e.g., a constant mean of 1.5 revokes 1 or 2 VMs, evenly).
+
+    batch_size_mean : the mean number of VMs revoked per event.
+
+    batch_size_max : the maximum number of VMs revoked per event.
+
+    random_generator : the random number generator to draw the batch sizes from.
+    """
+    def __init__(self,
+                 distribution_name: str,
+                 batch_size_mean: float,
+                 batch_size_max: int,
+                 random_generator: Random) -> None:
+        if batch_size_mean < 1:
+            raise ValueError("The mean batch size must be at least 1!")
+        self.__distribution_name = distribution_name
+        self.__batch_size_mean = batch_size_mean
+        self.__batch_size_max = batch_size_max
+        self.__random_generator = random_generator
+
+    def __str__(self) -> str:
+        return "{0} (mean = {1}, max = {2})".format(self.__distribution_name,
+                                                    self.__batch_size_mean,
+                                                    self.__batch_size_max)
+
+    def __round_randomly(self,
+                         value: float) -> int:
+        # Rounds up with the probability of the fractional part, so the expected value is the value itself
+        integer_part = floor(value)
+        fractional_part = value - integer_part
+        if fractional_part > 0 and self.__random_generator.random() < fractional_part:
+            integer_part += 1
+        return integer_part
+
+    def __draw_uniform(self) -> int:
+        # Uniform between 1 and an upper bound of 2 · mean - 1, randomly rounded (the mean of 1..n being (n + 1) / 2)
+        upper_bound = self.__round_randomly(2 * self.__batch_size_mean - 1)
+        return self.__random_generator.randint(1, upper_bound)
+
+    def __draw_geometric(self) -> int:
+        success_probability = 1 / self.__batch_size_mean
+        batch_size = 1
+        while self.__random_generator.random() >= success_probability and batch_size < self.__batch_size_max:
+            batch_size += 1
+        return batch_size
+
+    def __draw_poisson(self) -> int:
+        poisson_mean = self.__batch_size_mean - 1
+        if poisson_mean > 30:
+            # Normal approximation, as Knuth's method below takes O(mean) draws
+            return max(0, round(self.__random_generator.gauss(poisson_mean, poisson_mean ** 0.5))) + 1
+        limit = exp(-poisson_mean)
+        number_of_occurrences = 0
+        product = self.__random_generator.random()
+        while product > limit:
+            number_of_occurrences += 1
+            product *= self.__random_generator.random()
+        return number_of_occurrences + 1
+
+    def draw(self) -> int:
+        batch_size = 1
+        if self.__distribution_name == "constant":
+            batch_size = self.__round_randomly(self.__batch_size_mean)
+        elif self.__distribution_name == "geometric":
+            batch_size = self.__draw_geometric()
+        elif self.__distribution_name == "poisson":
+            batch_size = self.__draw_poisson()
+        elif self.__distribution_name == "uniform":
+            batch_size = self.__draw_uniform()
+        return min(batch_size, self.__batch_size_max)
@@ -0,0 +1,94 @@
+from collections import deque
+from typing import Any, Callable, Iterator
+
+
+class DeadlineScheduler:
+    """
+    Drift-free scheduler that releases events at absolute deadlines of a monotonic clock, so the time spent handling
+    an event never delays the following ones.
+
+    clock : the clock to read the time from and to sleep on (WallClock | VirtualClock).
+
+    overdue_event_policy : how to handle events whose deadline passed by more than the overdue event tolerance.
+    Supported policies: fire_immediately (fire them right away, catching up on the schedule) |
+    coalesce (fold an overdue event into the next one of its stream, if that one is due already: the consumer carries
+    the coalesced event's work into it) | skip (drop them)
+
+    overdue_event_tolerance_in_seconds : the scheduling lag in seconds up to which an event is not overdue.
+    """
+    def __init__(self,
+                 clock: Any,
+                 overdue_event_policy: str,
+                 overdue_event_tolerance_in_seconds: float) -> None:
+        self.__clock = clock
+        self.__overdue_event_policy = overdue_event_policy
+        self.__overdue_event_tolerance_in_seconds = overdue_event_tolerance_in_seconds
+
+    def __is_next_stream_event_due(self,
+                                   arrival: tuple,
+                                   arrivals: Iterator[tuple],
+                                   buffered_arrivals: deque,
+                                   start_time: float,
+                                   stream_key: Callable) -> bool:
+        # Looks ahead (buffering the arrivals read meanwhile) for a due event of the arrival's stream, up to the first
+        # event not due yet, as the arrivals are ordered by time
+        for buffered_arrival in buffered_arrivals:
+            if start_time + buffered_arrival[1] > self.__clock.now():
+                return False
+            if stream_key is None or stream_key(buffered_arrival) == stream_key(arrival):
+                return True
+        for next_arrival in arrivals:
+            buffered_arrivals.append(next_arrival)
+            if start_time + next_arrival[1] > self.__clock.now():
+                return False
+            if stream_key is None or stream_key(next_arrival) == stream_key(arrival):
+                return True
+        return False
+
+    def __get_event_status(self,
+                           scheduling_lag_in_seconds: float,
+                           arrival: tuple,
+                           arrivals: Iterator[tuple],
+                           buffered_arrivals: deque,
+                           start_time: float,
+                           stream_key: Callable) -> str:
+        if scheduling_lag_in_seconds <= self.__overdue_event_tolerance_in_seconds:
+            return "fire"
+        if self.__overdue_event_policy == "skip":
+            return "skip"
+        if self.__overdue_event_policy == "coalesce" \
+                and self.__is_next_stream_event_due(arrival, arrivals, buffered_arrivals, start_time, stream_key):
+            return "coalesce"
+        return "fire"
+
+    def schedule(self,
+                 arrivals: Iterator[tuple],
+                 start_offset_in_seconds: float = 0.0,
+                 first_event_counter: int = 1,
+                 stream_key: Callable[[tuple], Any] = None) -> Iterator[tuple]:
+        # Yields (event counter, arrival, scheduling lag, status) tuples, where status is fire | coalesce | skip
+        # Each arrival is an (inter-arrival time, arrival time, ...) tuple, yielded as is, so it may carry more fields
+        # A resumed schedule starts start_offset_in_seconds into its arrival times, counting events from
+        # first_event_counter on
+        # Merged arrivals (e.g., of several fleets) are coalesced within their own stream only, given by stream_key
+        start_time = self.__clock.now() - start_offset_in_seconds
+        arrivals = iter(arrivals)
+        buffered_arrivals = deque()
+        event_counter = first_event_counter
+        while True:
+            arrival = buffered_arrivals.popleft() if buffered_arrivals else next(arrivals, None)
+            if arrival is None:
+                return
+            deadline = start_time + arrival[1]
+            remaining_time = deadline - self.__clock.now()
+            if remaining_time > 0:
+                self.__clock.sleep(remaining_time)
+            scheduling_lag_in_seconds = max(0.0, self.__clock.now() - deadline)
+            event_status = self.__get_event_status(scheduling_lag_in_seconds,
+                                                   arrival,
+                                                   arrivals,
+                                                   buffered_arrivals,
+                                                   start_time,
+                                                   stream_key)
+            yield event_counter, arrival, scheduling_lag_in_seconds, event_status
+            event_counter += 1
@@ -0,0 +1,94 @@
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, islice, repeat
+from math import sqrt
+from random import Random
+from typing import Iterator
+
+
+class PoissonArrivalSchedule:
+    """
+    Array-backed schedule of Poisson events' arrivals, generated in blocks and consumed through a cursor.
+
+    lambda_rate : the average number of events per second (event rate or rate parameter).
+
+    random_generator : the random number generator to draw the inter-arrival times from.
+
+    block_size : the number of inter-arrival times drawn per block.
+    """
+    def __init__(self,
+                 lambda_rate: float,
+                 random_generator: Random = None,
+                 block_size: int = 65536) -> None:
+        self.__lambda_rate = lambda_rate
+        self.__random_generator = random_generator if random_generator else Random()
+        self.__block_size = block_size
+        self.__inter_arrival_times_in_seconds = array("d")
+        self.__arrival_times_in_seconds = array("d")
+        self.__cursor = 0
+
+    def __len__(self) -> int:
+        return len(self.__arrival_times_in_seconds)
+
+    def __draw_inter_arrival_times_block(self,
+                                         block_size: int) -> array:
+        return array("d", map(self.__random_generator.expovariate, repeat(self.__lambda_rate, block_size)))
+
+    def __append_block(self,
+                       inter_arrival_times_block: array) -> array:
+        last_arrival_time_in_seconds = self.__arrival_times_in_seconds[-1] if self.__arrival_times_in_seconds else 0
+        arrival_times_block = array("d", islice(accumulate(inter_arrival_times_block,
+                                                           initial=last_arrival_time_in_seconds), 1, None))
+        self.__inter_arrival_times_in_seconds.extend(inter_arrival_times_block)
+        self.__arrival_times_in_seconds.extend(arrival_times_block)
+        return arrival_times_block
+
+    def __generate_max_number_of_observable_events(self,
+                                                   max_number_of_observable_events: int) -> None:
+        while len(self.__arrival_times_in_seconds) < max_number_of_observable_events:
+            block_size = min(self.__block_size, max_number_of_observable_events - len(self.__arrival_times_in_seconds))
+            self.__append_block(self.__draw_inter_arrival_times_block(block_size))
+
+    def __generate_max_observation_length_in_seconds(self,
+                                                     max_observation_length_in_seconds: float) -> None:
+        # Blocks cover the expected number of events plus two standard deviations, so one block usually suffices
+        expected_number_of_events = self.__lambda_rate * max_observation_length_in_seconds
+        block_size = min(self.__block_size, int(expected_number_of_events + 2 * sqrt(expected_number_of_events)) + 1)
+        while True:
+            inter_arrival_times_block = self.__draw_inter_arrival_times_block(block_size)
+            arrival_times_block = self.__append_block(inter_arrival_times_block)
+            if arrival_times_block[-1] > max_observation_length_in_seconds:
+                # Truncate the events arriving after the max observation length
+                number_of_exceeding_events = \
+                    len(arrival_times_block) - bisect_right(arrival_times_block, max_observation_length_in_seconds)
+                del self.__inter_arrival_times_in_seconds[-number_of_exceeding_events:]
+                del self.__arrival_times_in_seconds[-number_of_exceeding_events:]
+                break
+
+    def generate(self,
+                 stopping_criterion: str,
+                 max_number_of_observable_events: int,
+                 max_observation_length_in_seconds: float) -> None:
+        if stopping_criterion == "max_number_of_observable_events":
+            self.__generate_max_number_of_observable_events(max_number_of_observable_events)
+        elif stopping_criterion == "max_observation_length_in_seconds":
+            self.__generate_max_observation_length_in_seconds(max_observation_length_in_seconds)
+
+    def get_inter_arrival_times_in_seconds(self) -> array:
+        return self.__inter_arrival_times_in_seconds
+
+    def get_arrival_times_in_seconds(self) -> array:
+        return self.__arrival_times_in_seconds
+
+    def has_next_event(self) -> bool:
+        return self.__cursor < len(self.__arrival_times_in_seconds)
+
+    def pop_next_event(self) -> tuple:
+        next_inter_arrival_time = self.__inter_arrival_times_in_seconds[self.__cursor]
+        next_arrival_time = self.__arrival_times_in_seconds[self.__cursor]
+        self.__cursor += 1
+        return next_inter_arrival_time, next_arrival_time
+
+    def __iter__(self) -> Iterator[tuple]:
+        while self.has_next_event():
+            yield self.pop_next_event()
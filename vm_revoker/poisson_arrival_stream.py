@@ -0,0 +1,43 @@
+from itertools import islice, takewhile
+from random import Random
+from typing import Any, Iterator
+
+
+def generate_poisson_arrivals(lambda_rate: float,
+                              random_generator: Random,
+                              start_time_in_seconds: float = 0) -> Iterator[tuple]:
+    # Homogeneous Poisson process: yields (inter-arrival time, arrival time) tuples forever, in O(1) memory
+    # The process is memoryless, so a resumed one simply starts at the last arrival time
+    arrival_time_in_seconds = start_time_in_seconds
+    while True:
+        inter_arrival_time = random_generator.expovariate(lambda_rate)
+        arrival_time_in_seconds = arrival_time_in_seconds + inter_arrival_time
+        yield inter_arrival_time, arrival_time_in_seconds
+
+
+def generate_non_homogeneous_poisson_arrivals(rate_profile: Any,
+                                              random_generator: Random,
+                                              start_time_in_seconds: float = 0) -> Iterator[tuple]:
+    # Non-homogeneous Poisson process by thinning (Lewis-Shedler): candidates arrive at the profile's max rate,
+    # and each one is kept with probability λ(t) / max rate
+    max_rate = rate_profile.get_max_rate()
+    candidate_arrival_time_in_seconds = start_time_in_seconds
+    previous_arrival_time_in_seconds = start_time_in_seconds
+    while True:
+        candidate_arrival_time_in_seconds += random_generator.expovariate(max_rate)
+        if random_generator.random() * max_rate <= rate_profile.get_rate(candidate_arrival_time_in_seconds):
+            yield candidate_arrival_time_in_seconds - previous_arrival_time_in_seconds, \
+                candidate_arrival_time_in_seconds
+            previous_arrival_time_in_seconds = candidate_arrival_time_in_seconds
+
+
+def limit_arrivals(arrivals: Iterator[tuple],
+                   stopping_criterion: str,
+                   max_number_of_observable_events: int,
+                   max_observation_length_in_seconds: float) -> Iterator[tuple]:
+    if stopping_criterion == "max_number_of_observable_events":
+        return islice(arrivals, max_number_of_observable_events)
+    elif stopping_criterion == "max_observation_length_in_seconds":
+        return takewhile(lambda arrival: arrival[1] <= max_observation_length_in_seconds, arrivals)
+    # Unbounded stopping criterion: arrivals keep coming until the process is stopped
+    return arrivals
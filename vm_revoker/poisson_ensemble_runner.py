@@ -0,0 +1,294 @@
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from logging import basicConfig, getLogger, INFO
+from os import cpu_count
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import Any
+from util.util import generate_execution_id
+from vm_revoker.batch_size_distribution import BatchSizeDistribution
+from vm_revoker.poisson_arrival_schedule import PoissonArrivalSchedule
+from vm_revoker.poisson_arrival_stream import generate_non_homogeneous_poisson_arrivals, limit_arrivals
+from vm_revoker.rate_profile import ConstantRateProfile
+
+
+def derive_replication_seed(base_seed: int,
+                            replication_index: int) -> int:
+    # Each replication gets its own seed, so results do not depend on how replications are spread across workers
+    return (base_seed << 32) + replication_index
+
+
+def generate_replication_arrival_times_list(lambda_rate: float,
+                                            rate_profile: Any,
+                                            stopping_criterion: str,
+                                            max_number_of_observable_events: int,
+                                            max_observation_length_in_seconds: float,
+                                            random_generator: Random) -> list:
+    # Constant rates are generated in blocks into typed arrays, time-varying ones by thinning
+    if isinstance(rate_profile, ConstantRateProfile):
+        arrival_schedule = PoissonArrivalSchedule(lambda_rate=lambda_rate,
+                                                  random_generator=random_generator)
+        arrival_schedule.generate(stopping_criterion=stopping_criterion,
+                                  max_number_of_observable_events=max_number_of_observable_events,
+                                  max_observation_length_in_seconds=max_observation_length_in_seconds)
+        return arrival_schedule.get_arrival_times_in_seconds().tolist()
+    arrivals = limit_arrivals(arrivals=generate_non_homogeneous_poisson_arrivals(rate_profile=rate_profile,
+                                                                                 random_generator=random_generator),
+                              stopping_criterion=stopping_criterion,
+                              max_number_of_observable_events=max_number_of_observable_events,
+                              max_observation_length_in_seconds=max_observation_length_in_seconds)
+    return [arrival_time for _, arrival_time in arrivals]
+
+
+def run_replications_chunk(arguments_dictionary: dict) -> dict:
+    lambda_rate = arguments_dictionary.get("lambda_rate")
+    rate_profile = arguments_dictionary.get("rate_profile")
+    batch_size_distribution_name = arguments_dictionary.get("batch_size_distribution_name")
+    batch_size_mean = arguments_dictionary.get("batch_size_mean")
+    batch_size_max = arguments_dictionary.get("batch_size_max")
+    stopping_criterion = arguments_dictionary.get("stopping_criterion")
+    max_number_of_observable_events = arguments_dictionary.get("max_number_of_observable_events")
+    max_observation_length_in_seconds = arguments_dictionary.get("max_observation_length_in_seconds")
+    fleet_size = arguments_dictionary.get("fleet_size")
+    base_seed = arguments_dictionary.get("base_seed")
+    survival_curve_times_in_seconds = arguments_dictionary.get("survival_curve_times_in_seconds")
+    replications_indices_range = arguments_dictionary.get("replications_indices_range")
+    survival_curve_sums = [0] * len(survival_curve_times_in_seconds)
+    fleet_exhaustion_times_in_seconds = []
+    number_of_events = 0
+    number_of_events_with_no_active_vm = 0
+    for replication_index in replications_indices_range:
+        random_generator = Random(derive_replication_seed(base_seed, replication_index))
+        arrival_times_in_seconds = \
+            generate_replication_arrival_times_list(lambda_rate=lambda_rate,
+                                                    rate_profile=rate_profile,
+                                                    stopping_criterion=stopping_criterion,
+                                                    max_number_of_observable_events=max_number_of_observable_events,
+                                                    max_observation_length_in_seconds=(
+                                                        max_observation_length_in_seconds),
+                                                    random_generator=random_generator)
+        batch_size_distribution = BatchSizeDistribution(distribution_name=batch_size_distribution_name,
+                                                        batch_size_mean=batch_size_mean,
+                                                        batch_size_max=batch_size_max,
+                                                        random_generator=random_generator)
+        # As the live process does, each event revokes a batch of the VMs still active (compound process), so the
+        # number of revoked VMs after each event is the cumulative batch sizes, capped by the fleet size
+        revoked_vms_list = []
+        number_of_revoked_vms = 0
+        for _ in arrival_times_in_seconds:
+            if number_of_revoked_vms >= fleet_size:
+                number_of_events_with_no_active_vm += 1
+            number_of_revoked_vms = min(number_of_revoked_vms + batch_size_distribution.draw(), fleet_size)
+            revoked_vms_list.append(number_of_revoked_vms)
+        number_of_events += len(arrival_times_in_seconds)
+        fleet_exhaustion_event_index = bisect_left(revoked_vms_list, fleet_size)
+        if 0 < fleet_size and fleet_exhaustion_event_index < len(revoked_vms_list):
+            fleet_exhaustion_times_in_seconds.append(arrival_times_in_seconds[fleet_exhaustion_event_index])
+        for index, survival_curve_time in enumerate(survival_curve_times_in_seconds):
+            number_of_events_until_time = bisect_right(arrival_times_in_seconds, survival_curve_time)
+            number_of_revoked_vms = revoked_vms_list[number_of_events_until_time - 1] \
+                if number_of_events_until_time else 0
+            survival_curve_sums[index] += fleet_size - number_of_revoked_vms
+    return {"survival_curve_sums": survival_curve_sums,
+            "fleet_exhaustion_times_in_seconds": fleet_exhaustion_times_in_seconds,
+            "number_of_events": number_of_events,
+            "number_of_events_with_no_active_vm": number_of_events_with_no_active_vm}
+
+
+class PoissonEnsembleRunner:
+    """
+    Monte Carlo ensemble of independent replications of the Poisson VMs revocation scenario, for a single fleet.
+    Replications follow the same rate profile and batch size distribution as the live process.
+
+    average_time_between_events_in_seconds : the average interval of time in seconds between events' arrival.
+
+    lambda_rate : the average number of events per second (event rate or rate parameter).
+
+    rate_profile : the event rate λ(t) over time (ConstantRateProfile | PiecewiseRateProfile | DiurnalRateProfile).
+
+    batch_size_distribution_name : the distribution of the number of VMs revoked per event (compound process).
+    Supported distributions: constant | geometric | poisson | uniform
+
+    batch_size_mean : the mean number of VMs revoked per event.
+
+    batch_size_max : the maximum number of VMs revoked per event.
+
+    stopping_criterion : the stopping criterion for the Poisson process.
+    Supported criteria: max_number_of_observable_events | max_observation_length_in_seconds
+
+    max_number_of_observable_events : the maximum number of observable events.
+
+    max_observation_length_in_seconds : the maximum observation length in seconds for events to arrive.
+
+    fleet_size : the number of active VMs at the beginning of each replication.
+
+    number_of_replications : the number of independent replications of the scenario.
+
+    number_of_workers : the number of worker processes (0 uses all the available cores).
+
+    base_seed : the seed from which each replication's seed is deterministically derived.
+
+    survival_curve_resolution : the number of equally spaced time points of the survival curve.
+
+    logging_directory : the directory to save execution logs.
+    """
+    def __init__(self,
+                 average_time_between_events_in_seconds: float,
+                 lambda_rate: float,
+                 rate_profile: Any,
+                 batch_size_distribution_name: str,
+                 batch_size_mean: float,
+                 batch_size_max: int,
+                 stopping_criterion: str,
+                 max_number_of_observable_events: int,
+                 max_observation_length_in_seconds: float,
+                 fleet_size: int,
+                 number_of_replications: int,
+                 number_of_workers: int,
+                 base_seed: int,
+                 survival_curve_resolution: int,
+                 logging_directory: Path) -> None:
+        self.__average_time_between_events_in_seconds = average_time_between_events_in_seconds
+        if stopping_criterion == "unbounded":
+            raise ValueError("The ensemble execution mode requires a bounded stopping criterion!")
+        self.__lambda_rate = lambda_rate
+        self.__rate_profile = rate_profile
+        self.__batch_size_distribution_name = batch_size_distribution_name
+        self.__batch_size_mean = batch_size_mean
+        self.__batch_size_max = batch_size_max
+        self.__stopping_criterion = stopping_criterion
+        self.__max_number_of_observable_events = max_number_of_observable_events
+        self.__max_observation_length_in_seconds = max_observation_length_in_seconds
+        self.__fleet_size = fleet_size
+        self.__number_of_replications = number_of_replications
+        self.__number_of_workers = number_of_workers if number_of_workers > 0 else cpu_count()
+        self.__base_seed = base_seed
+        self.__survival_curve_resolution = survival_curve_resolution
+        self.__logging_directory = logging_directory
+        self.__logger = None
+
+    def __set_logger(self) -> None:
+        execution_id = generate_execution_id()
+        logger_name = "vm-revoker_ensemble_execution_id_" + execution_id + ".log"
+        basicConfig(filename=Path(self.__logging_directory).joinpath(logger_name),
+                    format="%(asctime)s %(message)s",
+                    level=INFO)
+        self.__logger = getLogger()
+
+    def __print_message(self,
+                        message: str) -> None:
+        print(message)
+        self.__logger.info(message)
+
+    def __get_survival_curve_horizon_in_seconds(self) -> float:
+        if self.__stopping_criterion == "max_observation_length_in_seconds":
+            return self.__max_observation_length_in_seconds
+        # Expected length of a schedule with max_number_of_observable_events events
+        return self.__max_number_of_observable_events * self.__average_time_between_events_in_seconds
+
+    def __get_survival_curve_times_in_seconds(self) -> list:
+        horizon_in_seconds = self.__get_survival_curve_horizon_in_seconds()
+        return [horizon_in_seconds * index / self.__survival_curve_resolution
+                for index in range(self.__survival_curve_resolution + 1)]
+
+    def __build_chunks_arguments_list(self,
+                                      survival_curve_times_in_seconds: list) -> list:
+        # A few chunks per worker keep the pool balanced without paying inter-process overhead per replication
+        number_of_chunks = min(self.__number_of_replications, self.__number_of_workers * 4)
+        chunks_arguments_list = []
+        for chunk_index in range(number_of_chunks):
+            replications_indices_range = range(chunk_index, self.__number_of_replications, number_of_chunks)
+            chunks_arguments_list.append({"lambda_rate": self.__lambda_rate,
+                                          "rate_profile": self.__rate_profile,
+                                          "batch_size_distribution_name": self.__batch_size_distribution_name,
+                                          "batch_size_mean": self.__batch_size_mean,
+                                          "batch_size_max": self.__batch_size_max,
+                                          "stopping_criterion": self.__stopping_criterion,
+                                          "max_number_of_observable_events": self.__max_number_of_observable_events,
+                                          "max_observation_length_in_seconds":
+                                              self.__max_observation_length_in_seconds,
+                                          "fleet_size": self.__fleet_size,
+                                          "base_seed": self.__base_seed,
+                                          "survival_curve_times_in_seconds": survival_curve_times_in_seconds,
+                                          "replications_indices_range": replications_indices_range})
+        return chunks_arguments_list
+
+    @staticmethod
+    def __get_percentile(sorted_values_list: list,
+                         percentile: float) -> float:
+        index = min(int(round(percentile / 100 * (len(sorted_values_list) - 1))), len(sorted_values_list) - 1)
+        return sorted_values_list[index]
+
+    def __print_survival_curve(self,
+                               survival_curve_times_in_seconds: list,
+                               survival_curve_sums: list) -> None:
+        self.__print_message("Survival Curve (Mean Number of Active VMs over Time)\nT \t\t Active VMs")
+        for survival_curve_time, survival_curve_sum in zip(survival_curve_times_in_seconds, survival_curve_sums):
+            self.__print_message("{0} \t\t {1}".format(round(survival_curve_time, 2),
+                                                       round(survival_curve_sum / self.__number_of_replications, 4)))
+        print("-------")
+
+    def __print_fleet_exhaustion_times(self,
+                                       fleet_exhaustion_times_in_seconds: list) -> None:
+        exhausted_replications_rate = len(fleet_exhaustion_times_in_seconds) / self.__number_of_replications
+        self.__print_message("Replications that Exhausted the Fleet: {0} ({1}%)"
+                             .format(len(fleet_exhaustion_times_in_seconds),
+                                     round(100 * exhausted_replications_rate, 2)))
+        if fleet_exhaustion_times_in_seconds:
+            sorted_fleet_exhaustion_times = sorted(fleet_exhaustion_times_in_seconds)
+            mean_fleet_exhaustion_time = sum(sorted_fleet_exhaustion_times) / len(sorted_fleet_exhaustion_times)
+            self.__print_message("Time to Fleet Exhaustion in Seconds: mean = {0}, p5 = {1}, p50 = {2}, p95 = {3}"
+                                 .format(round(mean_fleet_exhaustion_time, 2),
+                                         round(self.__get_percentile(sorted_fleet_exhaustion_times, 5), 2),
+                                         round(self.__get_percentile(sorted_fleet_exhaustion_times, 50), 2),
+                                         round(self.__get_percentile(sorted_fleet_exhaustion_times, 95), 2)))
+        print("-------")
+
+    def __print_events_with_no_active_vm_rate(self,
+                                              number_of_events: int,
+                                              number_of_events_with_no_active_vm: int) -> None:
+        events_with_no_active_vm_rate = number_of_events_with_no_active_vm / number_of_events \
+            if number_of_events else 0
+        self.__print_message("Events with No Active VM: {0} of {1} ({2}%)"
+                             .format(number_of_events_with_no_active_vm,
+                                     number_of_events,
+                                     round(100 * events_with_no_active_vm_rate, 2)))
+        print("-------")
+
+    def start(self) -> None:
+        # Set logger
+        self.__set_logger()
+        self.__print_message("-------\nMonte Carlo Ensemble: {0} replications, {1} workers, base seed {2}, "
+                             "fleet size {3}".format(self.__number_of_replications,
+                                                     self.__number_of_workers,
+                                                     self.__base_seed,
+                                                     self.__fleet_size))
+        self.__print_message("Rate Profile λ(t): {0}\nBatch Size Distribution (VMs Revoked per Event): {1} "
+                             "(mean = {2}, max = {3})".format(self.__rate_profile,
+                                                              self.__batch_size_distribution_name,
+                                                              self.__batch_size_mean,
+                                                              self.__batch_size_max))
+        print("-------")
+        # Run the replications across the process pool
+        start_time = perf_counter()
+        survival_curve_times_in_seconds = self.__get_survival_curve_times_in_seconds()
+        chunks_arguments_list = self.__build_chunks_arguments_list(survival_curve_times_in_seconds)
+        survival_curve_sums = [0] * len(survival_curve_times_in_seconds)
+        fleet_exhaustion_times_in_seconds = []
+        number_of_events = 0
+        number_of_events_with_no_active_vm = 0
+        with ProcessPoolExecutor(max_workers=self.__number_of_workers) as executor:
+            for chunk_results in executor.map(run_replications_chunk, chunks_arguments_list):
+                survival_curve_sums = [survival_curve_sum + chunk_survival_curve_sum
+                                       for survival_curve_sum, chunk_survival_curve_sum
+                                       in zip(survival_curve_sums, chunk_results.get("survival_curve_sums"))]
+                fleet_exhaustion_times_in_seconds.extend(chunk_results.get("fleet_exhaustion_times_in_seconds"))
+                number_of_events += chunk_results.get("number_of_events")
+                number_of_events_with_no_active_vm += chunk_results.get("number_of_events_with_no_active_vm")
+        elapsed_time = perf_counter() - start_time
+        # Print aggregated results
+        self.__print_survival_curve(survival_curve_times_in_seconds, survival_curve_sums)
+        self.__print_fleet_exhaustion_times(fleet_exhaustion_times_in_seconds)
+        self.__print_events_with_no_active_vm_rate(number_of_events, number_of_events_with_no_active_vm)
+        self.__print_message("Monte Carlo Ensemble Completed in {0} s!".format(round(elapsed_time, 2)))
@@ -0,0 +1,99 @@
+from bisect import bisect_right
+from math import pi, sin
+
+
+class ConstantRateProfile:
+    """
+    Time-invariant event rate λ(t) = λ.
+
+    lambda_rate : the average number of events per second (event rate or rate parameter).
+    """
+    def __init__(self,
+                 lambda_rate: float) -> None:
+        self.__lambda_rate = lambda_rate
+
+    def __str__(self) -> str:
+        return "constant (λ = {0})".format(self.__lambda_rate)
+
+    def get_rate(self,
+                 time_in_seconds: float) -> float:
+        return self.__lambda_rate
+
+    def get_max_rate(self) -> float:
+        return self.__lambda_rate
+
+
+class PiecewiseRateProfile:
+    """
+    Piecewise-constant event rate λ(t), optionally repeating every period.
+
+    segments_list : the list of (start time in seconds, event rate) tuples, sorted by start time.
+    The first segment must start at 0. Quiet segments have a rate of 0, but at least one segment must have events.
+
+    period_in_seconds : the length in seconds after which the profile repeats (0 for non-periodic profiles).
+    """
+    def __init__(self,
+                 segments_list: list,
+                 period_in_seconds: float) -> None:
+        if not segments_list or segments_list[0][0] != 0:
+            raise ValueError("The first segment of a piecewise rate profile must start at 0 seconds!")
+        if any(segment[1] < 0 for segment in segments_list) or max(segment[1] for segment in segments_list) <= 0:
+            raise ValueError("The segments' rates of a piecewise rate profile must not be negative, and at least one "
+                             "of them must be positive!")
+        self.__segments_start_times_list = [segment[0] for segment in segments_list]
+        self.__segments_rates_list = [segment[1] for segment in segments_list]
+        self.__period_in_seconds = period_in_seconds
+
+    def __str__(self) -> str:
+        return "piecewise (segments = {0}, period = {1} s)" \
+            .format(list(zip(self.__segments_start_times_list, self.__segments_rates_list)),
+                    self.__period_in_seconds)
+
+    def get_rate(self,
+                 time_in_seconds: float) -> float:
+        if self.__period_in_seconds > 0:
+            time_in_seconds = time_in_seconds % self.__period_in_seconds
+        return self.__segments_rates_list[bisect_right(self.__segments_start_times_list, time_in_seconds) - 1]
+
+    def get_max_rate(self) -> float:
+        return max(self.__segments_rates_list)
+
+
+class DiurnalRateProfile:
+    """
+    Sinusoidal event rate λ(t) = λ · (1 + amplitude · sin(2π · (t - phase) / period)).
+
+    lambda_rate : the mean number of events per second over a period.
+
+    amplitude : the relative amplitude of the oscillation, between 0 and 1.
+
+    period_in_seconds : the length in seconds of a full oscillation (86400 for a daily cycle).
+
+    phase_in_seconds : the time shift in seconds of the oscillation.
+    """
+    def __init__(self,
+                 lambda_rate: float,
+                 amplitude: float,
+                 period_in_seconds: float,
+                 phase_in_seconds: float) -> None:
+        if not 0 <= amplitude <= 1:
+            raise ValueError("The amplitude of a diurnal rate profile must be between 0 and 1!")
+        self.__lambda_rate = lambda_rate
+        self.__amplitude = amplitude
+        self.__period_in_seconds = period_in_seconds
+        self.__phase_in_seconds = phase_in_seconds
+
+    def __str__(self) -> str:
+        return "diurnal (λ = {0}, amplitude = {1}, period = {2} s, phase = {3} s)" \
+            .format(self.__lambda_rate,
+                    self.__amplitude,
+                    self.__period_in_seconds,
+                    self.__phase_in_seconds)
+
+    def get_rate(self,
+                 time_in_seconds: float) -> float:
+        angle = 2 * pi * (time_in_seconds - self.__phase_in_seconds) / self.__period_in_seconds
+        return self.__lambda_rate * (1 + self.__amplitude * sin(angle))
+
+    def get_max_rate(self) -> float:
+        return self.__lambda_rate * (1 + self.__amplitude)
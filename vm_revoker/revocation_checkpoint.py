@@ -0,0 +1,85 @@
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from struct import Struct
+from threading import Condition, Thread
+from zlib import compress, decompress
+
+# Checkpoint layout: magic, version, then the zlib-compressed JSON checkpoint
+CHECKPOINT_MAGIC = b"VMREVCKP"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_PREAMBLE_STRUCT = Struct("<8sH")
+
+
+def write_revocation_checkpoint(checkpoint_file: Path,
+                                checkpoint_dict: dict) -> None:
+    # Written to a temporary file first, then atomically replacing the checkpoint, so it is never read half-written
+    checkpoint_file = Path(checkpoint_file)
+    temporary_checkpoint_file = checkpoint_file.with_name(checkpoint_file.name + ".tmp")
+    with open(temporary_checkpoint_file, mode="wb") as checkpoint:
+        checkpoint.write(CHECKPOINT_PREAMBLE_STRUCT.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION))
+        checkpoint.write(compress(dumps(checkpoint_dict, separators=(",", ":")).encode("utf-8"), 1))
+    replace(temporary_checkpoint_file, checkpoint_file)
+
+
+def load_revocation_checkpoint(checkpoint_file: Path) -> dict:
+    with open(checkpoint_file, mode="rb") as checkpoint:
+        magic, version = CHECKPOINT_PREAMBLE_STRUCT.unpack(checkpoint.read(CHECKPOINT_PREAMBLE_STRUCT.size))
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError("'{0}' is not a version {1} revocation checkpoint!".format(checkpoint_file,
+                                                                                      CHECKPOINT_VERSION))
+        checkpoint_dict = loads(decompress(checkpoint.read()).decode("utf-8"))
+    # A completed session has no event left to replay (the checkpoints of running or failed sessions are resumable)
+    if checkpoint_dict.get("completed", False):
+        completed_session_message = \
+            "'{0}' is the checkpoint of a completed session (execution ID = {1}, last event = t{2}), which cannot be " \
+            "resumed!".format(checkpoint_file, checkpoint_dict["execution_id"], checkpoint_dict["event_counter"])
+        raise ValueError(completed_session_message)
+    return checkpoint_dict
+
+
+class RevocationCheckpointWriter:
+    """
+    Background writer of the revocation session's checkpoints, so the serialization, compression and file I/O never
+    delay the revocations. Only the latest submitted checkpoint is pending at any time (older ones are superseded).
+
+    checkpoint_file : the file to write the checkpoints to.
+    """
+    def __init__(self,
+                 checkpoint_file: Path) -> None:
+        self.__checkpoint_file = checkpoint_file
+        self.__pending_checkpoint_dict = None
+        self.__stopped = False
+        self.__condition = Condition()
+        self.__write_thread = None
+
+    def __write_checkpoints(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__pending_checkpoint_dict is None and not self.__stopped:
+                    self.__condition.wait()
+                checkpoint_dict = self.__pending_checkpoint_dict
+                self.__pending_checkpoint_dict = None
+                if checkpoint_dict is None:
+                    return
+            write_revocation_checkpoint(self.__checkpoint_file, checkpoint_dict)
+
+    def start(self) -> None:
+        self.__write_thread = Thread(target=self.__write_checkpoints,
+                                     name="checkpoint_writing_thread",
+                                     daemon=True)
+        self.__write_thread.start()
+
+    def submit(self,
+               checkpoint_dict: dict) -> None:
+        with self.__condition:
+            self.__pending_checkpoint_dict = checkpoint_dict
+            self.__condition.notify()
+
+    def stop(self) -> None:
+        # The pending checkpoint (if any) is written before stopping
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+        if self.__write_thread:
+            self.__write_thread.join()
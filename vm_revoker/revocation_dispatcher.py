@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable
+from util.clock import WallClock
+
+
+class RevocationDispatcher:
+    """
+    Bounded thread pool that runs revocation actions off the scheduling thread, so events' timing is decoupled
+    from the API calls' latency. Each action revokes a batch of instances. An instance is never dispatched twice:
+    it is tracked while in-flight and remembered once revoked.
+
+    max_concurrent_revocations : the maximum number of revocation actions running at the same time.
+    Once that many actions are running, dispatching blocks until one of them completes.
+
+    clock : the clock to measure the revocation actions' latency with (WallClock | VirtualClock).
+    """
+    def __init__(self,
+                 max_concurrent_revocations: int,
+                 clock: Any = None) -> None:
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrent_revocations,
+                                             thread_name_prefix="vms_revoking_thread")
+        self.__dispatch_slots = BoundedSemaphore(max_concurrent_revocations)
+        self.__in_flight_instances_ids = set()
+        self.__revoked_instances_ids = set()
+        self.__lock = Lock()
+        self.__clock = clock if clock else WallClock()
+
+    def is_available(self,
+                     instance_id: str) -> bool:
+        return instance_id not in self.__in_flight_instances_ids and instance_id not in self.__revoked_instances_ids
+
+    def get_revoked_instances_ids(self) -> set:
+        with self.__lock:
+            return set(self.__revoked_instances_ids)
+
+    def __run_revocation(self,
+                         instances_ids_list: list,
+                         revocation_function: Callable[[list], None],
+                         completion_callback: Callable[[list, Exception, float], None]) -> None:
+        revocation_exception = None
+        start_time = self.__clock.now()
+        try:
+            revocation_function(instances_ids_list)
+        except Exception as exception:
+            revocation_exception = exception
+        revocation_latency = self.__clock.now() - start_time
+        with self.__lock:
+            self.__in_flight_instances_ids.difference_update(instances_ids_list)
+            if revocation_exception is None:
+                self.__revoked_instances_ids.update(instances_ids_list)
+        self.__dispatch_slots.release()
+        if completion_callback:
+            completion_callback(instances_ids_list, revocation_exception, revocation_latency)
+
+    def dispatch(self,
+                 instances_ids_list: list,
+                 revocation_function: Callable[[list], None],
+                 completion_callback: Callable[[list, Exception, float], None] = None,
+                 dispatch_callback: Callable[[list], None] = None) -> list:
+        # Returns the instances actually dispatched (those neither in-flight nor already revoked)
+        # The dispatch callback is called with them before their action is submitted, so it always precedes the
+        # completion callback
+        with self.__lock:
+            dispatched_instances_ids_list = [instance_id for instance_id in dict.fromkeys(instances_ids_list)
+                                             if self.is_available(instance_id)]
+            self.__in_flight_instances_ids.update(dispatched_instances_ids_list)
+        if not dispatched_instances_ids_list:
+            return dispatched_instances_ids_list
+        if dispatch_callback:
+            dispatch_callback(dispatched_instances_ids_list)
+        self.__dispatch_slots.acquire()
+        self.__executor.submit(self.__run_revocation,
+                               dispatched_instances_ids_list,
+                               revocation_function,
+                               completion_callback)
+        return dispatched_instances_ids_list
+
+    def shutdown(self) -> None:
+        self.__executor.shutdown(wait=True)
@@ -0,0 +1,206 @@
+from json import dumps, loads
+from logging import getLogger, Handler, INFO, LogRecord
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from queue import SimpleQueue
+from struct import Struct
+from typing import Iterator
+
+# Binary event log layout: magic, version, JSON header length, JSON header, then the fixed-size records, each followed
+# by its victims IDs (length-prefixed ASCII)
+BINARY_EVENT_LOG_MAGIC = b"VMREVLOG"
+BINARY_EVENT_LOG_VERSION = 1
+BINARY_EVENT_LOG_PREAMBLE_STRUCT = Struct("<8sHI")
+# Event index, scheduled time, actual time, latency, action, result, fleet index, number of victims
+BINARY_EVENT_RECORD_STRUCT = Struct("<QdddBBHH")
+EVENT_ACTIONS = ("terminate", "reboot", "none")
+EVENT_RESULTS = ("success", "failure", "no_active_vms", "skip", "coalesce")
+
+
+class JSONLinesEventHandler(Handler):
+    """
+    Logging handler writing each event record as a JSON line.
+
+    event_log_file : the file to write the event records to.
+
+    fleets_names_list : the names of the fleets, indexed by the records' fleet index.
+    """
+    def __init__(self,
+                 event_log_file: Path,
+                 fleets_names_list: list) -> None:
+        super().__init__()
+        self.__event_log_file = open(event_log_file, mode="w", buffering=1 << 16)
+        self.__fleets_names_list = fleets_names_list
+
+    def emit(self,
+             record: LogRecord) -> None:
+        event_index, fleet_index, scheduled_time, actual_time, victims_ids_list, action, latency, result = \
+            record.event
+        self.__event_log_file.write(dumps({"event": event_index,
+                                           "fleet": self.__fleets_names_list[fleet_index],
+                                           "scheduled_time": scheduled_time,
+                                           "actual_time": actual_time,
+                                           "victims": victims_ids_list,
+                                           "action": action,
+                                           "latency": latency,
+                                           "result": result},
+                                          separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        self.__event_log_file.close()
+        super().close()
+
+
+class BinaryEventHandler(Handler):
+    """
+    Logging handler writing each event record in a compact binary layout, for million-event runs analyzed afterwards
+    (see read_binary_event_log).
+
+    event_log_file : the file to write the event records to.
+
+    header_dict : the JSON header of the event log (e.g., the run ID and the fleets names).
+    """
+    def __init__(self,
+                 event_log_file: Path,
+                 header_dict: dict) -> None:
+        super().__init__()
+        self.__event_log_file = open(event_log_file, mode="wb", buffering=1 << 16)
+        header = dumps(header_dict).encode("utf-8")
+        self.__event_log_file.write(BINARY_EVENT_LOG_PREAMBLE_STRUCT.pack(BINARY_EVENT_LOG_MAGIC,
+                                                                          BINARY_EVENT_LOG_VERSION,
+                                                                          len(header)))
+        self.__event_log_file.write(header)
+
+    def emit(self,
+             record: LogRecord) -> None:
+        event_index, fleet_index, scheduled_time, actual_time, victims_ids_list, action, latency, result = \
+            record.event
+        victims_ids_bytes_list = [victim_id.encode("ascii") for victim_id in victims_ids_list]
+        self.__event_log_file.write(BINARY_EVENT_RECORD_STRUCT.pack(event_index,
+                                                                    scheduled_time,
+                                                                    actual_time,
+                                                                    latency,
+                                                                    EVENT_ACTIONS.index(action),
+                                                                    EVENT_RESULTS.index(result),
+                                                                    fleet_index,
+                                                                    len(victims_ids_bytes_list)))
+        for victim_id_bytes in victims_ids_bytes_list:
+            self.__event_log_file.write(bytes((len(victim_id_bytes),)) + victim_id_bytes)
+
+    def close(self) -> None:
+        self.__event_log_file.close()
+        super().close()
+
+
+def read_binary_event_log(event_log_file: Path) -> Iterator[dict]:
+    # Yields the event records of a binary event log, as the JSON-lines event log has them
+    with open(event_log_file, mode="rb") as binary_event_log:
+        magic, version, header_length = \
+            BINARY_EVENT_LOG_PREAMBLE_STRUCT.unpack(binary_event_log.read(BINARY_EVENT_LOG_PREAMBLE_STRUCT.size))
+        if magic != BINARY_EVENT_LOG_MAGIC or version != BINARY_EVENT_LOG_VERSION:
+            raise ValueError("'{0}' is not a version {1} binary event log!".format(event_log_file,
+                                                                                 BINARY_EVENT_LOG_VERSION))
+        header_dict = loads(binary_event_log.read(header_length).decode("utf-8"))
+        fleets_names_list = header_dict["fleets"]
+        while True:
+            record = binary_event_log.read(BINARY_EVENT_RECORD_STRUCT.size)
+            if len(record) < BINARY_EVENT_RECORD_STRUCT.size:
+                return
+            event_index, scheduled_time, actual_time, latency, action_index, result_index, fleet_index, \
+                number_of_victims = BINARY_EVENT_RECORD_STRUCT.unpack(record)
+            victims_ids_list = []
+            for _ in range(number_of_victims):
+                victim_id_length = binary_event_log.read(1)[0]
+                victims_ids_list.append(binary_event_log.read(victim_id_length).decode("ascii"))
+            yield {"event": event_index,
+                   "fleet": fleets_names_list[fleet_index],
+                   "scheduled_time": scheduled_time,
+                   "actual_time": actual_time,
+                   "victims": victims_ids_list,
+                   "action": EVENT_ACTIONS[action_index],
+                   "latency": latency,
+                   "result": EVENT_RESULTS[result_index]}
+
+
+class RevocationEventLog:
+    """
+    Structured log of the revocation events, with one record per arrival: event index, fleet, scheduled and actual
+    times (in seconds since the start of the run), victims IDs, action, latency and result.
+
+    Records are put on a queue by a QueueHandler and written by a QueueListener's background thread, so the file I/O
+    never delays the revocations. Revoked events are recorded once their revocation completes, so their records may
+    be written out of order (the event index orders them).
+
+    event_log_format : the format of the event log.
+    Supported formats: jsonl (JSON lines) | binary (compact, see read_binary_event_log) | none
+
+    event_log_file : the file to write the event records to.
+
+    run_id : the ID of the run (written in the binary event log's header).
+
+    fleets_names_list : the names of the fleets, indexed by the records' fleet index.
+    """
+    def __init__(self,
+                 event_log_format: str,
+                 event_log_file: Path,
+                 run_id: str,
+                 fleets_names_list: list) -> None:
+        self.__event_log_format = event_log_format
+        self.__event_log_file = event_log_file
+        self.__run_id = run_id
+        self.__fleets_names_list = fleets_names_list
+        self.__event_logger = None
+        self.__event_handler = None
+        self.__queue_handler = None
+        self.__queue_listener = None
+
+    def __create_event_handler(self) -> Handler:
+        if self.__event_log_format == "jsonl":
+            return JSONLinesEventHandler(event_log_file=self.__event_log_file,
+                                         fleets_names_list=self.__fleets_names_list)
+        header_dict = {"run_id": self.__run_id,
+                       "fleets": self.__fleets_names_list}
+        return BinaryEventHandler(event_log_file=self.__event_log_file,
+                                  header_dict=header_dict)
+
+    def start(self) -> None:
+        if self.__event_log_format == "none":
+            return
+        self.__event_handler = self.__create_event_handler()
+        event_log_queue = SimpleQueue()
+        self.__queue_handler = QueueHandler(event_log_queue)
+        self.__event_logger = getLogger("vm_revoker.event_log." + self.__run_id)
+        self.__event_logger.propagate = False
+        self.__event_logger.setLevel(INFO)
+        self.__event_logger.addHandler(self.__queue_handler)
+        self.__queue_listener = QueueListener(event_log_queue, self.__event_handler)
+        self.__queue_listener.start()
+
+    def record_event(self,
+                     event_index: int,
+                     fleet_index: int,
+                     scheduled_time: float,
+                     actual_time: float,
+                     victims_ids_list: list,
+                     action: str,
+                     latency: float,
+                     result: str) -> None:
+        if self.__event_logger is None:
+            return
+        self.__event_logger.info("",
+                                 extra={"event": (event_index,
+                                                  fleet_index,
+                                                  scheduled_time,
+                                                  actual_time,
+                                                  victims_ids_list,
+                                                  action,
+                                                  latency,
+                                                  result)})
+
+    def stop(self) -> None:
+        if self.__queue_listener is None:
+            return
+        # Stopping the listener writes the records still queued
+        self.__queue_listener.stop()
+        self.__event_logger.removeHandler(self.__queue_handler)
+        self.__event_handler.close()
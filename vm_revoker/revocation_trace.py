@@ -0,0 +1,299 @@
+from datetime import datetime, timezone
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from struct import Struct
+from typing import Iterator
+try:
+    from mmap import MADV_SEQUENTIAL
+except ImportError:
+    MADV_SEQUENTIAL = None
+
+# CSV trace layout: a header line naming the columns (timestamp required, instance_type and availability_zone needed
+# to filter by them), then one interruption per line, sorted by timestamp (seconds since the epoch, or ISO 8601)
+CSV_TRACE_TIMESTAMP_COLUMN = "timestamp"
+CSV_TRACE_INSTANCE_TYPE_COLUMN = "instance_type"
+CSV_TRACE_AVAILABILITY_ZONE_COLUMN = "availability_zone"
+# Binary trace layout: magic, version, JSON header length, JSON header (the instance types and availability zones
+# indexed by the records), then the fixed-size records, sorted by timestamp
+BINARY_TRACE_MAGIC = b"VMREVTRC"
+BINARY_TRACE_VERSION = 1
+BINARY_TRACE_PREAMBLE_STRUCT = Struct("<8sHI")
+# Timestamp (seconds since the epoch), instance type index, availability zone index
+BINARY_TRACE_RECORD_STRUCT = Struct("<dHH")
+# Number of CSV bytes (whole lines) and binary records decoded per read
+CSV_TRACE_BYTES_PER_READ = 1 << 20
+BINARY_TRACE_RECORDS_PER_READ = 65536
+
+
+def parse_trace_timestamp(timestamp: bytes) -> float:
+    try:
+        return float(timestamp)
+    except ValueError:
+        # ISO 8601 timestamps with no time zone are in UTC
+        timestamp_datetime = datetime.fromisoformat(timestamp.decode("ascii").strip())
+        if timestamp_datetime.tzinfo is None:
+            timestamp_datetime = timestamp_datetime.replace(tzinfo=timezone.utc)
+        return timestamp_datetime.timestamp()
+
+
+class RevocationTrace:
+    """
+    Trace of real spot instances' interruptions, read through a memory map: records are decoded as they are
+    consumed, so multi-GB traces are replayed in O(1) memory, and a replay may start at any time of the trace
+    (seek is a binary search over the file, in O(log n) reads).
+
+    trace_file : the trace file (sorted by timestamp).
+
+    trace_file_format : the format of the trace file.
+    Supported formats: csv (see CSV_TRACE_*_COLUMN) | binary (compact, see convert_csv_trace_to_binary)
+    """
+    def __init__(self,
+                 trace_file: Path,
+                 trace_file_format: str) -> None:
+        self.__trace_file = trace_file
+        self.__trace_file_format = trace_file_format
+        self.__trace_map = None
+        self.__records_offset = None
+        self.__csv_columns_indexes_dict = None
+        self.__binary_instance_types_list = None
+        self.__binary_availability_zones_list = None
+
+    def __map_trace_file(self) -> None:
+        with open(self.__trace_file, mode="rb") as trace_file:
+            self.__trace_map = mmap(trace_file.fileno(), 0, access=ACCESS_READ)
+        # Replays read the trace front to back, so the kernel may read ahead aggressively
+        if MADV_SEQUENTIAL is not None:
+            self.__trace_map.madvise(MADV_SEQUENTIAL)
+
+    def __read_csv_header(self) -> None:
+        header_end = self.__trace_map.find(b"\n")
+        if header_end == -1:
+            raise ValueError("'{0}' has no interruptions!".format(self.__trace_file))
+        columns_list = self.__trace_map[:header_end].rstrip(b"\r").decode("utf-8").split(",")
+        self.__csv_columns_indexes_dict = {column.strip(): column_index
+                                           for column_index, column in enumerate(columns_list)}
+        if CSV_TRACE_TIMESTAMP_COLUMN not in self.__csv_columns_indexes_dict:
+            raise ValueError("'{0}' has no '{1}' column!".format(self.__trace_file, CSV_TRACE_TIMESTAMP_COLUMN))
+        self.__records_offset = header_end + 1
+
+    def __read_binary_header(self) -> None:
+        magic, version, header_length = BINARY_TRACE_PREAMBLE_STRUCT.unpack_from(self.__trace_map, 0)
+        if magic != BINARY_TRACE_MAGIC or version != BINARY_TRACE_VERSION:
+            raise ValueError("'{0}' is not a version {1} binary trace!".format(self.__trace_file,
+                                                                             BINARY_TRACE_VERSION))
+        header_offset = BINARY_TRACE_PREAMBLE_STRUCT.size
+        header_dict = loads(self.__trace_map[header_offset:header_offset + header_length].decode("utf-8"))
+        self.__binary_instance_types_list = header_dict["instance_types"]
+        self.__binary_availability_zones_list = header_dict["availability_zones"]
+        self.__records_offset = header_offset + header_length
+
+    def open(self) -> None:
+        self.__map_trace_file()
+        if self.__trace_file_format == "binary":
+            self.__read_binary_header()
+        else:
+            self.__read_csv_header()
+
+    def close(self) -> None:
+        if self.__trace_map is not None:
+            self.__trace_map.close()
+            self.__trace_map = None
+
+    def __get_csv_line_start(self,
+                             position: int) -> int:
+        # Start of the first line starting at or after the position (the end of the trace if none)
+        line_start = self.__trace_map.find(b"\n", position - 1) + 1
+        return line_start if line_start > 0 else len(self.__trace_map)
+
+    def __get_csv_line_end(self,
+                           line_start: int) -> int:
+        line_end = self.__trace_map.find(b"\n", line_start)
+        return line_end if line_end != -1 else len(self.__trace_map)
+
+    def __get_csv_line_timestamp(self,
+                                 line_start: int) -> float:
+        # Blank lines take the timestamp of the next line, so the binary search stays monotonic
+        while line_start < len(self.__trace_map):
+            line_end = self.__get_csv_line_end(line_start)
+            line = self.__trace_map[line_start:line_end].rstrip(b"\r")
+            if line:
+                return parse_trace_timestamp(line.split(b",")[self.__csv_columns_indexes_dict[
+                    CSV_TRACE_TIMESTAMP_COLUMN]])
+            line_start = line_end + 1
+        return float("inf")
+
+    def __get_binary_records_end(self) -> int:
+        number_of_records = (len(self.__trace_map) - self.__records_offset) // BINARY_TRACE_RECORD_STRUCT.size
+        return self.__records_offset + number_of_records * BINARY_TRACE_RECORD_STRUCT.size
+
+    def get_start_timestamp(self) -> float:
+        if self.__trace_file_format == "binary":
+            if self.__get_binary_records_end() == self.__records_offset:
+                return float("inf")
+            return BINARY_TRACE_RECORD_STRUCT.unpack_from(self.__trace_map, self.__records_offset)[0]
+        return self.__get_csv_line_timestamp(self.__records_offset)
+
+    def seek(self,
+             timestamp: float) -> int:
+        # Position of the first interruption at or after the timestamp
+        if self.__trace_file_format == "binary":
+            record_size = BINARY_TRACE_RECORD_STRUCT.size
+            low_index = 0
+            high_index = (self.__get_binary_records_end() - self.__records_offset) // record_size
+            while low_index < high_index:
+                middle_index = (low_index + high_index) // 2
+                middle_offset = self.__records_offset + middle_index * record_size
+                if BINARY_TRACE_RECORD_STRUCT.unpack_from(self.__trace_map, middle_offset)[0] < timestamp:
+                    low_index = middle_index + 1
+                else:
+                    high_index = middle_index
+            return self.__records_offset + low_index * record_size
+        # Smallest byte position whose next line start holds a timestamp at or after the timestamp
+        low_position = self.__records_offset
+        high_position = len(self.__trace_map)
+        while low_position < high_position:
+            middle_position = (low_position + high_position) // 2
+            if self.__get_csv_line_timestamp(self.__get_csv_line_start(middle_position)) < timestamp:
+                low_position = middle_position + 1
+            else:
+                high_position = middle_position
+        return self.__get_csv_line_start(low_position)
+
+    def __read_csv_interruptions(self,
+                                 position: int,
+                                 instance_types_list: list,
+                                 availability_zones_list: list) -> Iterator[tuple]:
+        timestamp_index = self.__csv_columns_indexes_dict[CSV_TRACE_TIMESTAMP_COLUMN]
+        instance_type_index = self.__csv_columns_indexes_dict.get(CSV_TRACE_INSTANCE_TYPE_COLUMN)
+        availability_zone_index = self.__csv_columns_indexes_dict.get(CSV_TRACE_AVAILABILITY_ZONE_COLUMN)
+        if (instance_types_list and instance_type_index is None) \
+                or (availability_zones_list and availability_zone_index is None):
+            raise ValueError("'{0}' has no column to filter the interruptions by!".format(self.__trace_file))
+        # The filters are compared as bytes, so the filtered out lines are never decoded
+        instance_types_set = {instance_type.encode("utf-8") for instance_type in instance_types_list or []}
+        availability_zones_set = {availability_zone.encode("utf-8")
+                                  for availability_zone in availability_zones_list or []}
+        trace_length = len(self.__trace_map)
+        while position < trace_length:
+            # Each read copies a bounded chunk of whole lines out of the map (no buffer of the map outlives the read)
+            chunk_end = self.__trace_map.rfind(b"\n", position, position + CSV_TRACE_BYTES_PER_READ) + 1
+            if chunk_end <= position:
+                chunk_end = self.__get_csv_line_end(position) + 1
+            lines_chunk = self.__trace_map[position:min(chunk_end, trace_length)]
+            position = chunk_end
+            for line in lines_chunk.splitlines():
+                if not line:
+                    continue
+                fields_list = line.split(b",")
+                instance_type = fields_list[instance_type_index].strip() \
+                    if instance_type_index is not None else None
+                if instance_types_set and instance_type not in instance_types_set:
+                    continue
+                availability_zone = fields_list[availability_zone_index].strip() \
+                    if availability_zone_index is not None else None
+                if availability_zones_set and availability_zone not in availability_zones_set:
+                    continue
+                yield parse_trace_timestamp(fields_list[timestamp_index]), \
+                    instance_type.decode("utf-8") if instance_type is not None else None, \
+                    availability_zone.decode("utf-8") if availability_zone is not None else None
+
+    def __read_binary_interruptions(self,
+                                    position: int,
+                                    instance_types_list: list,
+                                    availability_zones_list: list) -> Iterator[tuple]:
+        # The filters are compared as the header's indexes, so the records are never decoded to strings
+        instance_types_indexes_set = {instance_type_index for instance_type_index, instance_type
+                                      in enumerate(self.__binary_instance_types_list)
+                                      if instance_type in (instance_types_list or [])}
+        availability_zones_indexes_set = {availability_zone_index for availability_zone_index, availability_zone
+                                          in enumerate(self.__binary_availability_zones_list)
+                                          if availability_zone in (availability_zones_list or [])}
+        records_end = self.__get_binary_records_end()
+        read_size = BINARY_TRACE_RECORDS_PER_READ * BINARY_TRACE_RECORD_STRUCT.size
+        while position < records_end:
+            # Each read copies a bounded chunk out of the map (no buffer of the map outlives the read)
+            records_chunk = self.__trace_map[position:min(position + read_size, records_end)]
+            position += len(records_chunk)
+            for timestamp, instance_type_index, availability_zone_index \
+                    in BINARY_TRACE_RECORD_STRUCT.iter_unpack(records_chunk):
+                if instance_types_list and instance_type_index not in instance_types_indexes_set:
+                    continue
+                if availability_zones_list and availability_zone_index not in availability_zones_indexes_set:
+                    continue
+                yield timestamp, \
+                    self.__binary_instance_types_list[instance_type_index], \
+                    self.__binary_availability_zones_list[availability_zone_index]
+
+    def read_interruptions(self,
+                           position: int,
+                           instance_types_list: list = None,
+                           availability_zones_list: list = None) -> Iterator[tuple]:
+        # Yields the (timestamp, instance type, availability zone) interruptions from the position (see seek) on,
+        # of the instance types and availability zones listed only (None for all of them)
+        if self.__trace_file_format == "binary":
+            return self.__read_binary_interruptions(position, instance_types_list, availability_zones_list)
+        return self.__read_csv_interruptions(position, instance_types_list, availability_zones_list)
+
+
+def generate_trace_replay_arrivals(revocation_trace: RevocationTrace,
+                                   start_offset_in_seconds: float,
+                                   time_scale_factor: float,
+                                   instance_types_list: list = None,
+                                   availability_zones_list: list = None,
+                                   resume_arrival_time_in_seconds: float = None,
+                                   resume_arrivals_at_time: int = 0) -> Iterator[tuple]:
+    # Replays the trace's interruptions from start_offset_in_seconds after its first one on, as (inter-arrival time,
+    # arrival time) tuples, with the trace's times multiplied by the time scale factor (0.5 replays twice as fast)
+    # A resumed replay seeks its last arrival time, and skips the resume_arrivals_at_time arrivals replayed at it
+    replay_start_timestamp = revocation_trace.get_start_timestamp() + start_offset_in_seconds
+    seek_timestamp = replay_start_timestamp
+    if resume_arrival_time_in_seconds is not None:
+        # Seek a bit earlier, as the arrival time converted back to a timestamp may be off by a rounding error
+        seek_timestamp += resume_arrival_time_in_seconds / time_scale_factor - 1
+    position = revocation_trace.seek(seek_timestamp)
+    previous_arrival_time_in_seconds = resume_arrival_time_in_seconds or 0.0
+    for timestamp, _, _ in revocation_trace.read_interruptions(position, instance_types_list, availability_zones_list):
+        arrival_time_in_seconds = (timestamp - replay_start_timestamp) * time_scale_factor
+        if resume_arrival_time_in_seconds is not None:
+            # Skip the arrivals replayed before the checkpoint
+            if arrival_time_in_seconds < resume_arrival_time_in_seconds:
+                continue
+            if arrival_time_in_seconds == resume_arrival_time_in_seconds and resume_arrivals_at_time > 0:
+                resume_arrivals_at_time -= 1
+                continue
+            resume_arrival_time_in_seconds = None
+        if arrival_time_in_seconds < previous_arrival_time_in_seconds:
+            raise ValueError("The trace's interruptions are not sorted by timestamp!")
+        yield arrival_time_in_seconds - previous_arrival_time_in_seconds, arrival_time_in_seconds
+        previous_arrival_time_in_seconds = arrival_time_in_seconds
+
+
+def convert_csv_trace_to_binary(csv_trace_file: Path,
+                                binary_trace_file: Path) -> int:
+    # Converts a CSV trace to the binary format (two streaming passes), and returns the number of interruptions
+    csv_trace = RevocationTrace(trace_file=csv_trace_file,
+                                trace_file_format="csv")
+    csv_trace.open()
+    try:
+        records_offset = csv_trace.seek(float("-inf"))
+        instance_types_indexes_dict = {}
+        availability_zones_indexes_dict = {}
+        for _, instance_type, availability_zone in csv_trace.read_interruptions(records_offset):
+            instance_types_indexes_dict.setdefault(instance_type or "", len(instance_types_indexes_dict))
+            availability_zones_indexes_dict.setdefault(availability_zone or "", len(availability_zones_indexes_dict))
+        header = dumps({"instance_types": list(instance_types_indexes_dict),
+                        "availability_zones": list(availability_zones_indexes_dict)}).encode("utf-8")
+        number_of_interruptions = 0
+        with open(binary_trace_file, mode="wb", buffering=1 << 20) as binary_trace:
+            binary_trace.write(BINARY_TRACE_PREAMBLE_STRUCT.pack(BINARY_TRACE_MAGIC, BINARY_TRACE_VERSION, len(header)))
+            binary_trace.write(header)
+            for timestamp, instance_type, availability_zone in csv_trace.read_interruptions(records_offset):
+                binary_trace.write(BINARY_TRACE_RECORD_STRUCT.pack(timestamp,
+                                                                   instance_types_indexes_dict[instance_type or ""],
+                                                                   availability_zones_indexes_dict[
+                                                                       availability_zone or ""]))
+                number_of_interruptions += 1
+    finally:
+        csv_trace.close()
+    return number_of_interruptions
@@ -0,0 +1,97 @@
+from pathlib import Path
+from typing import Any, Iterator
+from vm_revoker.revocation_trace import generate_trace_replay_arrivals, RevocationTrace
+from vm_revoker.vm_revoker import VMRevoker
+
+
+class TraceReplayVMRevoker(VMRevoker):
+    """
+    Replay of a real spot instances' interruptions trace to simulate virtual machines (VMs) revocation.
+
+    Every fleet replays the trace's (filtered) interruptions as its events, streamed from the memory-mapped trace file.
+
+    trace_file : the interruptions trace file (sorted by timestamp).
+
+    trace_file_format : the format of the trace file.
+    Supported formats: csv | binary
+
+    trace_time_scale_factor : the factor the trace's times are multiplied by (e.g., 0.5 replays it twice as fast).
+
+    trace_start_offset_in_seconds : the time in seconds (of the trace) after its first interruption to start the
+    replay at (the replay's events arrive from this time of the trace on).
+
+    trace_instance_types_list : the instance types of the interruptions to replay (None for all of them).
+
+    trace_availability_zones_list : the availability zones of the interruptions to replay (None for all of them).
+
+    vm_revoker_arguments : the fleets, stopping criterion, batch size, victim selection, scheduling, EC2, metrics and
+    logging settings (see VMRevoker).
+    """
+    def __init__(self,
+                 trace_file: Path,
+                 trace_file_format: str,
+                 trace_time_scale_factor: float,
+                 trace_start_offset_in_seconds: float,
+                 trace_instance_types_list: list,
+                 trace_availability_zones_list: list,
+                 **vm_revoker_arguments: Any) -> None:
+        super().__init__(**vm_revoker_arguments)
+        self.__trace_file = trace_file
+        self.__trace_file_format = trace_file_format
+        self.__trace_time_scale_factor = trace_time_scale_factor
+        self.__trace_start_offset_in_seconds = trace_start_offset_in_seconds
+        self.__trace_instance_types_list = trace_instance_types_list
+        self.__trace_availability_zones_list = trace_availability_zones_list
+        self.__revocation_trace = RevocationTrace(trace_file=trace_file,
+                                                  trace_file_format=trace_file_format)
+
+    def _get_process_name(self) -> str:
+        return "Trace Replay"
+
+    def __print_trace(self) -> None:
+        trace_message = "Trace: {0} ({1}), starting at {2} s (time scale factor = {3})" \
+            .format(self.__trace_file,
+                    self.__trace_file_format,
+                    self.__trace_start_offset_in_seconds,
+                    self.__trace_time_scale_factor)
+        print(trace_message + "\n-------")
+        self._get_logger().info(trace_message)
+        trace_filters_message = "Trace Interruptions Filters: instance types = {0}, availability zones = {1}" \
+            .format(self.__trace_instance_types_list or "all",
+                    self.__trace_availability_zones_list or "all")
+        print(trace_filters_message + "\n-------")
+        self._get_logger().info(trace_filters_message)
+
+    def _prepare_arrivals(self) -> None:
+        # Map the trace file (the replay seeks its start offset, instead of reading the trace up to it)
+        self.__revocation_trace.open()
+        self.__print_trace()
+
+    def _print_fleet_model_settings(self,
+                                    fleet_index: int) -> None:
+        # Every fleet replays the same trace, printed once by _prepare_arrivals
+        pass
+
+    def _print_fleet_arrivals(self,
+                              fleet_index: int) -> None:
+        arrival_times_streaming_message = "Arrival Schedule: streaming (arrival times replayed from the trace)"
+        print(arrival_times_streaming_message + "\n-------")
+        self._get_logger().info(arrival_times_streaming_message)
+
+    def _get_fleet_arrivals(self,
+                            fleet_index: int) -> Iterator[tuple]:
+        # A resumed replay seeks its last replayed arrival, instead of replaying the trace up to it
+        resume_arrival_time_in_seconds, resume_arrivals_at_time = self._get_fleet_resume_cursor(fleet_index) \
+            or (None, 0)
+        return generate_trace_replay_arrivals(revocation_trace=self.__revocation_trace,
+                                              start_offset_in_seconds=self.__trace_start_offset_in_seconds,
+                                              time_scale_factor=self.__trace_time_scale_factor,
+                                              instance_types_list=self.__trace_instance_types_list,
+                                              availability_zones_list=self.__trace_availability_zones_list,
+                                              resume_arrival_time_in_seconds=resume_arrival_time_in_seconds,
+                                              resume_arrivals_at_time=resume_arrivals_at_time)
+
+    def wait_for_completion(self) -> bool:
+        session_completed = super().wait_for_completion()
+        self.__revocation_trace.close()
+        return session_completed
@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import Any
+
+
+class VMFleet:
+    """
+    Fleet of virtual machines (VMs) targeted by revocations, with its own region, event rate and revoking behavior.
+
+    fleet_name : the name of the fleet.
+
+    region_name : the AWS region of the fleet's VMs (None to use the AWS configuration file's region).
+
+    average_time_between_events_in_seconds : the average interval of time in seconds between events' arrival.
+
+    lambda_rate : the average number of events per second (event rate or rate parameter).
+
+    rate_profile : the (possibly time-varying) event rate λ(t) of the fleet's Poisson process.
+    Supported profiles: ConstantRateProfile | PiecewiseRateProfile | DiurnalRateProfile
+    The fleets of the trace replay model have no event rate (None average time, lambda rate and rate profile).
+
+    vms_revoking_behavior : the behavior of the simulated revocations.
+    Supported behaviors: terminate | reboot
+
+    discovery_filters_list : the EC2 filters (e.g., tags) to discover the fleet's VMs with, as
+    [{"Name": filter name, "Values": filter values}] (None for a fleet of VMs loaded from a file).
+    """
+    def __init__(self,
+                 fleet_name: str,
+                 region_name: str,
+                 average_time_between_events_in_seconds: float,
+                 lambda_rate: float,
+                 rate_profile: Any,
+                 vms_revoking_behavior: str,
+                 discovery_filters_list: list = None) -> None:
+        self.__fleet_name = fleet_name
+        self.__region_name = region_name
+        self.__average_time_between_events_in_seconds = average_time_between_events_in_seconds
+        self.__lambda_rate = lambda_rate
+        self.__rate_profile = rate_profile
+        self.__vms_revoking_behavior = vms_revoking_behavior
+        self.__discovery_filters_list = discovery_filters_list
+        self.__vms_list = []
+
+    def get_fleet_name(self) -> str:
+        return self.__fleet_name
+
+    def get_region_name(self) -> str:
+        return self.__region_name
+
+    def set_region_name(self,
+                        region_name: str) -> None:
+        self.__region_name = region_name
+
+    def get_average_time_between_events_in_seconds(self) -> float:
+        return self.__average_time_between_events_in_seconds
+
+    def get_lambda_rate(self) -> float:
+        return self.__lambda_rate
+
+    def get_rate_profile(self) -> Any:
+        return self.__rate_profile
+
+    def get_vms_revoking_behavior(self) -> str:
+        return self.__vms_revoking_behavior
+
+    def get_discovery_filters_list(self) -> list:
+        return self.__discovery_filters_list
+
+    def get_vms_list(self) -> list:
+        return self.__vms_list
+
+    def load_vm_instances_ids_list_from_file(self,
+                                             vm_instances_ids_list_file: Path) -> None:
+        with open(vm_instances_ids_list_file) as instances_list:
+            instances = [instance.rstrip() for instance in instances_list]
+        self.__vms_list = [instance for instance in instances if instance]
@@ -0,0 +1,929 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import partial
+from heapq import merge
+from logging import FileHandler, Filter, Formatter, getLogger, INFO, StreamHandler
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from queue import SimpleQueue
+from random import Random
+from re import search
+from sys import stdout
+from threading import Thread
+from time import monotonic
+from typing import Any, Iterator
+from simulation.fake_ec2_backend import create_discovered_fleet_fake_ec2_backend, FakeEC2Backend
+from util.clock import VirtualClock, WallClock
+from util.metrics import MetricsRegistry, PrometheusHTTPExporter, PrometheusTextfileExporter
+from util.util import generate_execution_id
+from vm_revoker.active_fleet_index import ActiveFleetIndex
+from vm_revoker.batch_size_distribution import BatchSizeDistribution
+from vm_revoker.deadline_scheduler import DeadlineScheduler
+from vm_revoker.poisson_arrival_stream import limit_arrivals
+from vm_revoker.revocation_checkpoint import load_revocation_checkpoint, RevocationCheckpointWriter
+from vm_revoker.revocation_dispatcher import RevocationDispatcher
+from vm_revoker.revocation_event_log import RevocationEventLog
+from vm_revoker.vm_fleet import VMFleet
+from vm_manager.ec2_client_pool import EC2ClientPool
+from vm_manager.ec2_fleet_state_cache import EC2FleetStateCache, EC2FleetStateRefresher
+from vm_manager.ec2_vm_manager import EC2VMManager
+
+
+class VMRevoker(ABC):
+    """
+    Base of the revocation models simulating virtual machines (VMs) revocation: monitors the fleets and revokes their
+    VMs as the model's events arrive (see PoissonVMRevoker and TraceReplayVMRevoker).
+
+    Each fleet has its own stream of arrivals, and the fleets' arrivals are merged by arrival time into a single stream,
+    so every fleet of every region is driven by the same scheduling thread.
+
+    Models provide their arrivals and settings through the _get_process_name, _prepare_arrivals,
+    _print_fleet_model_settings, _print_fleet_arrivals and _get_fleet_arrivals methods.
+
+    fleets_list : the fleets of VMs targeted by revocations (VMFleet objects, with their VM instances IDs loaded).
+
+    stopping_criterion : the stopping criterion for the arrivals of each fleet.
+    Supported criteria: max_number_of_observable_events | max_observation_length_in_seconds | unbounded
+
+    max_number_of_observable_events : the maximum number of observable events of each fleet.
+
+    max_observation_length_in_seconds : the maximum observation length in seconds for events to arrive.
+
+    batch_size_distribution_name : the distribution of the number of VMs revoked per event (compound process).
+    Supported distributions: constant | geometric | poisson | uniform
+
+    batch_size_mean : the mean number of VMs revoked per event (1 revokes a single VM per event).
+
+    batch_size_max : the maximum number of VMs revoked per event.
+
+    victim_selection_group_attribute : the attribute grouping the VMs for weighted victim selection.
+    Supported attributes: none (uniform selection) | instance_type | availability_zone
+
+    victim_selection_groups_weights_dict : the selection weight of each group of VMs (unlisted groups weigh 1).
+
+    overdue_event_policy : how to handle events that could not fire on time (applied to each fleet's events).
+    Supported policies: fire_immediately | coalesce (the fleet's next firing event also revokes the coalesced events'
+    batches) | skip
+
+    overdue_event_tolerance_in_seconds : the scheduling lag in seconds up to which an event is not overdue.
+
+    max_concurrent_revocations : the maximum number of revocation actions (API calls) in-flight at the same time,
+    across all the fleets.
+
+    fleet_state_refresh_interval_in_seconds : the interval in seconds between two background refreshes of the
+    fleets' instances states.
+
+    fleet_state_max_staleness_in_seconds : the maximum age in seconds of the cached fleet's instances states an event
+    may use (older states are refreshed before selecting the VMs to revoke).
+
+    fleet_membership_full_resync_interval_in_seconds : the interval in seconds between two full listings of the
+    discovered fleets' instances (in between, only the joining and leaving instances are listed).
+
+    execution_mode : the execution mode of the revocations.
+    Supported modes: live (wall-clock time, AWS EC2) | simulate (virtual time, in-memory fake EC2 backend)
+
+    aws_config_file : the AWS configuration file (its region is used by the fleets with no region of their own).
+
+    describe_instances_max_workers : the maximum number of parallel DescribeInstances chunk queries.
+
+    api_request_rate_limits_dict : the request token bucket of each EC2 API, as {API name: (capacity, refill rate per
+    second)}, shared by all the fleets of a region (live execution mode only).
+
+    throttling_max_attempts : the maximum number of attempts of a throttled EC2 request.
+
+    throttling_base_backoff_in_seconds : the backoff in seconds before the first retry of a throttled EC2 request.
+
+    throttling_max_backoff_in_seconds : the maximum backoff in seconds before a retry of a throttled EC2 request.
+
+    revocation_coalescing_window_in_seconds : the time in seconds concurrent revocations of a fleet wait to be sent
+    as a single API call (0 to send each revocation on its own).
+
+    metrics_exporter : the way the revocation loop's metrics (API call latencies, scheduling lag, active fleet size,
+    events and revocations counters) are exported.
+    Supported exporters: none | textfile (Prometheus textfile, written periodically) | http (local Prometheus endpoint)
+
+    metrics_textfile : the Prometheus textfile to write the metrics to (textfile exporter only).
+
+    metrics_http_port : the port to serve the metrics on (http exporter only).
+
+    metrics_http_host : the address to serve the metrics on (http exporter only, e.g., 127.0.0.1 for local scrapes).
+
+    metrics_export_interval_in_seconds : the interval in seconds between two writes of the metrics textfile.
+
+    event_log_format : the format of the structured event log (one record per arrival), saved to the logging
+    directory. Supported formats: jsonl (JSON lines) | binary (compact, for million-event runs) | none
+
+    checkpoint_file : the file to save the session's checkpoints to (None not to save them): the random generator's
+    state, the arrivals' cursors, and the fleets' states (revoked VMs included) and groups.
+
+    checkpoint_interval_in_seconds : the (wall-clock) interval in seconds between two checkpoints.
+
+    resume_from_checkpoint : whether to resume the session saved to the checkpoint file, instead of starting anew.
+    A resumed session continues its arrivals from the last checkpointed one (drawn from the checkpointed random
+    state, or sought in the trace), and its fleets from their checkpointed states, with no full re-discovery.
+
+    logging_directory : the directory to save execution logs.
+    """
+    def __init__(self,
+                 fleets_list: list,
+                 stopping_criterion: str,
+                 max_number_of_observable_events: int,
+                 max_observation_length_in_seconds: float,
+                 batch_size_distribution_name: str,
+                 batch_size_mean: float,
+                 batch_size_max: int,
+                 victim_selection_group_attribute: str,
+                 victim_selection_groups_weights_dict: dict,
+                 overdue_event_policy: str,
+                 overdue_event_tolerance_in_seconds: float,
+                 max_concurrent_revocations: int,
+                 fleet_state_refresh_interval_in_seconds: float,
+                 fleet_state_max_staleness_in_seconds: float,
+                 fleet_membership_full_resync_interval_in_seconds: float,
+                 execution_mode: str,
+                 aws_config_file: Path,
+                 describe_instances_max_workers: int,
+                 api_request_rate_limits_dict: dict,
+                 throttling_max_attempts: int,
+                 throttling_base_backoff_in_seconds: float,
+                 throttling_max_backoff_in_seconds: float,
+                 revocation_coalescing_window_in_seconds: float,
+                 metrics_exporter: str,
+                 metrics_textfile: Path,
+                 metrics_http_port: int,
+                 metrics_http_host: str,
+                 metrics_export_interval_in_seconds: float,
+                 event_log_format: str,
+                 checkpoint_file: Path,
+                 checkpoint_interval_in_seconds: float,
+                 resume_from_checkpoint: bool,
+                 logging_directory: Path) -> None:
+        self.__fleets_list = fleets_list
+        self.__stopping_criterion = stopping_criterion
+        self.__max_number_of_observable_events = max_number_of_observable_events
+        self.__max_observation_length_in_seconds = max_observation_length_in_seconds
+        self.__victim_selection_group_attribute = victim_selection_group_attribute
+        self.__overdue_event_policy = overdue_event_policy
+        self.__overdue_event_tolerance_in_seconds = overdue_event_tolerance_in_seconds
+        self.__max_concurrent_revocations = max_concurrent_revocations
+        self.__fleet_state_refresh_interval_in_seconds = fleet_state_refresh_interval_in_seconds
+        self.__fleet_state_max_staleness_in_seconds = fleet_state_max_staleness_in_seconds
+        self.__fleet_membership_full_resync_interval_in_seconds = fleet_membership_full_resync_interval_in_seconds
+        self.__execution_mode = execution_mode
+        self.__aws_config_file = aws_config_file
+        self.__describe_instances_max_workers = describe_instances_max_workers
+        self.__api_request_rate_limits_dict = api_request_rate_limits_dict
+        self.__throttling_max_attempts = throttling_max_attempts
+        self.__throttling_base_backoff_in_seconds = throttling_base_backoff_in_seconds
+        self.__throttling_max_backoff_in_seconds = throttling_max_backoff_in_seconds
+        self.__revocation_coalescing_window_in_seconds = revocation_coalescing_window_in_seconds
+        self.__ec2_client_pool = None
+        self.__metrics_exporter = metrics_exporter
+        self.__metrics_textfile = metrics_textfile
+        self.__metrics_http_port = metrics_http_port
+        self.__metrics_http_host = metrics_http_host
+        self.__metrics_export_interval_in_seconds = metrics_export_interval_in_seconds
+        self.__metrics_registry = MetricsRegistry()
+        self.__event_log_format = event_log_format
+        self.__execution_id = None
+        self.__log_queue_listener = None
+        self.__events_logger = None
+        self.__revocation_event_log = None
+        self.__checkpoint_file = checkpoint_file
+        self.__checkpoint_interval_in_seconds = checkpoint_interval_in_seconds
+        self.__resume_from_checkpoint = resume_from_checkpoint
+        self.__checkpoint_dict = None
+        # Per fleet: [number of consumed arrivals, last consumed arrival time, consumed arrivals at that time]
+        self.__fleets_arrivals_cursors_list = [[0, 0.0, 0] for _ in fleets_list]
+        self.__set_metrics()
+        self.__logging_directory = logging_directory
+        self.__random_generator = Random()
+        self.__arrivals = None
+        self.__batch_size_distribution = BatchSizeDistribution(distribution_name=batch_size_distribution_name,
+                                                               batch_size_mean=batch_size_mean,
+                                                               batch_size_max=batch_size_max,
+                                                               random_generator=self.__random_generator)
+        self.__active_fleet_indexes_list = [ActiveFleetIndex(random_generator=self.__random_generator,
+                                                             groups_weights_dict=victim_selection_groups_weights_dict)
+                                            for _ in fleets_list]
+        self.__clock = VirtualClock() if execution_mode == "simulate" else WallClock()
+        self.__vms_list_monitor_thread = None
+        self.__session_completed = False
+        self.__logger = None
+
+    @abstractmethod
+    def _get_process_name(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _prepare_arrivals(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _print_fleet_model_settings(self,
+                                    fleet_index: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _print_fleet_arrivals(self,
+                              fleet_index: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _get_fleet_arrivals(self,
+                            fleet_index: int) -> Iterator[tuple]:
+        # Yields the fleet's (inter-arrival time, arrival time) tuples, in increasing arrival time
+        raise NotImplementedError
+
+    def _get_fleets_list(self) -> list:
+        return self.__fleets_list
+
+    def _get_random_generator(self) -> Random:
+        return self.__random_generator
+
+    def _get_logger(self) -> Any:
+        return self.__logger
+
+    def _get_fleet_resume_cursor(self,
+                                 fleet_index: int) -> tuple:
+        # (last consumed arrival time, consumed arrivals at that time) of a resumed session, None otherwise
+        if self.__checkpoint_dict is None:
+            return None
+        _, last_arrival_time, arrivals_at_last_arrival_time = self.__fleets_arrivals_cursors_list[fleet_index]
+        return last_arrival_time, arrivals_at_last_arrival_time
+
+    def __set_metrics(self) -> None:
+        self.__fleets_names_list = [(fleet.get_fleet_name(),) for fleet in self.__fleets_list]
+        self.__scheduling_lag_histogram = \
+            self.__metrics_registry.histogram("vm_revoker_event_scheduling_lag_seconds",
+                                              "Time between the events' deadlines and their actual firing.",
+                                              ("fleet",))
+        self.__active_fleet_vms_gauge = \
+            self.__metrics_registry.gauge("vm_revoker_active_fleet_vms",
+                                          "Active VMs of the fleet, as seen by the last event.",
+                                          ("fleet",))
+        self.__events_counter = \
+            self.__metrics_registry.counter("vm_revoker_events_total",
+                                            "Events, by outcome (revoked | no_op | skip | coalesce).",
+                                            ("fleet", "outcome"))
+        self.__revoked_vms_counter = \
+            self.__metrics_registry.counter("vm_revoker_revoked_vms_total",
+                                            "VMs revoked (by successful revocation actions).",
+                                            ("fleet", "state"))
+        self.__revocation_latency_histogram = \
+            self.__metrics_registry.histogram("vm_revoker_revocation_latency_seconds",
+                                              "Time taken by the revocation actions (API calls) to complete.",
+                                              ("fleet",))
+        self.__revocation_failures_counter = \
+            self.__metrics_registry.counter("vm_revoker_revocation_failures_total",
+                                            "Revocation actions that failed.",
+                                            ("fleet",))
+
+    def __create_metrics_exporter(self) -> Any:
+        if self.__metrics_exporter == "textfile":
+            return PrometheusTextfileExporter(metrics_registry=self.__metrics_registry,
+                                              metrics_textfile=self.__metrics_textfile,
+                                              export_interval_in_seconds=self.__metrics_export_interval_in_seconds)
+        if self.__metrics_exporter == "http":
+            return PrometheusHTTPExporter(metrics_registry=self.__metrics_registry,
+                                          metrics_http_port=self.__metrics_http_port,
+                                          metrics_http_host=self.__metrics_http_host)
+        return None
+
+    def __set_logger(self) -> None:
+        self.__execution_id = generate_execution_id()
+        logger_name = "vm-revoker_execution_id_" + self.__execution_id + ".log"
+        file_handler = FileHandler(filename=Path(self.__logging_directory).joinpath(logger_name))
+        file_handler.setFormatter(Formatter("%(asctime)s %(message)s"))
+        # The events' messages are printed by the listener's thread too, so the monitoring thread never blocks on I/O
+        console_handler = StreamHandler(stdout)
+        console_handler.addFilter(Filter("vm_revoker.events"))
+        log_queue = SimpleQueue()
+        self.__log_queue_listener = QueueListener(log_queue, file_handler, console_handler)
+        self.__logger = getLogger()
+        self.__logger.setLevel(INFO)
+        self.__logger.addHandler(QueueHandler(log_queue))
+        self.__events_logger = getLogger("vm_revoker.events")
+        self.__log_queue_listener.start()
+
+    def __set_revocation_event_log(self) -> None:
+        event_log_extension = ".bin" if self.__event_log_format == "binary" else ".jsonl"
+        event_log_name = "vm-revoker_events_execution_id_" + self.__execution_id + event_log_extension
+        self.__revocation_event_log = \
+            RevocationEventLog(event_log_format=self.__event_log_format,
+                               event_log_file=Path(self.__logging_directory).joinpath(event_log_name),
+                               run_id=self.__execution_id,
+                               fleets_names_list=[fleet.get_fleet_name() for fleet in self.__fleets_list])
+
+    def __tag_fleet_arrivals(self,
+                             fleet_index: int) -> Iterator[tuple]:
+        # Every model's arrivals are bounded by the same stopping criterion (a resumed session's events count too)
+        max_number_of_observable_events = self.__max_number_of_observable_events
+        if max_number_of_observable_events is not None:
+            max_number_of_observable_events = \
+                max(0, max_number_of_observable_events - self.__fleets_arrivals_cursors_list[fleet_index][0])
+        fleet_arrivals = limit_arrivals(arrivals=self._get_fleet_arrivals(fleet_index),
+                                        stopping_criterion=self.__stopping_criterion,
+                                        max_number_of_observable_events=max_number_of_observable_events,
+                                        max_observation_length_in_seconds=self.__max_observation_length_in_seconds)
+        for inter_arrival_time, arrival_time in fleet_arrivals:
+            yield inter_arrival_time, arrival_time, fleet_index
+
+    def __set_arrivals(self) -> None:
+        # Tag each fleet's arrivals with the fleet's index, then merge them lazily by arrival time
+        fleets_arrivals_list = [self.__tag_fleet_arrivals(fleet_index)
+                                for fleet_index in range(len(self.__fleets_list))]
+        self.__arrivals = merge(*fleets_arrivals_list, key=lambda arrival: arrival[1])
+
+    def __get_fleet_message_prefix(self,
+                                   fleet_index: int) -> str:
+        if len(self.__fleets_list) == 1:
+            return ""
+        return "[{0}] ".format(self.__fleets_list[fleet_index].get_fleet_name())
+
+    def __print_fleet(self,
+                      fleet: VMFleet) -> None:
+        fleet_message = "Fleet: {0} (region = {1})" \
+            .format(fleet.get_fleet_name(),
+                    fleet.get_region_name())
+        print(fleet_message)
+        self.__logger.info(fleet_message)
+
+    def __print_vms_revoking_behavior(self,
+                                      fleet: VMFleet) -> None:
+        vms_revoking_behavior_message = "VMs Revoking Behavior: {0}" \
+            .format(fleet.get_vms_revoking_behavior())
+        print(vms_revoking_behavior_message + "\n-------")
+        self.__logger.info(vms_revoking_behavior_message)
+
+    def __print_stopping_criterion(self) -> None:
+        if self.__stopping_criterion == "unbounded":
+            stopping_criterion_message = "Stopping Criterion: unbounded (until the process is stopped)"
+        else:
+            stopping_criterion_variable = self.__max_number_of_observable_events \
+                if self.__stopping_criterion == "max_number_of_observable_events" \
+                else self.__max_observation_length_in_seconds
+            stopping_criterion_message = "Stopping Criterion: {0} = {1}" \
+                .format(self.__stopping_criterion,
+                        stopping_criterion_variable)
+        print("-------\n" + stopping_criterion_message + "\n-------")
+        self.__logger.info(stopping_criterion_message)
+
+    def __print_batch_size_distribution(self) -> None:
+        batch_size_distribution_message = "Batch Size Distribution (VMs Revoked per Event): {0}" \
+            .format(self.__batch_size_distribution)
+        print(batch_size_distribution_message + "\n-------")
+        self.__logger.info(batch_size_distribution_message)
+
+    def __print_overdue_event_policy(self) -> None:
+        overdue_event_policy_message = "Overdue Event Policy: {0} (tolerance = {1} s)" \
+            .format(self.__overdue_event_policy,
+                    self.__overdue_event_tolerance_in_seconds)
+        print(overdue_event_policy_message + "\n-------")
+        self.__logger.info(overdue_event_policy_message)
+
+    def __print_execution_mode(self) -> None:
+        execution_mode_message = "Execution Mode: {0}" \
+            .format(self.__execution_mode)
+        print(execution_mode_message + "\n-------")
+        self.__logger.info(execution_mode_message)
+
+    def __print_vm_instances_ids_list(self,
+                                      fleet: VMFleet) -> None:
+        if fleet.get_discovery_filters_list() is not None:
+            vm_instances_discovery_message = "VM Instances Discovery Filters: " \
+                + str(fleet.get_discovery_filters_list())
+            print(vm_instances_discovery_message + "\n-------")
+            self.__logger.info(vm_instances_discovery_message)
+            return
+        vm_instances_list_message = "VM Instances IDs List: " + str(fleet.get_vms_list())
+        print(vm_instances_list_message + "\n-------")
+        self.__logger.info(vm_instances_list_message)
+
+    def __get_aws_config_region_name(self) -> str:
+        aws_region = None
+        with open(self.__aws_config_file, mode="r") as aws_config_file:
+            for line in iter(lambda: aws_config_file.readline(), ""):
+                match_aws_region = search("region = (.*)$", line)
+                if match_aws_region:
+                    aws_region = match_aws_region.groups()[0]
+        return aws_region
+
+    def __set_fleets_regions_names(self) -> None:
+        # Fleets with no region of their own run in the AWS config file's region
+        if any(fleet.get_region_name() is None for fleet in self.__fleets_list):
+            aws_config_region_name = self.__get_aws_config_region_name()
+            for fleet in self.__fleets_list:
+                if fleet.get_region_name() is None:
+                    fleet.set_region_name(aws_config_region_name)
+
+    def __create_fake_ec2_backend(self,
+                                  fleet_index: int,
+                                  fleet: VMFleet) -> FakeEC2Backend:
+        if fleet.get_discovery_filters_list() is not None:
+            fake_ec2_backend = create_discovered_fleet_fake_ec2_backend(fleet.get_vms_list(),
+                                                                        fleet.get_discovery_filters_list())
+        else:
+            fake_ec2_backend = FakeEC2Backend(instances_id_list=fleet.get_vms_list())
+        if self.__checkpoint_dict is not None and fleet.get_vms_revoking_behavior() == "terminate":
+            # The simulated backend does not outlive its session, so a resumed one terminates the VMs revoked before
+            instances_states_dict = self.__checkpoint_dict["fleets"][fleet_index]["state_snapshot"]["instances_states"]
+            fake_ec2_backend.terminate_instances([instance_id for instance_id, state in instances_states_dict.items()
+                                                  if state in ("terminated", "revoked")])
+        return fake_ec2_backend
+
+    def __create_ec2_vm_managers_list(self) -> list:
+        # A single pooled client per region is shared by the describe workers and by the revocation dispatcher's
+        # workers of every fleet of that region
+        max_pool_connections = self.__describe_instances_max_workers + self.__max_concurrent_revocations
+        if self.__execution_mode == "live":
+            self.__ec2_client_pool = \
+                EC2ClientPool(max_pool_connections=max_pool_connections,
+                              api_request_rate_limits_dict=self.__api_request_rate_limits_dict,
+                              throttling_max_attempts=self.__throttling_max_attempts,
+                              throttling_base_backoff_in_seconds=self.__throttling_base_backoff_in_seconds,
+                              throttling_max_backoff_in_seconds=self.__throttling_max_backoff_in_seconds,
+                              metrics_registry=self.__metrics_registry)
+        ec2_vm_managers_list = []
+        for fleet_index, fleet in enumerate(self.__fleets_list):
+            if self.__ec2_client_pool:
+                ec2_client = self.__ec2_client_pool.get_ec2_client(fleet.get_region_name())
+                ec2_request_governor = self.__ec2_client_pool.get_ec2_request_governor(fleet.get_region_name())
+                revocation_coalescing_window_in_seconds = self.__revocation_coalescing_window_in_seconds
+            else:
+                # The fake EC2 backend does not throttle, so the simulated requests are neither rate-governed nor
+                # coalesced (on a virtual clock, events hours apart would share the same real coalescing window)
+                ec2_client = self.__create_fake_ec2_backend(fleet_index, fleet)
+                ec2_request_governor = None
+                revocation_coalescing_window_in_seconds = 0.0
+            ec2vmm = EC2VMManager(service_name="ec2",
+                                  region_name=fleet.get_region_name(),
+                                  describe_instances_max_workers=self.__describe_instances_max_workers,
+                                  max_pool_connections=max_pool_connections,
+                                  ec2_client=ec2_client,
+                                  ec2_request_governor=ec2_request_governor,
+                                  revocation_coalescing_window_in_seconds=revocation_coalescing_window_in_seconds,
+                                  metrics_registry=self.__metrics_registry)
+            ec2_vm_managers_list.append(ec2vmm)
+        return ec2_vm_managers_list
+
+    def __create_deadline_scheduler(self) -> DeadlineScheduler:
+        return DeadlineScheduler(clock=self.__clock,
+                                 overdue_event_policy=self.__overdue_event_policy,
+                                 overdue_event_tolerance_in_seconds=self.__overdue_event_tolerance_in_seconds)
+
+    def __print_overdue_event_message(self,
+                                      fleet_index: int,
+                                      event_counter: int,
+                                      next_arrival_time: float,
+                                      scheduling_lag: float,
+                                      event_status: str) -> None:
+        overdue_event_outcome = "skipped" if event_status == "skip" else "coalesced into the fleet's next event"
+        overdue_event_message = "\t {0}t{1} = {2} s (lag = {3} s): \t Event overdue, {4}!" \
+            .format(self.__get_fleet_message_prefix(fleet_index),
+                    event_counter,
+                    round(next_arrival_time, 2),
+                    round(scheduling_lag, 3),
+                    overdue_event_outcome)
+        self.__events_logger.info(overdue_event_message)
+
+    @staticmethod
+    def __get_vms_description(instances_ids_list: list) -> str:
+        if len(instances_ids_list) == 1:
+            return "VM instance ID = '{0}'".format(instances_ids_list[0])
+        return "VM instances IDs = {0}".format(instances_ids_list)
+
+    def __print_revocation_completion_message(self,
+                                              fleet_index: int,
+                                              event_counter: int,
+                                              next_arrival_time: float,
+                                              revoked_state: str,
+                                              instances_ids_list: list,
+                                              revocation_exception: Exception,
+                                              revocation_latency: float) -> None:
+        if revocation_exception is None:
+            revocation_success_message = "\t {0}t{1} = {2} s: \t {3} revoked ({4}) after {5} s!" \
+                .format(self.__get_fleet_message_prefix(fleet_index),
+                        event_counter,
+                        round(next_arrival_time, 2),
+                        self.__get_vms_description(instances_ids_list),
+                        revoked_state,
+                        round(revocation_latency, 3))
+            self.__events_logger.info(revocation_success_message)
+            return
+        revocation_failure_message = \
+            "\t {0}t{1} = {2} s: \t VM instances IDs = {3} revocation failed after {4} s: {5}" \
+            .format(self.__get_fleet_message_prefix(fleet_index),
+                    event_counter,
+                    round(next_arrival_time, 2),
+                    instances_ids_list,
+                    round(revocation_latency, 3),
+                    revocation_exception)
+        self.__events_logger.error(revocation_failure_message)
+
+    def __handle_revocation_completion(self,
+                                       fleet_index: int,
+                                       event_counter: int,
+                                       next_arrival_time: float,
+                                       scheduling_lag: float,
+                                       revoked_state: str,
+                                       fleet_state_cache: EC2FleetStateCache,
+                                       vms_groups_keys_dict: dict,
+                                       instances_ids_list: list,
+                                       revocation_exception: Exception,
+                                       revocation_latency: float) -> None:
+        self.__revocation_latency_histogram.observe(revocation_latency, self.__fleets_names_list[fleet_index])
+        if revocation_exception is None:
+            self.__revoked_vms_counter.inc(len(instances_ids_list),
+                                           self.__fleets_names_list[fleet_index] + (revoked_state,))
+        else:
+            self.__revocation_failures_counter.inc(labels_values=self.__fleets_names_list[fleet_index])
+            # The VMs are still active, so they are selectable again
+            fleet_state_cache.revalidate(instances_ids_list)
+            self.__active_fleet_indexes_list[fleet_index].requeue(instances_ids_list, vms_groups_keys_dict)
+        self.__revocation_event_log.record_event(event_counter,
+                                                 fleet_index,
+                                                 next_arrival_time,
+                                                 next_arrival_time + scheduling_lag,
+                                                 instances_ids_list,
+                                                 self.__fleets_list[fleet_index].get_vms_revoking_behavior(),
+                                                 revocation_latency,
+                                                 "success" if revocation_exception is None else "failure")
+        self.__print_revocation_completion_message(fleet_index,
+                                                   event_counter,
+                                                   next_arrival_time,
+                                                   revoked_state,
+                                                   instances_ids_list,
+                                                   revocation_exception,
+                                                   revocation_latency)
+
+    def __print_revoke_message(self,
+                               fleet_index: int,
+                               event_counter: int,
+                               next_arrival_time: float,
+                               scheduling_lag: float,
+                               revoked_state: str,
+                               dispatched_vms_list: list) -> None:
+        # The revocation's outcome is reported once its API call completes
+        revoke_message = "\t {0}t{1} = {2} s (lag = {3} s): \t {4} dispatched (to be {5})!" \
+            .format(self.__get_fleet_message_prefix(fleet_index),
+                    event_counter,
+                    round(next_arrival_time, 2),
+                    round(scheduling_lag, 3),
+                    self.__get_vms_description(dispatched_vms_list),
+                    revoked_state)
+        self.__events_logger.info(revoke_message)
+
+    def __print_non_revoke_message(self,
+                                   fleet_index: int,
+                                   event_counter: int,
+                                   next_arrival_time: float,
+                                   scheduling_lag: float) -> None:
+        non_revoke_message = \
+            "\t {0}t{1} = {2} s (lag = {3} s): \t Event occurred, but no active VM instances to revoke!" \
+            .format(self.__get_fleet_message_prefix(fleet_index),
+                    event_counter,
+                    round(next_arrival_time, 2),
+                    round(scheduling_lag, 3))
+        self.__events_logger.info(non_revoke_message)
+
+    def __print_ec2_requests_counters(self,
+                                      ec2_vm_managers_list: list) -> None:
+        if not self.__ec2_client_pool:
+            return
+        ec2_requests_counters_message = "EC2 Requests Counters (per Region and API): {0}" \
+            .format(self.__ec2_client_pool.get_ec2_requests_counters_dict())
+        self.__events_logger.info(ec2_requests_counters_message)
+        if self.__revocation_coalescing_window_in_seconds > 0:
+            revocation_coalescing_counters_dict = \
+                {fleet.get_fleet_name(): ec2vmm.get_revocation_coalescing_counters_dict()
+                 for fleet, ec2vmm in zip(self.__fleets_list, ec2_vm_managers_list)}
+            revocation_coalescing_message = "Revocation Coalescing Counters (per Fleet and API): {0}" \
+                .format(revocation_coalescing_counters_dict)
+            self.__events_logger.info(revocation_coalescing_message)
+
+    def __select_vms_to_revoke(self,
+                               fleet_index: int,
+                               number_of_events: int) -> list:
+        # Compound process: each event revokes a batch of distinct active VMs of the event's fleet (an event that
+        # fires after coalesced ones revokes their batches too)
+        batch_size = sum(self.__batch_size_distribution.draw() for _ in range(number_of_events))
+        return self.__active_fleet_indexes_list[fleet_index].pop_random(batch_size)
+
+    def __get_vms_groups_keys_dict(self,
+                                   fleet: VMFleet,
+                                   ec2vmm: EC2VMManager) -> dict:
+        if self.__victim_selection_group_attribute == "none":
+            return None
+        if fleet.get_discovery_filters_list() is not None:
+            # The discovered VMs' groups are looked up as they join the fleet
+            return {}
+        return ec2vmm.get_ec2_instances_groups_dict(fleet.get_vms_list(), self.__victim_selection_group_attribute)
+
+    def __update_vms_groups_keys_dict(self,
+                                      vms_groups_keys_dict: dict,
+                                      ec2vmm: EC2VMManager,
+                                      states_delta_dict: dict) -> None:
+        if vms_groups_keys_dict is None:
+            return
+        joining_vms_list = [instance_id for instance_id, state in states_delta_dict.items()
+                            if state == "running" and instance_id not in vms_groups_keys_dict]
+        if joining_vms_list:
+            vms_groups_keys_dict.update(ec2vmm.get_ec2_instances_groups_dict(joining_vms_list,
+                                                                             self.__victim_selection_group_attribute))
+
+    def __create_fleet_state_cache(self,
+                                   fleet: VMFleet,
+                                   ec2vmm: EC2VMManager) -> EC2FleetStateCache:
+        # The simulated execution mode runs on a virtual clock, so its caches are refreshed on access instead
+        full_resync_interval_in_seconds = self.__fleet_membership_full_resync_interval_in_seconds
+        return EC2FleetStateCache(ec2vmm=ec2vmm,
+                                  instances_id_list=fleet.get_vms_list(),
+                                  clock=self.__clock,
+                                  refresh_interval_in_seconds=self.__fleet_state_refresh_interval_in_seconds,
+                                  max_staleness_in_seconds=self.__fleet_state_max_staleness_in_seconds,
+                                  background_refresh=(self.__execution_mode == "live"),
+                                  discovery_filters_list=fleet.get_discovery_filters_list(),
+                                  full_resync_interval_in_seconds=full_resync_interval_in_seconds)
+
+    @staticmethod
+    def __get_revocation_function_and_state(fleet: VMFleet,
+                                            ec2vmm: EC2VMManager) -> tuple:
+        if fleet.get_vms_revoking_behavior() == "terminate":
+            return ec2vmm.terminate_ec2_instances, "terminated"
+        return ec2vmm.reboot_ec2_instances, "rebooted"
+
+    def __load_checkpoint(self) -> None:
+        checkpoint_dict = load_revocation_checkpoint(self.__checkpoint_file)
+        fleets_names_list = [fleet.get_fleet_name() for fleet in self.__fleets_list]
+        checkpoint_fleets_names_list = [fleet_dict["name"] for fleet_dict in checkpoint_dict["fleets"]]
+        if checkpoint_dict["process"] != self._get_process_name() or checkpoint_fleets_names_list != fleets_names_list:
+            invalid_checkpoint_message = \
+                "The checkpoint '{0}' was saved by a {1} session of the fleets {2}, not by a {3} session of the " \
+                "fleets {4}!".format(self.__checkpoint_file,
+                                     checkpoint_dict["process"],
+                                     checkpoint_fleets_names_list,
+                                     self._get_process_name(),
+                                     fleets_names_list)
+            raise ValueError(invalid_checkpoint_message)
+        version, internal_state, gauss_next = checkpoint_dict["random_generator_state"]
+        self.__random_generator.setstate((version, tuple(internal_state), gauss_next))
+        self.__fleets_arrivals_cursors_list = [list(fleet_dict["arrivals_cursor"])
+                                               for fleet_dict in checkpoint_dict["fleets"]]
+        self.__checkpoint_dict = checkpoint_dict
+        resume_message = "Resuming from Checkpoint: {0} (execution ID = {1}, event = t{2}, arrival time = {3} s, " \
+                         "saved at {4})".format(self.__checkpoint_file,
+                                                checkpoint_dict["execution_id"],
+                                                checkpoint_dict["event_counter"],
+                                                round(checkpoint_dict["arrival_time"], 2),
+                                                checkpoint_dict["saved_at"])
+        print(resume_message + "\n-------")
+        self.__logger.info(resume_message)
+
+    def __update_fleet_arrivals_cursor(self,
+                                       fleet_index: int,
+                                       arrival_time: float) -> None:
+        fleet_arrivals_cursor = self.__fleets_arrivals_cursors_list[fleet_index]
+        fleet_arrivals_cursor[0] += 1
+        if fleet_arrivals_cursor[1] == arrival_time:
+            fleet_arrivals_cursor[2] += 1
+        else:
+            fleet_arrivals_cursor[1] = arrival_time
+            fleet_arrivals_cursor[2] = 1
+
+    def __create_checkpoint_dict(self,
+                                 event_counter: int,
+                                 arrival_time: float,
+                                 fleet_state_caches_list: list,
+                                 vms_groups_keys_dicts_list: list,
+                                 completed: bool = False) -> dict:
+        # Built on the monitoring thread (the only user of the random generator), between two events
+        version, internal_state, gauss_next = self.__random_generator.getstate()
+        fleets_dicts_list = []
+        for fleet, fleet_arrivals_cursor, fleet_state_cache, vms_groups_keys_dict \
+                in zip(self.__fleets_list,
+                       self.__fleets_arrivals_cursors_list,
+                       fleet_state_caches_list,
+                       vms_groups_keys_dicts_list):
+            fleets_dicts_list.append({"name": fleet.get_fleet_name(),
+                                      "arrivals_cursor": list(fleet_arrivals_cursor),
+                                      "state_snapshot": fleet_state_cache.get_snapshot_dict(),
+                                      "vms_groups_keys": dict(vms_groups_keys_dict)
+                                      if vms_groups_keys_dict is not None else None})
+        return {"process": self._get_process_name(),
+                "execution_id": self.__execution_id,
+                "saved_at": datetime.now(timezone.utc).isoformat(),
+                "event_counter": event_counter,
+                "arrival_time": arrival_time,
+                "random_generator_state": [version, list(internal_state), gauss_next],
+                "fleets": fleets_dicts_list,
+                "completed": completed}
+
+    def __monitor_and_revoke_vms_list(self) -> None:
+        # The resources are released (and the session checkpointed) even if the session fails, so the queued events
+        # and log messages are not lost
+        ec2_vm_managers_list = []
+        fleet_state_refresher = None
+        metrics_exporter = None
+        checkpoint_writer = None
+        revocation_dispatcher = None
+        try:
+            ec2_vm_managers_list = self.__create_ec2_vm_managers_list()
+            revocation_functions_and_states_list = \
+                [self.__get_revocation_function_and_state(fleet, ec2vmm)
+                 for fleet, ec2vmm in zip(self.__fleets_list, ec2_vm_managers_list)]
+            start_message = "Starting the {0} to Simulate VMs Revocation...".format(self._get_process_name())
+            self.__events_logger.info(start_message)
+            fleet_state_caches_list = [self.__create_fleet_state_cache(fleet, ec2vmm)
+                                       for fleet, ec2vmm in zip(self.__fleets_list, ec2_vm_managers_list)]
+            if self.__checkpoint_dict is None:
+                vms_groups_keys_dicts_list = [self.__get_vms_groups_keys_dict(fleet, ec2vmm)
+                                              for fleet, ec2vmm in zip(self.__fleets_list, ec2_vm_managers_list)]
+            else:
+                # A resumed session starts from the checkpointed fleets' states and groups, instead of looking them up
+                vms_groups_keys_dicts_list = [fleet_dict["vms_groups_keys"]
+                                              for fleet_dict in self.__checkpoint_dict["fleets"]]
+                for fleet_state_cache, fleet_dict in zip(fleet_state_caches_list, self.__checkpoint_dict["fleets"]):
+                    fleet_state_cache.restore_snapshot(fleet_dict["state_snapshot"])
+            for fleet_state_cache in fleet_state_caches_list:
+                fleet_state_cache.refresh()
+            # A single background thread refreshes the caches of every fleet (live execution mode only)
+            if self.__execution_mode == "live":
+                fleet_state_refresher = \
+                    EC2FleetStateRefresher(fleet_state_caches_list=fleet_state_caches_list,
+                                           refresh_interval_in_seconds=self.__fleet_state_refresh_interval_in_seconds)
+                fleet_state_refresher.start()
+            metrics_exporter = self.__create_metrics_exporter()
+            if metrics_exporter:
+                metrics_exporter.start()
+            self.__set_revocation_event_log()
+            self.__revocation_event_log.start()
+            last_event_counter, last_arrival_time = 0, 0.0
+            if self.__checkpoint_dict is not None:
+                last_event_counter = self.__checkpoint_dict["event_counter"]
+                last_arrival_time = self.__checkpoint_dict["arrival_time"]
+            if self.__checkpoint_file:
+                checkpoint_writer = RevocationCheckpointWriter(checkpoint_file=self.__checkpoint_file)
+                checkpoint_writer.start()
+            last_checkpoint_time = monotonic()
+            deadline_scheduler = self.__create_deadline_scheduler()
+            # Per fleet: the number of coalesced events whose batches are carried into the fleet's next firing event
+            coalesced_events_counts_list = [0] * len(self.__fleets_list)
+            revocation_dispatcher = RevocationDispatcher(max_concurrent_revocations=self.__max_concurrent_revocations,
+                                                         clock=self.__clock)
+            for event_counter, arrival, scheduling_lag, event_status \
+                    in deadline_scheduler.schedule(self.__arrivals,
+                                                   start_offset_in_seconds=last_arrival_time,
+                                                   first_event_counter=last_event_counter + 1,
+                                                   stream_key=lambda fleet_arrival: fleet_arrival[2]):
+                _, next_arrival_time, fleet_index = arrival
+                # Checkpoint the session as it was after the previous event (written in the background)
+                if checkpoint_writer and monotonic() - last_checkpoint_time >= self.__checkpoint_interval_in_seconds:
+                    checkpoint_writer.submit(self.__create_checkpoint_dict(last_event_counter,
+                                                                           last_arrival_time,
+                                                                           fleet_state_caches_list,
+                                                                           vms_groups_keys_dicts_list))
+                    last_checkpoint_time = monotonic()
+                self.__update_fleet_arrivals_cursor(fleet_index, next_arrival_time)
+                last_event_counter, last_arrival_time = event_counter, next_arrival_time
+                fleet_name = self.__fleets_names_list[fleet_index]
+                self.__scheduling_lag_histogram.observe(scheduling_lag, fleet_name)
+                if event_status != "fire":
+                    if event_status == "coalesce":
+                        coalesced_events_counts_list[fleet_index] += 1
+                    self.__events_counter.inc(labels_values=fleet_name + (event_status,))
+                    self.__revocation_event_log.record_event(event_counter,
+                                                             fleet_index,
+                                                             next_arrival_time,
+                                                             next_arrival_time + scheduling_lag,
+                                                             [],
+                                                             "none",
+                                                             0.0,
+                                                             event_status)
+                    self.__print_overdue_event_message(fleet_index,
+                                                       event_counter,
+                                                       next_arrival_time,
+                                                       scheduling_lag,
+                                                       event_status)
+                    continue
+                fleet_state_cache = fleet_state_caches_list[fleet_index]
+                vms_groups_keys_dict = vms_groups_keys_dicts_list[fleet_index]
+                active_fleet_index = self.__active_fleet_indexes_list[fleet_index]
+                states_delta_dict = fleet_state_cache.pop_states_delta()
+                self.__update_vms_groups_keys_dict(vms_groups_keys_dict,
+                                                   ec2_vm_managers_list[fleet_index],
+                                                   states_delta_dict)
+                # Update the fleet's active index with the VMs whose state changed since the previous event only
+                active_fleet_index.apply_states_delta(states_delta_dict, vms_groups_keys_dict)
+                self.__active_fleet_vms_gauge.set(len(active_fleet_index), fleet_name)
+                vms_to_revoke_list = self.__select_vms_to_revoke(fleet_index,
+                                                                 1 + coalesced_events_counts_list[fleet_index])
+                coalesced_events_counts_list[fleet_index] = 0
+                dispatched_vms_list = []
+                if vms_to_revoke_list:
+                    revocation_function, revoked_state = revocation_functions_and_states_list[fleet_index]
+                    fleet_state_cache.invalidate(vms_to_revoke_list)
+                    # VMs already in-flight or revoked are not dispatched again
+                    dispatched_vms_list = revocation_dispatcher.dispatch(vms_to_revoke_list,
+                                                                         revocation_function,
+                                                                         partial(self.__handle_revocation_completion,
+                                                                                 fleet_index,
+                                                                                 event_counter,
+                                                                                 next_arrival_time,
+                                                                                 scheduling_lag,
+                                                                                 revoked_state,
+                                                                                 fleet_state_cache,
+                                                                                 vms_groups_keys_dict),
+                                                                         partial(self.__print_revoke_message,
+                                                                                 fleet_index,
+                                                                                 event_counter,
+                                                                                 next_arrival_time,
+                                                                                 scheduling_lag,
+                                                                                 revoked_state))
+                if dispatched_vms_list:
+                    self.__events_counter.inc(labels_values=fleet_name + ("revoked",))
+                else:
+                    self.__events_counter.inc(labels_values=fleet_name + ("no_op",))
+                    self.__revocation_event_log.record_event(event_counter,
+                                                             fleet_index,
+                                                             next_arrival_time,
+                                                             next_arrival_time + scheduling_lag,
+                                                             [],
+                                                             "none",
+                                                             0.0,
+                                                             "no_active_vms")
+                    self.__print_non_revoke_message(fleet_index, event_counter, next_arrival_time, scheduling_lag)
+            self.__session_completed = True
+        except Exception as exception:
+            failure_message = "{0} Simulation Failed: {1!r}".format(self._get_process_name(), exception)
+            self.__events_logger.error(failure_message)
+            raise
+        finally:
+            # Wait for the in-flight revocations to complete
+            if revocation_dispatcher:
+                revocation_dispatcher.shutdown()
+            if self.__revocation_event_log:
+                self.__revocation_event_log.stop()
+            if checkpoint_writer:
+                # A completed session is not resumable, while a failed one resumes after the event it failed at
+                checkpoint_writer.submit(self.__create_checkpoint_dict(last_event_counter,
+                                                                       last_arrival_time,
+                                                                       fleet_state_caches_list,
+                                                                       vms_groups_keys_dicts_list,
+                                                                       self.__session_completed))
+                checkpoint_writer.stop()
+            if fleet_state_refresher:
+                fleet_state_refresher.stop()
+            if metrics_exporter:
+                metrics_exporter.stop()
+            self.__print_ec2_requests_counters(ec2_vm_managers_list)
+            if self.__session_completed:
+                end_message = "{0} Simulation Completed!".format(self._get_process_name())
+                self.__events_logger.info(end_message)
+            # Stopping the listener writes the messages still queued
+            self.__log_queue_listener.stop()
+
+    def start(self) -> None:
+        # Set logger
+        self.__set_logger()
+        # Set fleets region names (the simulated execution mode does not reach AWS)
+        if self.__execution_mode == "live":
+            self.__set_fleets_regions_names()
+        # Print stopping criterion
+        self.__print_stopping_criterion()
+        # Print batch size distribution
+        self.__print_batch_size_distribution()
+        # Print overdue event policy
+        self.__print_overdue_event_policy()
+        # Print execution mode
+        self.__print_execution_mode()
+        # Load the checkpoint to resume the session from (if resuming)
+        if self.__resume_from_checkpoint:
+            self.__load_checkpoint()
+        # Prepare the revocation model's arrivals (e.g., precomputed schedules)
+        self._prepare_arrivals()
+        for fleet_index, fleet in enumerate(self.__fleets_list):
+            # Print fleet
+            self.__print_fleet(fleet)
+            # Print the fleet's revocation model settings
+            self._print_fleet_model_settings(fleet_index)
+            # Print VMs revoking behavior
+            self.__print_vms_revoking_behavior(fleet)
+            # Print VM instances ids list
+            self.__print_vm_instances_ids_list(fleet)
+            # Print the fleet's arrivals
+            self._print_fleet_arrivals(fleet_index)
+        # Set the fleets' merged arrivals to be consumed by the monitoring thread
+        self.__set_arrivals()
+        # Start VMs lists' monitoring and revoking thread (a single one, for all the fleets)
+        self.__vms_list_monitor_thread = Thread(target=self.__monitor_and_revoke_vms_list,
+                                                name="vms_list_monitoring_and_revoking_thread",
+                                                daemon=False)
+        self.__vms_list_monitor_thread.start()
+
+    def wait_for_completion(self) -> bool:
+        # The interpreter refuses new thread pool work once the main thread exits, so it must wait here instead
+        # Returns whether the session completed (False if the monitoring thread failed)
+        if self.__vms_list_monitor_thread:
+            self.__vms_list_monitor_thread.join()
+        return self.__session_completed